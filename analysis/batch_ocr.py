@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+OCR por lotes, reanudable, para cualquier conjunto de planes.
+
+Genera para cada PDF el archivo {pdf_id}_ocr_text.txt (formato --- Página N ---) que
+process_plans_v7.py usa automáticamente en lugar de extraer el texto del PDF.
+
+Cada página terminada se agrega a un checkpoint JSONL en data/cache/ocr_batch/, de modo
+que una ejecución interrumpida continúa desde las páginas pendientes sin volver a
+renderizar ni aplicar OCR a las ya procesadas.
+
+Uso:
+    python batch_ocr.py PPSO PLP --workers 4 --threads 1
+    python batch_ocr.py PPSO --engine tesseract --restart
+"""
+
+import os
+import sys
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+import ocr_cache
+import render_cache
+from ocr_pipeline import (
+    _log_worker_memory,
+    apply_worker_settings,
+    describe_cpu_budget,
+    ocr_pool_context,
+    plan_cpu_budget,
+    preload_ocr_models,
+    set_ocr_preload,
+    set_ocr_thread_budget,
+    worker_settings,
+)
+from process_plans_v7 import (
+    CACHE_DIR,
+    DATA_DIR,
+    EASYOCR_LANGUAGES,
+    OCR_AVAILABLE,
+    OCR_RENDER_GRAYSCALE,
+    PLANES_DIR,
+    RENDER_DPI,
+    TESSERACT_AVAILABLE,
+    TESSERACT_CONFIG,
+    _ocr_page,
+    _tesseract_pixmap,
+    file_sha256,
+    get_easyocr_reader,
+    load_fitz,
+    load_ocr_modules,
+    render_page_for_ocr,
+    warn_missing_ocr_engines,
+)
+
+# Checkpoints por PDF (una línea JSON por página terminada)
+CHECKPOINT_DIR = os.path.join(CACHE_DIR, "ocr_batch")
+
+# Motor preferido: "easyocr" (mejor calidad, con fallback a Tesseract) o
+# "tesseract" (más rápido, con fallback a EasyOCR)
+OCR_ENGINES = ["easyocr", "tesseract"]
+
+# ====================================================================
+# OCR DE UNA PÁGINA
+# ====================================================================
+
+# Documento abierto en cada proceso de trabajo (se abre una vez por PDF)
+_worker_doc = None
+_worker_doc_path = None
+
+def ocr_page_with_engine(page, dpi: int, engine: str) -> Tuple[str, str]:
+    """
+    Aplica OCR a una página con el motor preferido.
+    Retorna (texto, motor usado); motor "" si falló.
+    """
+    if engine == "tesseract" and TESSERACT_AVAILABLE:
+        try:
+            load_ocr_modules()
+            pix = render_page_for_ocr(page, dpi)
+            # Backend de Tesseract seleccionado, con la caché OCR por imagen
+            text, _ = _tesseract_pixmap(pix, dpi)
+            return text, "tesseract"
+        except Exception as e:
+            print(f"    ⚠️  Error Tesseract, usando EasyOCR: {e}")
+    text, used_engine, _, _, _ = _ocr_page(page, dpi)
+    return text, used_engine
+
+
+def uses_easyocr(engine: str) -> bool:
+    """Indica si el lector EasyOCR se usará con el motor preferido."""
+    return engine == "easyocr" or not TESSERACT_AVAILABLE
+
+
+def _init_batch_worker(threads: Optional[int], engine: str, settings: Optional[Dict] = None) -> None:
+    """
+    Inicializador de cada proceso: fija hilos y las opciones del proceso principal, y
+    carga su lector EasyOCR si se usará (o lo hereda precargado); registra el tiempo
+    de carga y la memoria del proceso.
+    """
+    set_ocr_thread_budget(threads)
+    apply_worker_settings(settings)
+    if uses_easyocr(engine):
+        start = time.time()
+        get_easyocr_reader()
+        _log_worker_memory("Proceso OCR", time.time() - start)
+
+
+def _ocr_page_in_worker(pdf_path: str, page_index: int, dpi: int, engine: str) -> Tuple[int, str, str]:
+    """Aplica OCR a una página dentro de un proceso de trabajo."""
+    global _worker_doc, _worker_doc_path
+    if _worker_doc_path != pdf_path:
+        if _worker_doc is not None:
+            _worker_doc.close()
+        _worker_doc = load_fitz().open(pdf_path)
+        _worker_doc_path = pdf_path
+    text, used_engine = ocr_page_with_engine(_worker_doc[page_index], dpi, engine)
+    return page_index, text, used_engine
+
+# ====================================================================
+# CHECKPOINT Y ARCHIVO DE SALIDA
+# ====================================================================
+
+def checkpoint_settings(pdf_sha: str, dpi: int, engine: str) -> Dict:
+    """Parámetros que deben coincidir para reanudar un checkpoint."""
+    return {
+        "pdf_sha256": pdf_sha,
+        "dpi": dpi,
+        "colorspace": "gray" if OCR_RENDER_GRAYSCALE else "rgb",
+        "engine": engine,
+        "easyocr_languages": EASYOCR_LANGUAGES,
+        "tesseract_config": TESSERACT_CONFIG,
+    }
+
+
+def load_checkpoint(checkpoint_path: str, settings: Dict) -> Dict[int, Tuple[str, str]]:
+    """
+    Lee las páginas ya terminadas ({índice de página: (texto, motor)}).
+    Un checkpoint de otra versión del PDF o de otra configuración se descarta; una
+    última línea truncada (interrupción a mitad de escritura) se ignora.
+    """
+    if not os.path.exists(checkpoint_path):
+        return {}
+
+    done = {}
+    with open(checkpoint_path, 'r', encoding='utf-8') as f:
+        header_line = f.readline()
+        try:
+            header = json.loads(header_line)
+        except json.JSONDecodeError:
+            return {}
+        if header.get("settings") != settings:
+            print("  ⚠️  El checkpoint corresponde a otro PDF o configuración, se reinicia")
+            return {}
+        for line in f:
+            try:
+                entry = json.loads(line)
+                done[entry["page_index"]] = (entry["text"], entry["engine"])
+            except (json.JSONDecodeError, KeyError):
+                break
+    return done
+
+
+def open_checkpoint(checkpoint_path: str, settings: Dict, done: Dict[int, Tuple[str, str]]):
+    """
+    Reescribe el checkpoint con las páginas válidas (descarta líneas truncadas)
+    y lo deja abierto para agregar las nuevas.
+    """
+    os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+    tmp_path = checkpoint_path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({"settings": settings}, ensure_ascii=False) + "\n")
+        for page_index in sorted(done):
+            text, engine = done[page_index]
+            f.write(json.dumps({"page_index": page_index, "engine": engine, "text": text}, ensure_ascii=False) + "\n")
+    os.replace(tmp_path, checkpoint_path)
+    return open(checkpoint_path, 'a', encoding='utf-8')
+
+
+def append_checkpoint(checkpoint, page_index: int, text: str, engine: str) -> None:
+    """Agrega una página terminada y la fuerza a disco antes de seguir."""
+    checkpoint.write(json.dumps({"page_index": page_index, "engine": engine, "text": text}, ensure_ascii=False) + "\n")
+    checkpoint.flush()
+    os.fsync(checkpoint.fileno())
+
+
+def write_ocr_text_file(output_path: str, done: Dict[int, Tuple[str, str]]) -> Tuple[int, int]:
+    """Escribe el archivo --- Página N --- (solo páginas con texto). Retorna (páginas, caracteres)."""
+    pages_text = [(page_index + 1, done[page_index][0]) for page_index in sorted(done) if done[page_index][0].strip()]
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for page_num, text in pages_text:
+            f.write(f"--- Página {page_num} ---\n")
+            f.write(text)
+            f.write("\n\n")
+    os.replace(tmp_path, output_path)
+    return len(pages_text), sum(len(text) for _, text in pages_text)
+
+# ====================================================================
+# PROCESAMIENTO POR LOTES
+# ====================================================================
+
+def format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+def find_pdf(pdf_id: str) -> Optional[str]:
+    """Busca planes/{pdf_id}.pdf sin distinguir mayúsculas."""
+    for filename in os.listdir(PLANES_DIR):
+        name, ext = os.path.splitext(filename)
+        if ext.lower() == ".pdf" and name.lower() == pdf_id.lower():
+            return os.path.join(PLANES_DIR, filename)
+    return None
+
+
+def ocr_pdf(
+    pdf_id: str,
+    workers: int = 1,
+    threads: Optional[int] = None,
+    dpi: int = RENDER_DPI,
+    engine: str = "easyocr",
+    restart: bool = False,
+    preload: bool = False
+) -> bool:
+    """
+    Aplica OCR a todas las páginas de un PDF, reanudando desde su checkpoint.
+    Con preload=True el lector se carga en este proceso y los procesos de trabajo lo
+    heredan (fork) en lugar de cargar cada uno su copia.
+    Retorna True si todas las páginas quedaron procesadas y se escribió el archivo de texto.
+    """
+    pdf_id = pdf_id.lower()
+    pdf_path = find_pdf(pdf_id)
+    if not pdf_path:
+        print(f"❌ No se encuentra el PDF de {pdf_id.upper()} en {PLANES_DIR}")
+        return False
+
+    checkpoint_path = os.path.join(CHECKPOINT_DIR, f"{pdf_id}.jsonl")
+    output_path = os.path.join(DATA_DIR, f"{pdf_id}_ocr_text.txt")
+    settings = checkpoint_settings(file_sha256(pdf_path), dpi, engine)
+    done = {} if restart else load_checkpoint(checkpoint_path, settings)
+
+    doc = load_fitz().open(pdf_path)
+    num_pages = len(doc)
+    pending = [page_index for page_index in range(num_pages) if page_index not in done]
+
+    print(f"\n📄 {os.path.basename(pdf_path)}: {num_pages} páginas")
+    if done:
+        print(f"   ⏩ Reanudando: {len(done)} páginas ya procesadas, {len(pending)} pendientes")
+
+    failures = []
+    checkpoint = open_checkpoint(checkpoint_path, settings, done)
+    start = time.time()
+    completed = 0
+
+    def record(page_index: int, text: str, used_engine: str) -> None:
+        nonlocal completed
+        completed += 1
+        if not used_engine:
+            failures.append(page_index)
+            status = "❌ falló"
+        else:
+            done[page_index] = (text, used_engine)
+            append_checkpoint(checkpoint, page_index, text, used_engine)
+            status = f"✅ {len(text)} caract. ({used_engine})"
+        elapsed = time.time() - start
+        rate = completed / elapsed if elapsed > 0 else 0.0
+        eta = (len(pending) - completed) / rate if rate > 0 else 0.0
+        print(f"  [{completed}/{len(pending)}] pág. {page_index + 1}: {status} "
+              f"— {rate:.2f} pág/s, ETA {format_duration(eta)}", flush=True)
+
+    try:
+        if workers <= 1 or len(pending) <= 1:
+            _init_batch_worker(threads, engine)
+            for page_index in pending:
+                text, used_engine = ocr_page_with_engine(doc[page_index], dpi, engine)
+                record(page_index, text, used_engine)
+        else:
+            if preload and uses_easyocr(engine):
+                set_ocr_preload(True)
+                preload_ocr_models()
+            with ProcessPoolExecutor(
+                max_workers=min(workers, len(pending)),
+                mp_context=ocr_pool_context(),
+                initializer=_init_batch_worker,
+                initargs=(threads, engine, worker_settings())
+            ) as executor:
+                futures = [
+                    executor.submit(_ocr_page_in_worker, pdf_path, page_index, dpi, engine)
+                    for page_index in pending
+                ]
+                for future in as_completed(futures):
+                    record(*future.result())
+    finally:
+        checkpoint.close()
+        doc.close()
+
+    if pending:
+        elapsed = time.time() - start
+        print(f"   ⏱️  {completed} páginas en {format_duration(elapsed)} "
+              f"({completed / elapsed if elapsed > 0 else 0.0:.2f} pág/s)")
+
+    if failures:
+        print(f"   ⚠️  {len(failures)} páginas fallaron ({', '.join(str(i + 1) for i in sorted(failures))}); "
+              f"volver a ejecutar para reintentarlas")
+        return False
+
+    num_text_pages, total_chars = write_ocr_text_file(output_path, done)
+    print(f"   💾 {os.path.basename(output_path)}: {num_text_pages}/{num_pages} páginas con texto, "
+          f"{total_chars:,} caracteres")
+    return True
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='OCR por lotes reanudable; genera data/{pdf_id}_ocr_text.txt'
+    )
+    parser.add_argument(
+        'pdf_ids',
+        nargs='+',
+        help='Identificadores de los planes (nombre del PDF sin extensión, ej. PPSO)'
+    )
+    parser.add_argument(
+        '--cores',
+        type=int,
+        default=None,
+        help='Presupuesto total de núcleos (0 = todos), repartido en procesos × hilos (default: sin presupuesto)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='Procesos OCR en paralelo; cada uno carga su propio lector (default: 1, o según --cores)'
+    )
+    parser.add_argument(
+        '--threads',
+        type=int,
+        default=None,
+        help='Hilos internos de torch/OpenMP por proceso (default: sin límite, o según --cores)'
+    )
+    parser.add_argument(
+        '--dpi',
+        type=int,
+        default=RENDER_DPI,
+        help=f'Resolución de renderizado (default: {RENDER_DPI})'
+    )
+    parser.add_argument(
+        '--engine',
+        choices=OCR_ENGINES,
+        default="easyocr",
+        help='Motor preferido; el otro se usa como respaldo (default: easyocr)'
+    )
+    parser.add_argument(
+        '--preload-ocr',
+        action='store_true',
+        help='Cargar el lector una sola vez y compartirlo (copy-on-write, vía fork) con los procesos'
+    )
+    parser.add_argument(
+        '--no-render-cache',
+        action='store_true',
+        help='No leer ni guardar las páginas renderizadas en data/cache/renders'
+    )
+    parser.add_argument(
+        '--no-ocr-cache',
+        action='store_true',
+        help='No reutilizar ni guardar resultados OCR por imagen en data/cache/ocr'
+    )
+    parser.add_argument(
+        '--restart',
+        action='store_true',
+        help='Descartar los checkpoints y procesar todas las páginas de nuevo'
+    )
+    args = parser.parse_args(argv)
+    render_cache.set_render_cache(not args.no_render_cache)
+    ocr_cache.set_ocr_cache(not args.no_ocr_cache)
+
+    if not OCR_AVAILABLE:
+        warn_missing_ocr_engines()
+        print("❌ Error: No hay motores OCR disponibles")
+        return 1
+
+    print("=" * 80)
+    print("OCR POR LOTES")
+    print("=" * 80)
+    print(f"📚 Planes: {', '.join(pdf_id.upper() for pdf_id in args.pdf_ids)}")
+    budget = plan_cpu_budget(args.cores, ocr_workers=args.workers, ocr_threads=args.threads, engine=args.engine)
+    print(f"🔧 OCR: {args.engine} | 📐 DPI: {args.dpi} | ⚙️  Procesos: {budget['ocr_workers']}")
+    if budget["cores"]:
+        print(f"🧮 Presupuesto CPU: {describe_cpu_budget(budget)}")
+
+    failed = [pdf_id for pdf_id in args.pdf_ids if not ocr_pdf(
+        pdf_id,
+        workers=budget["ocr_workers"],
+        threads=budget["ocr_threads"],
+        dpi=args.dpi,
+        engine=args.engine,
+        restart=args.restart,
+        preload=args.preload_ocr
+    )]
+
+    print()
+    if failed:
+        print(f"⚠️  Incompletos: {', '.join(pdf_id.upper() for pdf_id in failed)}")
+        return 1
+    print("✅ OCR completado; process_plans_v7.py usará los archivos generados automáticamente")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
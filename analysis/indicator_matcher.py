@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Indicadores regex por dimensión compilados una sola vez, con prefiltro literal.
+
+process_plans_v7.py evalúa cada dimensión (existencia, cuándo, cómo, financiamiento)
+buscando sus patrones uno por uno con re.search(..., re.IGNORECASE) y se queda con
+el primero que aparece. IndicatorMatcher conserva exactamente ese resultado (el
+primer patrón de la lista que coincide en el texto, con su coincidencia más a la
+izquierda), pero:
+
+    - compila cada patrón una vez
+    - extrae de cada patrón los literales con los que tiene que empezar cualquier
+      coincidencia ("primer", "financ", "crear|establecer|...") y los busca todos
+      en una sola pasada con KeywordAutomaton
+    - solo ejecuta los patrones cuyos literales están en el texto (los patrones sin
+      literal inicial, como \\d+..., se ejecutan siempre)
+
+Una sola alternancia (?P<a>...)|(?P<b>...) con todos los patrones no sirve: en cada
+posición se queda con una sola alternativa (oculta coincidencias de otros patrones
+y de otras dimensiones en la misma posición) y pierde la búsqueda rápida por prefijo
+literal de cada patrón, así que en CPython resulta más lenta que buscar uno por uno.
+"""
+
+import re
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from keyword_automaton import KeywordAutomaton
+
+# Literales más cortos no descartan nada (aparecen en casi cualquier párrafo)
+MIN_ANCHOR_LENGTH = 3
+
+# Caracteres que re.IGNORECASE iguala a una letra de los literales (ASCII, vocales
+# con tilde, ñ, ü) pero str.lower() no (İ, ı → i; ſ → s): si el texto los tiene,
+# no se usa el prefiltro
+IGNORECASE_EXTRA_CHARS = frozenset("İıſ")
+
+LEADING_WORD_PATTERN = re.compile(r"[^\W_]+")
+# Grupo inicial de palabras alternativas, no opcional: (?:crear|establecer|...)
+LEADING_ALTERNATIVES_PATTERN = re.compile(r"\(\?:([^\W_]+(?:\|[^\W_]+)*)\)(?![?*{])")
+
+
+def has_top_level_alternation(pattern: str) -> bool:
+    """True si el patrón tiene un | fuera de todo grupo (entonces no tiene un inicio común)."""
+    depth = 0
+    in_class = False
+    escaped = False
+    for char in pattern:
+        if escaped:
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            return True
+    return False
+
+
+def literal_anchors(pattern: str) -> Optional[List[str]]:
+    """
+    Literales (en minúsculas) con los que tiene que empezar cualquier coincidencia
+    del patrón, o None si no se pueden determinar (o son demasiado cortos para filtrar).
+
+    Solo reconoce dos formas, que son las de los indicadores: una palabra inicial
+    ("financ(?:iar|...)", "recursos?\\s*..." → "recurso") y un grupo inicial de
+    palabras alternativas ("(?:ley|decreto|reglamento)").
+    """
+    if has_top_level_alternation(pattern):
+        return None
+    match = LEADING_ALTERNATIVES_PATTERN.match(pattern)
+    if match:
+        anchors = [word.lower() for word in match.group(1).split("|")]
+    else:
+        match = LEADING_WORD_PATTERN.match(pattern)
+        if not match:
+            return None
+        word = match.group(0)
+        if pattern[match.end():match.end() + 1] in ("?", "*", "{"):
+            word = word[:-1]  # la última letra es opcional
+        anchors = [word.lower()]
+    if min(len(anchor) for anchor in anchors) < MIN_ANCHOR_LENGTH:
+        return None
+    return anchors
+
+
+class IndicatorMatcher:
+    """Patrones de varias dimensiones, evaluados en orden con un prefiltro literal común."""
+
+    def __init__(self, dimensions: Mapping[str, Iterable[str]], flags: int = re.IGNORECASE):
+        self._compile(dimensions, flags)
+        anchor_groups = {}
+        for dimension, patterns in self.patterns.items():
+            for group_id, pattern in zip(self.group_ids[dimension], patterns):
+                anchors = literal_anchors(pattern.pattern)
+                if anchors is not None:
+                    anchor_groups[group_id] = anchors
+        # Sin IGNORECASE el prefiltro en minúsculas podría dejar pasar de menos
+        self.automaton = KeywordAutomaton(anchor_groups) if flags & re.IGNORECASE else None
+
+    def _compile(self, dimensions: Mapping[str, Iterable[str]], flags: int) -> None:
+        self.flags = flags
+        self.patterns: Dict[str, List[re.Pattern]] = {
+            dimension: [re.compile(pattern, flags) for pattern in patterns]
+            for dimension, patterns in dimensions.items()
+        }
+        # Grupo del autómata por patrón con literal inicial: "dimensión:índice"
+        self.group_ids: Dict[str, List[str]] = {
+            dimension: [f"{dimension}:{i}" for i in range(len(patterns))]
+            for dimension, patterns in self.patterns.items()
+        }
+
+    def tables(self) -> Dict[str, Any]:
+        """Patrones y tablas del prefiltro (serializables a JSON) para reconstruirlo con from_tables."""
+        return {
+            "patterns": {
+                dimension: [pattern.pattern for pattern in patterns]
+                for dimension, patterns in self.patterns.items()
+            },
+            "flags": self.flags,
+            "automaton": self.automaton.tables() if self.automaton is not None else None,
+        }
+
+    @classmethod
+    def from_tables(cls, tables: Mapping[str, Any]) -> "IndicatorMatcher":
+        """Matcher a partir de tables(): compila los patrones sin volver a extraer sus literales."""
+        matcher = cls.__new__(cls)
+        matcher._compile(tables["patterns"], tables["flags"])
+        automaton = tables["automaton"]
+        matcher.automaton = KeywordAutomaton.from_tables(automaton) if automaton is not None else None
+        return matcher
+
+    def candidates(self, text: str) -> Optional[Dict[str, int]]:
+        """
+        Literales de cada patrón presentes en el texto (una sola pasada), o None si no
+        se puede prefiltrar este texto: entonces se ejecutan todos los patrones.
+        """
+        if self.automaton is None or not IGNORECASE_EXTRA_CHARS.isdisjoint(text):
+            return None
+        return self.automaton.group_counts(text)
+
+    def first_match(
+        self,
+        text: str,
+        dimension: str,
+        candidates: Optional[Dict[str, int]] = None
+    ) -> Optional[re.Match]:
+        """
+        Coincidencia del primer patrón de la dimensión que aparece en el texto (la misma
+        que daría re.search patrón por patrón). candidates: resultado de
+        self.candidates(text), para reutilizar la pasada entre dimensiones.
+        """
+        found = self.first_match_index(text, dimension, candidates)
+        return found[1] if found else None
+
+    def first_match_index(
+        self,
+        text: str,
+        dimension: str,
+        candidates: Optional[Dict[str, int]] = None
+    ) -> Optional[Tuple[int, re.Match]]:
+        """Como first_match, pero con el índice del patrón en la lista de la dimensión."""
+        for i, (group_id, pattern) in enumerate(zip(self.group_ids[dimension], self.patterns[dimension])):
+            if candidates is not None and candidates.get(group_id, 1) == 0:
+                continue  # su literal inicial no está en el texto: no puede coincidir
+            match = pattern.search(text)
+            if match:
+                return i, match
+        return None
+
+    def first_matches(self, text: str, dimensions: Optional[Iterable[str]] = None) -> Dict[str, Optional[re.Match]]:
+        """Primera coincidencia de cada dimensión (todas por defecto) con una sola pasada del prefiltro."""
+        candidates = self.candidates(text)
+        return {
+            dimension: self.first_match(text, dimension, candidates)
+            for dimension in (self.patterns if dimensions is None else dimensions)
+        }
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Autómata de palabras clave: todas las palabras clave de varios grupos en una sola pasada.
+
+identify_primary_pillar de process_plans_v7.py buscaba cada palabra clave de cada pilar
+con `kw.lower() in text_lower` (unas 150 búsquedas por párrafo, volviendo a pasar a
+minúsculas las palabras clave en cada llamada). KeywordAutomaton compila los grupos
+una sola vez y recorre el texto una vez:
+
+    - con pyahocorasick (pip install pyahocorasick): autómata Aho-Corasick en C
+    - sin él: una expresión regular con forma de trie, evaluada en cada posición del
+      texto con una búsqueda anticipada; en cada posición encuentra la palabra clave
+      más larga que empieza ahí, y cuentan también las que son prefijo de ella
+
+En ambos casos el resultado es exactamente el de la búsqueda por subcadena: una
+palabra clave cuenta una vez por grupo (aunque aparezca varias veces en el texto) y,
+si un grupo la repite en su lista, cuenta tantas veces como la repite.
+"""
+
+import re
+import importlib
+import importlib.util
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set
+
+AHOCORASICK_AVAILABLE = importlib.util.find_spec("ahocorasick") is not None
+ahocorasick = None  # se importa al compilar el primer autómata
+
+
+def load_ahocorasick():
+    """Importa pyahocorasick la primera vez que se compila un autómata."""
+    global ahocorasick
+    if ahocorasick is None:
+        ahocorasick = importlib.import_module("ahocorasick")
+    return ahocorasick
+
+
+def trie_pattern(keywords: Iterable[str]) -> str:
+    """
+    Expresión regular con forma de trie que, en una posición dada, encuentra la
+    palabra clave más larga que empieza ahí (las ramas comparten prefijos y la
+    continuación se intenta antes que el final de la palabra).
+    """
+    trie: Dict[str, dict] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}  # fin de palabra
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class KeywordAutomaton:
+    """Grupos de palabras clave compilados para contarlos en una sola pasada por el texto."""
+
+    def __init__(self, groups: Mapping[str, Iterable[str]]):
+        groups = {group: [keyword.lower() for keyword in keywords] for group, keywords in groups.items()}
+        self.group_ids: List[str] = list(groups)
+        self.keywords: List[str] = sorted({keyword for keywords in groups.values() for keyword in keywords if keyword})
+        index = {keyword: i for i, keyword in enumerate(self.keywords)}
+
+        # Grupos de cada palabra clave (con repetición si un grupo la lista dos veces)
+        self.keyword_groups: List[List[str]] = [[] for _ in self.keywords]
+        # La cadena vacía está en cualquier texto: cuenta siempre
+        self.base_counts = dict.fromkeys(self.group_ids, 0)
+        for group, keywords in groups.items():
+            for keyword in keywords:
+                if keyword:
+                    self.keyword_groups[index[keyword]].append(group)
+                else:
+                    self.base_counts[group] += 1
+
+        self._compile()
+
+    def _compile(self, pattern: Optional[str] = None, prefixes: Optional[Dict[str, List[int]]] = None) -> None:
+        """Construye el backend; pattern y prefixes: tablas del backend re ya calculadas."""
+        self.backend = "pyahocorasick" if AHOCORASICK_AVAILABLE else "re"
+        if AHOCORASICK_AVAILABLE:
+            self._automaton = load_ahocorasick().Automaton()
+            for i, keyword in enumerate(self.keywords):
+                self._automaton.add_word(keyword, i)
+            if self.keywords:
+                self._automaton.make_automaton()
+        else:
+            if pattern is None and self.keywords:
+                pattern = f"(?=({trie_pattern(self.keywords)}))"
+            self._pattern = re.compile(pattern) if pattern is not None else None
+            # Palabras clave que son prefijo de cada una (ella incluida)
+            if prefixes is None:
+                prefixes = {
+                    keyword: [i for i, other in enumerate(self.keywords) if keyword.startswith(other)]
+                    for keyword in self.keywords
+                }
+            self._prefixes = prefixes
+
+    def tables(self) -> Dict[str, Any]:
+        """Tablas del autómata (serializables a JSON) para reconstruirlo con from_tables."""
+        tables = {
+            "group_ids": self.group_ids,
+            "keywords": self.keywords,
+            "keyword_groups": self.keyword_groups,
+            "base_counts": self.base_counts,
+        }
+        if self.backend == "re":
+            tables["pattern"] = self._pattern.pattern if self._pattern is not None else None
+            tables["prefixes"] = self._prefixes
+        return tables
+
+    @classmethod
+    def from_tables(cls, tables: Mapping[str, Any]) -> "KeywordAutomaton":
+        """
+        Autómata a partir de tables(): no vuelve a armar el trie ni la tabla de
+        prefijos (solo compila la regex). Si las tablas vienen de otro backend, se
+        calcula lo que falte.
+        """
+        automaton = cls.__new__(cls)
+        automaton.group_ids = list(tables["group_ids"])
+        automaton.keywords = list(tables["keywords"])
+        automaton.keyword_groups = [list(groups) for groups in tables["keyword_groups"]]
+        automaton.base_counts = dict(tables["base_counts"])
+        automaton._compile(tables.get("pattern"), tables.get("prefixes"))
+        return automaton
+
+    def find(self, text_lower: str) -> Set[int]:
+        """Índices (en self.keywords) de las palabras clave presentes en un texto ya en minúsculas."""
+        if not self.keywords:
+            return set()
+        if self.backend == "pyahocorasick":
+            return {i for _, i in self._automaton.iter(text_lower)}
+        found = set()
+        for longest in set(self._pattern.findall(text_lower)):
+            if longest:
+                found.update(self._prefixes[longest])
+        return found
+
+    def group_counts(self, text: str) -> Dict[str, int]:
+        """Palabras clave de cada grupo presentes en el texto (sin distinguir mayúsculas)."""
+        counts = dict(self.base_counts)
+        for i in self.find(text.lower()):
+            for group in self.keyword_groups[i]:
+                counts[group] += 1
+        return counts
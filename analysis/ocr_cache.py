@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Caché en disco de resultados OCR por imagen.
+
+La caché de extracción de process_plans_v7.py se indexa por el PDF completo: si un
+partido vuelve a subir su plan con una corrección, se pierde el OCR de todas sus
+páginas. Esta caché guarda la salida del motor OCR indexada por el contenido de la
+imagen renderizada (píxeles), el motor, su versión, el idioma y la configuración:
+
+    data/cache/ocr/{clave[:2]}/{clave}.json
+
+Cualquier página cuyo render sea idéntico píxel a píxel reutiliza su texto OCR,
+venga del PDF o de la revisión que venga. La usan process_plans_v7.py (y por tanto
+batch_ocr.py) y precision_docs/ocr_extractor*.py.
+
+Los modelos de idioma (tessdata, pesos de EasyOCR) no forman parte de la clave: al
+actualizarlos sin cambiar la versión del motor, borrar la caché.
+
+Uso:
+    python ocr_cache.py            # resumen de la caché
+    python ocr_cache.py --clear    # borrar todos los resultados
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import importlib
+import importlib.metadata
+from typing import Any, Callable, Dict, Optional
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+OCR_CACHE_DIR = os.path.join(SCRIPT_DIR, "data", "cache", "ocr")
+
+# Se desactiva con --no-ocr-cache en las herramientas que la usan
+OCR_CACHE_ENABLED = True
+
+# Versión de cada motor (se consulta una sola vez por proceso; None si no se conoce)
+_engine_versions: Dict[str, Optional[str]] = {}
+
+
+def set_ocr_cache(enabled: bool) -> None:
+    """Activa o desactiva la caché de resultados OCR en el proceso actual."""
+    global OCR_CACHE_ENABLED
+    OCR_CACHE_ENABLED = enabled
+
+
+def _query_engine_version(engine: str) -> str:
+    if engine == "pytesseract":
+        # Lo que reconoce es el ejecutable `tesseract`, no el paquete de Python
+        return str(importlib.import_module("pytesseract").get_tesseract_version())
+    if engine == "tesserocr":
+        return importlib.import_module("tesserocr").tesseract_version().strip()
+    if engine == "mupdf":
+        # Tesseract viene compilado dentro de MuPDF
+        return str(importlib.import_module("fitz").VersionBind)
+    module = importlib.import_module(engine)
+    version = getattr(module, "__version__", None)
+    return str(version) if version else importlib.metadata.version(engine)
+
+
+def engine_version(engine: str) -> Optional[str]:
+    """
+    Versión del motor OCR ("pytesseract", "tesserocr", "mupdf", "easyocr",
+    "paddleocr"). None si no se puede determinar (entonces no se usa la caché).
+    """
+    if engine not in _engine_versions:
+        try:
+            _engine_versions[engine] = _query_engine_version(engine)
+        except Exception:
+            _engine_versions[engine] = None
+    return _engine_versions[engine]
+
+
+def image_digest(image) -> str:
+    """
+    SHA-256 de los píxeles de una imagen: pixmap de PyMuPDF (o con su misma interfaz:
+    width, height, n, stride, samples_mv) o imagen PIL. El relleno de fila del
+    pixmap no cuenta, así que los mismos píxeles dan el mismo hash en ambos formatos.
+    """
+    digest = hashlib.sha256()
+    if hasattr(image, "samples_mv"):
+        row = image.width * image.n
+        digest.update(f"{image.width}x{image.height}x{image.n}".encode('ascii'))
+        samples = image.samples_mv
+        if image.stride == row:
+            digest.update(samples[:row * image.height])
+        else:
+            for y in range(image.height):
+                start = y * image.stride
+                digest.update(samples[start:start + row])
+    else:
+        digest.update(f"{image.width}x{image.height}x{len(image.getbands())}".encode('ascii'))
+        digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+def ocr_cache_key(image, engine: str, language: Any, config: Any) -> Optional[str]:
+    """
+    Clave de un resultado: hash de la imagen + motor + versión + idioma + configuración.
+    None si la caché está desactivada o no se conoce la versión del motor.
+    """
+    if not OCR_CACHE_ENABLED:
+        return None
+    version = engine_version(engine)
+    if version is None:
+        return None
+    key_data = {
+        "image_sha256": image_digest(image),
+        "engine": engine,
+        "version": version,
+        "language": language,
+        "config": config,
+    }
+    payload = json.dumps(key_data, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def ocr_cache_path(key: str) -> str:
+    """Ruta del resultado (subcarpetas por prefijo para no acumular miles de archivos juntos)."""
+    return os.path.join(OCR_CACHE_DIR, key[:2], f"{key}.json")
+
+
+def load_ocr_result(key: Optional[str]) -> Optional[Any]:
+    """Resultado guardado con esa clave, o None si no existe o no es válido."""
+    if key is None:
+        return None
+    cache_path = ocr_cache_path(key)
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return json.load(f)["result"]
+    except (json.JSONDecodeError, KeyError, TypeError, OSError):
+        return None  # archivo truncado o ilegible: se vuelve a reconocer
+
+
+def save_ocr_result(key: Optional[str], engine: str, result: Any) -> None:
+    """Guarda un resultado (serializable a JSON) de forma atómica."""
+    if key is None:
+        return
+    cache_path = ocr_cache_path(key)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    data = {"engine": engine, "version": engine_version(engine), "result": result}
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"  ⚠️  No se pudo guardar el resultado OCR en caché: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def cached_ocr(image, engine: str, language: Any, config: Any, run: Callable[[], Any]) -> Any:
+    """
+    Resultado OCR de la imagen: de la caché si ya se reconoció una imagen idéntica
+    con el mismo motor, versión, idioma y configuración; si no, ejecuta run() y lo
+    guarda. run() debe retornar un valor serializable a JSON (listas en vez de
+    tuplas: así el resultado tiene la misma forma venga de donde venga). Si run()
+    lanza una excepción no se guarda nada.
+    """
+    key = ocr_cache_key(image, engine, language, config)
+    result = load_ocr_result(key)
+    if result is None:
+        result = run()
+        save_ocr_result(key, engine, result)
+    return result
+
+
+def ocr_cache_stats() -> Dict[str, int]:
+    """Número de resultados y bytes ocupados por la caché."""
+    stats = {"results": 0, "bytes": 0}
+    if not os.path.isdir(OCR_CACHE_DIR):
+        return stats
+    for entry in os.scandir(OCR_CACHE_DIR):
+        if not entry.is_dir():
+            continue
+        for result in os.scandir(entry.path):
+            if result.name.endswith(".json"):
+                stats["results"] += 1
+                stats["bytes"] += result.stat().st_size
+    return stats
+
+
+def clear_ocr_cache() -> None:
+    """Borra todos los resultados OCR cacheados."""
+    if os.path.isdir(OCR_CACHE_DIR):
+        shutil.rmtree(OCR_CACHE_DIR)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Caché de resultados OCR por imagen')
+    parser.add_argument('--clear', action='store_true', help='Borrar todos los resultados cacheados')
+    args = parser.parse_args()
+
+    if args.clear:
+        clear_ocr_cache()
+        print(f"🗑️  Caché OCR borrada: {os.path.relpath(OCR_CACHE_DIR, SCRIPT_DIR)}")
+    else:
+        stats = ocr_cache_stats()
+        print(f"📁 {os.path.relpath(OCR_CACHE_DIR, SCRIPT_DIR)}: {stats['results']} resultados, "
+              f"{stats['bytes'] / 1e6:.1f} MB")
@@ -0,0 +1,783 @@
+#!/usr/bin/env python3
+"""
+OCR en paralelo para process_plans_v7.py: pools de procesos OCR, reparto de núcleos,
+precarga del modelo y pipeline render → OCR en memoria compartida.
+
+Los motores (render de páginas, lectores EasyOCR/Tesseract, OCR de una página o de
+sus regiones) y su configuración siguen en process_plans_v7.py, que se registra al
+importarse con set_ocr_engine(); este módulo solo reparte las páginas entre procesos:
+
+    ocr_pdf_pages        pool de procesos OCR por documento (o en el proceso actual)
+    ocr_pages_pipelined  procesos de render y de OCR conectados por slots compartidos
+    plan_cpu_budget      workers × (ocr_workers × ocr_threads + render_workers) <= cores
+    shared_ocr_models    procesos creados con fork que heredan el modelo precargado
+
+Lo usan process_plans_v7.py y batch_ocr.py.
+"""
+
+import os
+import gc
+import sys
+import time
+import queue
+import multiprocessing
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import repeat
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+
+import ocr_cache
+import render_cache
+
+# Palabra OCR con su caja en puntos PDF: (x0, y0, x1, y1, texto), como en process_plans_v7
+OcrWord = Tuple[float, float, float, float, str]
+
+# Módulo con los motores OCR y su configuración (process_plans_v7, también cuando se
+# ejecuta como script); se consulta en cada llamada porque sus opciones cambian en
+# tiempo de ejecución (backend de Tesseract, lectores cargados)
+plans = None
+
+# Precarga: el proceso principal carga el modelo OCR antes de crear los pools y los
+# procesos se crean con fork, compartiendo los pesos (copy-on-write) en vez de cargarlos
+OCR_PRELOAD = False
+
+
+def set_ocr_engine(module) -> None:
+    """Registra el módulo que provee los motores OCR (lo llama process_plans_v7 al importarse)."""
+    global plans
+    plans = module
+
+
+# ====================================================================
+# OCR PARALELO POR PÁGINA
+# ====================================================================
+
+# Documento abierto en cada proceso de trabajo OCR (se abre una vez por PDF)
+_worker_doc = None
+_worker_doc_path = None
+
+def set_ocr_thread_budget(threads: Optional[int]) -> None:
+    """
+    Limita los hilos internos de los motores OCR en el proceso actual
+    (torch para EasyOCR, OpenMP para Tesseract) para no sobresuscribir los núcleos.
+    """
+    if not threads:
+        return
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["OMP_THREAD_LIMIT"] = str(threads)  # Tesseract
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+
+# Hilos por proceso OCR a partir de los cuales rinde más sumar procesos que hilos:
+# torch (EasyOCR) escala bien hasta unos pocos hilos; Tesseract apenas gana con OpenMP
+OCR_MAX_THREADS_PER_WORKER = {"easyocr": 4, "tesseract": 1}
+
+
+def available_cores() -> int:
+    """Núcleos disponibles para este proceso (respeta la afinidad de CPU si existe)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def plan_cpu_budget(
+    cores: Optional[int] = None,
+    workers: Optional[int] = None,
+    ocr_workers: Optional[int] = None,
+    ocr_threads: Optional[int] = None,
+    render_workers: Optional[int] = None,
+    engine: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Reparte un presupuesto de `cores` núcleos entre procesos de PDF (workers),
+    procesos OCR por documento (ocr_workers), hilos de torch/OpenMP por proceso OCR
+    (ocr_threads) y procesos de render del pipeline (render_workers), de modo que
+        workers × (ocr_workers × ocr_threads + render_workers) <= cores
+    
+    Los valores indicados se respetan y el resto se calcula: cada proceso OCR recibe
+    hasta OCR_MAX_THREADS_PER_WORKER[engine] hilos y los núcleos restantes se
+    convierten en procesos. cores=0 usa todos los núcleos disponibles; con cores=None
+    no hay presupuesto (valores por defecto, hilos sin límite).
+    
+    Retorna {"cores", "workers", "ocr_workers", "ocr_threads", "render_workers"}.
+    """
+    workers = workers or 1
+    render_workers = render_workers or 0
+    if cores is None:
+        return {
+            "cores": None,
+            "workers": workers,
+            "ocr_workers": ocr_workers or 1,
+            "ocr_threads": ocr_threads,
+            "render_workers": render_workers,
+        }
+    
+    cores = cores or available_cores()
+    engine = engine or ("easyocr" if plans.EASYOCR_AVAILABLE else "tesseract")
+    # Núcleos para el OCR de cada proceso de PDF, descontando el render del pipeline
+    share = max(1, cores // workers - render_workers)
+    if ocr_workers and not ocr_threads:
+        ocr_threads = max(1, share // ocr_workers)
+    elif not ocr_workers and ocr_threads:
+        ocr_workers = max(1, share // ocr_threads)
+    elif not ocr_workers:
+        ocr_workers = max(1, share // min(share, OCR_MAX_THREADS_PER_WORKER.get(engine, 1)))
+        # Los núcleos sobrantes de la división se reparten como hilos
+        ocr_threads = max(1, share // ocr_workers)
+    return {
+        "cores": cores,
+        "workers": workers,
+        "ocr_workers": ocr_workers,
+        "ocr_threads": ocr_threads,
+        "render_workers": render_workers,
+    }
+
+
+def describe_cpu_budget(budget: Dict[str, Any]) -> str:
+    """Resumen legible del reparto de núcleos (avisa si se excede el presupuesto)."""
+    used = budget["workers"] * (budget["ocr_workers"] * (budget["ocr_threads"] or 1) + budget["render_workers"])
+    layout = (f"{budget['workers']} proceso(s) PDF × ({budget['ocr_workers']} OCR × "
+              f"{budget['ocr_threads'] or 1} hilo(s) + {budget['render_workers']} render) = {used} núcleos")
+    if used > budget["cores"]:
+        return f"{layout} ⚠️ excede el presupuesto de {budget['cores']}"
+    return f"{layout} de {budget['cores']}"
+
+
+def set_ocr_preload(enabled: bool) -> None:
+    """Activa la precarga del modelo OCR en el proceso principal (ver preload_ocr_models)."""
+    global OCR_PRELOAD
+    OCR_PRELOAD = enabled
+
+
+def preload_ocr_models() -> bool:
+    """
+    Carga el lector EasyOCR (o el motor tesserocr) en el proceso actual para que los
+    procesos creados después con fork lo hereden ya cargado: los pesos se comparten
+    copy-on-write y cada proceso empieza a leer páginas sin esperar la carga.
+    
+    Retorna True si hay un modelo cargado para compartir.
+    """
+    if plans.EASYOCR_AVAILABLE:
+        return plans.get_easyocr_reader() is not None
+    if plans.TESSERACT_AVAILABLE and plans.TESSERACT_BACKEND == "tesserocr":
+        return plans.get_tesserocr_api() is not None
+    return False
+
+
+# Hilos de torch del proceso principal antes de bajarlos a 1 para el fork (los
+# procesos los restauran en apply_worker_settings)
+_torch_threads_before_fork = None
+
+
+@contextmanager
+def shared_ocr_models(enabled: bool = True):
+    """
+    Contexto para crear procesos que heredan el modelo OCR precargado (con
+    OCR_PRELOAD y enabled). Dentro del bloque:
+    - gc.freeze() deja los objetos ya creados fuera del recolector, para que los
+      procesos no toquen (y copien) las páginas heredadas; al salir, gc.unfreeze()
+      (si el proceso ya estaba congelado, como un proceso de PDF, no se toca)
+    - torch queda con 1 hilo en este proceso: hacer fork con el pool de hilos de
+      OpenMP ya iniciado puede colgar a los hijos; cada proceso vuelve a fijar sus
+      hilos al iniciar (ver apply_worker_settings y set_ocr_thread_budget)
+    
+    Produce True si hay un modelo cargado para compartir.
+    """
+    global _torch_threads_before_fork
+    loaded = enabled and OCR_PRELOAD and preload_ocr_models()
+    froze = loaded and gc.get_freeze_count() == 0
+    torch = sys.modules.get("torch") if loaded else None
+    previous_threads = _torch_threads_before_fork
+    if torch is not None:
+        if _torch_threads_before_fork is None:
+            _torch_threads_before_fork = torch.get_num_threads()
+        torch.set_num_threads(1)
+    if froze:
+        gc.freeze()
+    try:
+        yield loaded
+    finally:
+        if froze:
+            gc.unfreeze()
+        if torch is not None:
+            torch.set_num_threads(_torch_threads_before_fork)
+            _torch_threads_before_fork = previous_threads
+
+
+def ocr_models_loaded() -> bool:
+    """Indica si el proceso actual ya tiene un modelo OCR cargado."""
+    return plans._easyocr_reader is not None or plans._tesserocr_api is not None
+
+
+def ocr_pool_context():
+    """
+    Contexto multiprocessing para los procesos OCR: fork si la precarga está activa
+    y el proceso actual ya tiene el modelo cargado (se hereda compartido), si no el
+    predeterminado.
+    """
+    if OCR_PRELOAD and ocr_models_loaded() and "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+def process_memory_mb(pid: Any = "self") -> Optional[Dict[str, float]]:
+    """
+    Memoria de un proceso en MB según /proc/<pid>/smaps_rollup (Linux): RSS, PSS
+    (RSS con las páginas compartidas divididas entre los procesos que las usan),
+    compartida y privada. Retorna None si no está disponible.
+    """
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", encoding="utf-8") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == "kB":
+                    fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    except OSError:
+        return None
+    return {
+        "rss": fields.get("Rss", 0.0),
+        "pss": fields.get("Pss", 0.0),
+        "shared": fields.get("Shared_Clean", 0.0) + fields.get("Shared_Dirty", 0.0),
+        "private": fields.get("Private_Clean", 0.0) + fields.get("Private_Dirty", 0.0),
+    }
+
+
+def _log_worker_memory(label: str, ready_seconds: float) -> None:
+    """Registra el tiempo hasta tener el modelo listo y la memoria del proceso actual."""
+    memory = process_memory_mb()
+    memory_info = (
+        f" | RSS {memory['rss']:.0f} MB (compartida {memory['shared']:.0f}, "
+        f"privada {memory['private']:.0f}, PSS {memory['pss']:.0f})"
+    ) if memory else ""
+    # Una sola escritura (línea + salto) para que no se mezclen las de procesos simultáneos
+    print(f"    🧠 {label} {os.getpid()}: modelo listo en {ready_seconds:.1f}s{memory_info}\n", end="", flush=True)
+
+
+def worker_settings() -> Dict[str, Any]:
+    """
+    Opciones de línea de comandos del proceso actual que deben aplicarse en los
+    procesos de trabajo (se pasan a su inicializador, para no depender de fork).
+    """
+    return {
+        "tesseract_backend": plans.TESSERACT_BACKEND,
+        "render_cache": render_cache.RENDER_CACHE_ENABLED,
+        "ocr_cache": ocr_cache.OCR_CACHE_ENABLED,
+        "torch_threads": _torch_threads_before_fork,
+    }
+
+
+def apply_worker_settings(settings: Optional[Dict[str, Any]]) -> None:
+    """Aplica en el proceso actual las opciones recibidas de worker_settings()."""
+    if not settings:
+        return
+    plans.set_tesseract_backend(settings["tesseract_backend"])
+    render_cache.set_render_cache(settings["render_cache"])
+    ocr_cache.set_ocr_cache(settings["ocr_cache"])
+    # Hilos de torch del proceso principal antes del fork (ver shared_ocr_models)
+    if settings.get("torch_threads") and "torch" in sys.modules:
+        sys.modules["torch"].set_num_threads(settings["torch_threads"])
+
+
+def _init_ocr_worker(threads: Optional[int], settings: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Inicializador de cada proceso OCR: fija hilos y las opciones del proceso principal
+    (backend de Tesseract, caché de renders) y carga su propio lector EasyOCR (o su
+    motor tesserocr), salvo que lo haya heredado precargado. Registra el tiempo de
+    carga y la memoria del proceso.
+    """
+    apply_worker_settings(settings)
+    set_ocr_thread_budget(threads)
+    start = time.time()
+    if plans.EASYOCR_AVAILABLE:
+        plans.get_easyocr_reader()
+    elif plans.TESSERACT_BACKEND == "tesserocr":
+        plans.get_tesserocr_api()
+    else:
+        return
+    _log_worker_memory("Proceso OCR", time.time() - start)
+
+
+def _ocr_pages_in_worker(
+    pdf_path: str,
+    page_indices: List[int],
+    dpi: int,
+    with_words: bool = False,
+    regions: bool = False,
+    batch_size: int = 1
+) -> Dict[int, Tuple[str, str, List[OcrWord], int, int]]:
+    """Aplica OCR a un grupo de páginas dentro de un proceso de trabajo."""
+    global _worker_doc, _worker_doc_path
+    if _worker_doc_path != pdf_path:
+        if _worker_doc is not None:
+            _worker_doc.close()
+        _worker_doc = plans.load_fitz().open(pdf_path)
+        _worker_doc_path = pdf_path
+    return _ocr_pages(_worker_doc, page_indices, dpi, with_words, regions, batch_size)
+
+
+def _log_page_dpi(page_index: int, result: Tuple[str, str, List[OcrWord], int, int]) -> None:
+    """Registra el motor y el DPI final usados en una página."""
+    if result[1]:
+        print(f"    🔍 Pág. {page_index + 1}: {plans.EXTRACTOR_LABELS.get(result[1], result[1])} a {result[4]} DPI")
+
+
+def _ocr_page_dispatch(page, dpi: int, with_words: bool, regions: bool) -> Tuple[str, str, List[OcrWord], int, int]:
+    """
+    OCR por regiones si se pide (y no se necesitan cajas de palabras de la página
+    completa). Registra el DPI final usado en la página.
+    """
+    if regions and not with_words:
+        result = plans._ocr_page_regions(page, dpi)
+    else:
+        result = plans._ocr_page(page, dpi, with_words)
+    _log_page_dpi(page.number, result)
+    return result
+
+
+def easyocr_pages_batched(
+    doc,
+    page_indices: List[int],
+    dpi: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    with_words: bool = False,
+    regions: bool = False
+) -> Dict[int, Tuple[str, str, List[OcrWord], int, int]]:
+    """
+    OCR de páginas completas con EasyOCR en lotes de batch_size páginas
+    (readtext_batched): la detección procesa el lote de una vez y el reconocimiento
+    usa lotes de batch_size cajas. Las páginas de un lote se agrupan por tamaño de
+    imagen, porque readtext_batched necesita imágenes del mismo tamaño.
+    
+    La primera lectura se hace a OCR_BASE_DPI si la cascada de resolución está
+    activa; las cajas dudosas se releen página por página a `dpi`. Las páginas con
+    OCR por regiones se procesan una a una.
+    
+    dpi y batch_size son por defecto RENDER_DPI y EASYOCR_BATCH_SIZE del motor.
+    
+    Retorna los mismos resultados que ocr_pdf_pages, en orden de página.
+    """
+    dpi = dpi or plans.RENDER_DPI
+    batch_size = batch_size or plans.EASYOCR_BATCH_SIZE
+    reader = plans.get_easyocr_reader()
+    if reader is None:
+        return {
+            page_index: _ocr_page_dispatch(doc[page_index], dpi, with_words, regions)
+            for page_index in page_indices
+        }
+    
+    first_dpi = plans.OCR_BASE_DPI if plans.OCR_ADAPTIVE_DPI and dpi > plans.OCR_BASE_DPI else dpi
+    results = {}
+    full_pages = []
+    for page_index in page_indices:
+        if regions and not with_words and plans.page_ocr_segments(doc[page_index]) is not None:
+            results[page_index] = _ocr_page_dispatch(doc[page_index], dpi, with_words, regions)
+        else:
+            full_pages.append(page_index)
+    
+    for start in range(0, len(full_pages), batch_size):
+        # Los pixmaps deben seguir vivos mientras se usen sus vistas NumPy
+        pixmaps = {}
+        groups = defaultdict(list)
+        for page_index in full_pages[start:start + batch_size]:
+            pix = plans.render_page_for_ocr(doc[page_index], first_dpi)
+            pixmaps[page_index] = pix
+            groups[(pix.width, pix.height)].append(page_index)
+        
+        for indices in groups.values():
+            # Solo pasan por el lote las páginas que no están en la caché OCR
+            keys = {page_index: plans.easyocr_cache_key(pixmaps[page_index], batch_size) for page_index in indices}
+            page_results_by_index = {page_index: ocr_cache.load_ocr_result(keys[page_index]) for page_index in indices}
+            pending = [page_index for page_index in indices if page_results_by_index[page_index] is None]
+            try:
+                batch_results = reader.readtext_batched(
+                    [plans.pixmap_to_array(pixmaps[page_index]) for page_index in pending],
+                    batch_size=batch_size
+                ) if pending else []
+            except Exception as e:
+                print(f"    ⚠️  Error EasyOCR por lotes, procesando página por página: {e}")
+                for page_index in indices:
+                    results[page_index] = _ocr_page_dispatch(doc[page_index], dpi, with_words, False)
+                continue
+            for page_index, page_results in zip(pending, batch_results):
+                page_results_by_index[page_index] = plans._easyocr_results_to_json(page_results)
+                ocr_cache.save_ocr_result(keys[page_index], "easyocr", page_results_by_index[page_index])
+            
+            for page_index, page_results in page_results_by_index.items():
+                page = doc[page_index]
+                boxes = plans._easyocr_results_to_boxes(page_results, first_dpi)
+                pixels = pixmaps[page_index].width * pixmaps[page_index].height
+                if first_dpi < dpi:
+                    words, pixels, final_dpi = plans._refine_easyocr_boxes(page, reader, boxes, pixels, dpi)
+                else:
+                    words, final_dpi = [box[:5] for box in boxes], dpi
+                text = "\n".join([word[4] for word in words])
+                results[page_index] = (text, "easyocr", words if with_words else [], pixels, final_dpi)
+                _log_page_dpi(page_index, results[page_index])
+    
+    return {page_index: results[page_index] for page_index in page_indices}
+
+
+def _ocr_pages(
+    doc,
+    page_indices: List[int],
+    dpi: int,
+    with_words: bool,
+    regions: bool,
+    batch_size: int
+) -> Dict[int, Tuple[str, str, List[OcrWord], int, int]]:
+    """OCR de un grupo de páginas en el proceso actual, por lotes si batch_size > 1."""
+    if batch_size > 1 and plans.EASYOCR_AVAILABLE:
+        return easyocr_pages_batched(doc, page_indices, dpi, batch_size, with_words, regions)
+    return {
+        page_index: _ocr_page_dispatch(doc[page_index], dpi, with_words, regions)
+        for page_index in page_indices
+    }
+
+
+def ocr_pdf_pages(
+    pdf_path: str,
+    doc,
+    page_indices: List[int],
+    workers: int = 1,
+    threads: Optional[int] = None,
+    dpi: Optional[int] = None,
+    with_words: bool = False,
+    regions: bool = False,
+    batch_size: Optional[int] = None,
+    render_workers: int = 0
+) -> Dict[int, Tuple[str, str, List[OcrWord], int, int]]:
+    """
+    Aplica OCR a un conjunto de páginas de un PDF.
+    
+    Con workers > 1 las páginas se reparten en un pool de procesos; cada proceso
+    inicializa su lector EasyOCR una sola vez y usa `threads` hilos internos.
+    Con regions=True solo se procesan las imágenes y bloques corruptos de cada página.
+    Con batch_size > 1 EasyOCR procesa las páginas en lotes (ver easyocr_pages_batched);
+    en paralelo, cada proceso recibe lotes completos.
+    Con render_workers > 0 el render y el OCR se solapan en un pipeline de procesos
+    (ver ocr_pages_pipelined); en ese modo cada página se lee por separado.
+    dpi y batch_size son por defecto RENDER_DPI y EASYOCR_BATCH_SIZE del motor.
+    
+    Retorna {índice de página: (texto, motor, palabras, píxeles procesados, DPI final)}
+    en orden de página; las cajas de palabras solo se calculan con with_words=True.
+    """
+    dpi = dpi or plans.RENDER_DPI
+    if render_workers > 0 and len(page_indices) > 1:
+        return ocr_pages_pipelined(
+            pdf_path, doc, page_indices, render_workers, workers, threads, dpi, with_words, regions
+        )
+    batch_size = max(1, batch_size or plans.EASYOCR_BATCH_SIZE)
+    if workers <= 1 or len(page_indices) <= batch_size:
+        set_ocr_thread_budget(threads)
+        return _ocr_pages(doc, page_indices, dpi, with_words, regions, batch_size)
+    
+    chunks = [page_indices[i:i + batch_size] for i in range(0, len(page_indices), batch_size)]
+    results = {}
+    with shared_ocr_models(), ProcessPoolExecutor(
+        max_workers=min(workers, len(chunks)),
+        mp_context=ocr_pool_context(),
+        initializer=_init_ocr_worker,
+        initargs=(threads, worker_settings())
+    ) as executor:
+        for chunk_results in executor.map(
+            _ocr_pages_in_worker, repeat(pdf_path), chunks, repeat(dpi),
+            repeat(with_words), repeat(regions), repeat(batch_size)
+        ):
+            results.update(chunk_results)
+    return {page_index: results[page_index] for page_index in page_indices}
+
+
+# ====================================================================
+# PIPELINE RENDER → OCR (MEMORIA COMPARTIDA)
+# ====================================================================
+
+# Slots de página por proceso OCR: uno en reconocimiento y otro ya renderizado en
+# espera. Los slots limitan la memoria: no depende del número de páginas.
+OCR_PIPELINE_SLOTS_PER_WORKER = 2
+
+# Trabajo del pipeline: (id, índice de página, región (x0, y0, x1, y1) o None = página completa)
+OcrJob = Tuple[int, int, Optional[Tuple[float, float, float, float]]]
+
+
+class SharedPixmap:
+    """
+    Página renderizada en un slot de memoria compartida, con los atributos de
+    pixmap que usan los motores OCR (pixmap_to_array, pixmap_to_pil, tesserocr).
+    """
+    
+    def __init__(self, buffer, width: int, height: int, n: int, stride: int):
+        self.width = width
+        self.height = height
+        self.n = n
+        self.stride = stride
+        self.samples_mv = buffer[:stride * height]
+    
+    @property
+    def samples(self) -> bytes:
+        return self.samples_mv.tobytes()
+    
+    def to_pixmap(self):
+        """Copia en un pixmap de PyMuPDF (para el Tesseract integrado en MuPDF)."""
+        fitz = plans.load_fitz()
+        colorspace = fitz.csGRAY if self.n == 1 else fitz.csRGB
+        return fitz.Pixmap(colorspace, self.width, self.height, self.samples, False)
+    
+    def release(self) -> None:
+        """Libera la vista sobre el slot (requisito para cerrar la memoria compartida)."""
+        self.samples_mv.release()
+
+
+def pipeline_render_dpi(dpi: int) -> int:
+    """DPI al que renderiza el pipeline: el de la primera lectura de la cascada de EasyOCR."""
+    if plans.EASYOCR_AVAILABLE and plans.OCR_ADAPTIVE_DPI and dpi > plans.OCR_BASE_DPI:
+        return plans.OCR_BASE_DPI
+    return dpi
+
+
+def _pipeline_jobs(
+    doc,
+    page_indices: List[int],
+    with_words: bool,
+    regions: bool
+) -> Tuple[List[OcrJob], Dict[int, List[Tuple[str, Any]]]]:
+    """Trabajos del pipeline: una página completa o una región OCR de la página por trabajo."""
+    jobs = []
+    page_segments = {}
+    for page_index in page_indices:
+        segments = plans.page_ocr_segments(doc[page_index]) if regions and not with_words else None
+        if segments is None:
+            jobs.append((len(jobs), page_index, None))
+            continue
+        page_segments[page_index] = segments
+        for kind, value in segments:
+            if kind == "ocr":
+                jobs.append((len(jobs), page_index, tuple(value)))
+    return jobs, page_segments
+
+
+def _pipeline_slot_size(doc, jobs: List[OcrJob], render_dpi: int) -> int:
+    """Bytes del render más grande entre los trabajos (tamaño de cada slot)."""
+    fitz = plans.load_fitz()
+    scale = render_dpi / 72
+    channels = 1 if plans.OCR_RENDER_GRAYSCALE else 3
+    largest = 0
+    for _, page_index, region in jobs:
+        rect = fitz.Rect(region) if region else doc[page_index].rect
+        largest = max(largest, (int(rect.width * scale) + 2) * (int(rect.height * scale) + 2))
+    return largest * channels
+
+
+def _pipeline_render_worker(
+    pdf_path: str,
+    jobs,
+    free_slots,
+    ready,
+    slot_names: List[str],
+    render_dpi: int,
+    settings: Dict[str, Any]
+) -> None:
+    """Proceso de render: rasteriza cada trabajo en un slot libre (espera si no queda ninguno)."""
+    apply_worker_settings(settings)
+    fitz = plans.load_fitz()
+    slots = [shared_memory.SharedMemory(name=name) for name in slot_names]
+    doc = fitz.open(pdf_path)
+    try:
+        for job_id, page_index, region in iter(jobs.get, None):
+            slot = free_slots.get()
+            try:
+                clip = fitz.Rect(region) if region else None
+                pix = plans.render_page_for_ocr(doc[page_index], render_dpi, clip=clip)
+                size = pix.stride * pix.height
+                if size > slots[slot].size:
+                    raise ValueError(f"render de {size} bytes no cabe en el slot")
+                slots[slot].buf[:size] = pix.samples_mv
+                ready.put((job_id, page_index, region, slot, pix.width, pix.height, pix.n, pix.stride))
+            except Exception as e:
+                # El proceso OCR renderizará este trabajo por su cuenta
+                print(f"    ⚠️  Error de render en pág. {page_index + 1}: {e}")
+                free_slots.put(slot)
+                ready.put((job_id, page_index, region, None, 0, 0, 0, 0))
+    finally:
+        doc.close()
+        for shm in slots:
+            shm.close()
+
+
+def _ocr_shared_pixmap(
+    page,
+    pix: SharedPixmap,
+    render_dpi: int,
+    dpi: int,
+    with_words: bool,
+    clip=None
+) -> Tuple[str, str, List[OcrWord], int, int]:
+    """
+    OCR de una página (o región) ya renderizada a render_dpi; mismo resultado que
+    _ocr_page. Con EasyOCR, las cajas dudosas se releen de la página a `dpi`.
+    """
+    pixels = pix.width * pix.height
+    offset = (clip.x0, clip.y0) if clip is not None else (0.0, 0.0)
+    try:
+        if plans.EASYOCR_AVAILABLE:
+            reader = plans.get_easyocr_reader()
+            if reader:
+                boxes = plans._easyocr_results_to_boxes(plans._easyocr_readtext(reader, pix), render_dpi, clip)
+                if render_dpi < dpi:
+                    words, pixels, final_dpi = plans._refine_easyocr_boxes(page, reader, boxes, pixels, dpi, clip)
+                else:
+                    words, final_dpi = [box[:5] for box in boxes], render_dpi
+                text = "\n".join([word[4] for word in words])
+                return text, "easyocr", words if with_words else [], pixels, final_dpi
+        elif plans.TESSERACT_AVAILABLE and render_dpi == dpi:
+            source = pix.to_pixmap() if plans.TESSERACT_BACKEND == "mupdf" else pix
+            text, words = plans._tesseract_pixmap(source, dpi, offset, with_words)
+            return text, "tesseract", words, pixels, dpi
+    except Exception as e:
+        print(f"    ⚠️  Error OCR en pág. {page.number + 1}, reintentando: {e}")
+    # Sin lector o tras un error: OCR normal (renderiza de nuevo)
+    return plans._ocr_page(page, dpi, with_words, clip)
+
+
+def _pipeline_ocr_worker(
+    pdf_path: str,
+    ready,
+    free_slots,
+    results,
+    slot_names: List[str],
+    dpi: int,
+    render_dpi: int,
+    with_words: bool,
+    threads: Optional[int],
+    settings: Dict[str, Any]
+) -> None:
+    """Proceso OCR: lee cada render directamente del slot compartido y lo devuelve a los libres."""
+    _init_ocr_worker(threads, settings)
+    plans.load_ocr_modules()
+    fitz = plans.load_fitz()
+    slots = [shared_memory.SharedMemory(name=name) for name in slot_names]
+    doc = fitz.open(pdf_path)
+    try:
+        for job_id, page_index, region, slot, width, height, n, stride in iter(ready.get, None):
+            page = doc[page_index]
+            clip = fitz.Rect(region) if region else None
+            if slot is None:
+                result = plans._ocr_page(page, dpi, with_words, clip)
+            else:
+                pix = SharedPixmap(slots[slot].buf, width, height, n, stride)
+                try:
+                    result = _ocr_shared_pixmap(page, pix, render_dpi, dpi, with_words, clip)
+                finally:
+                    pix.release()
+                    free_slots.put(slot)
+            results.put((job_id, result))
+    finally:
+        doc.close()
+        for shm in slots:
+            shm.close()
+
+
+def ocr_pages_pipelined(
+    pdf_path: str,
+    doc,
+    page_indices: List[int],
+    render_workers: int = 1,
+    workers: int = 1,
+    threads: Optional[int] = None,
+    dpi: Optional[int] = None,
+    with_words: bool = False,
+    regions: bool = False
+) -> Dict[int, Tuple[str, str, List[OcrWord], int, int]]:
+    """
+    OCR en pipeline productor/consumidor: render_workers procesos rasterizan las
+    páginas (o sus regiones OCR) en slots de memoria compartida y `workers` procesos
+    OCR las leen sin copiarlas, de modo que el render de una página se solapa con el
+    reconocimiento de otra.
+    
+    Los slots (OCR_PIPELINE_SLOTS_PER_WORKER por proceso OCR) hacen de cola acotada:
+    el render espera a que se libere uno, así que la memoria máxima es fija
+    (slots × render más grande) sea cual sea el número de páginas.
+    
+    Mismo retorno que ocr_pdf_pages; dpi es por defecto RENDER_DPI del motor.
+    """
+    dpi = dpi or plans.RENDER_DPI
+    jobs, page_segments = _pipeline_jobs(doc, page_indices, with_words, regions)
+    render_dpi = pipeline_render_dpi(dpi)
+    slot_size = _pipeline_slot_size(doc, jobs, render_dpi)
+    workers = max(1, min(workers, len(jobs)))
+    render_workers = max(1, min(render_workers, len(jobs)))
+    num_slots = min(len(jobs), OCR_PIPELINE_SLOTS_PER_WORKER * workers)
+    print(f"  🔀 Pipeline OCR: {render_workers} proceso(s) de render → {workers} de OCR, "
+          f"{num_slots} slots de {slot_size / 1e6:.1f} MB")
+    
+    # Los procesos se crean (fork) dentro del contexto: heredan el modelo precargado
+    with shared_ocr_models():
+        context = ocr_pool_context()
+        job_queue, free_slots, ready, results_queue = (context.Queue() for _ in range(4))
+        slots = [shared_memory.SharedMemory(create=True, size=slot_size) for _ in range(num_slots)]
+        slot_names = [shm.name for shm in slots]
+        for slot in range(num_slots):
+            free_slots.put(slot)
+        for job in jobs:
+            job_queue.put(job)
+        for _ in range(render_workers):
+            job_queue.put(None)
+    
+        processes = [
+            context.Process(
+                target=_pipeline_render_worker,
+                args=(pdf_path, job_queue, free_slots, ready, slot_names, render_dpi, worker_settings()),
+                daemon=True
+            )
+            for _ in range(render_workers)
+        ] + [
+            context.Process(
+                target=_pipeline_ocr_worker,
+                args=(pdf_path, ready, free_slots, results_queue, slot_names, dpi, render_dpi,
+                      with_words, threads, worker_settings()),
+                daemon=True
+            )
+            for _ in range(workers)
+        ]
+        job_results = {}
+        try:
+            for process in processes:
+                process.start()
+            while len(job_results) < len(jobs):
+                try:
+                    job_id, result = results_queue.get(timeout=1)
+                except queue.Empty:
+                    if any(process.exitcode not in (None, 0) for process in processes):
+                        raise RuntimeError("un proceso del pipeline OCR terminó inesperadamente")
+                    continue
+                job_results[job_id] = result
+            for _ in range(workers):
+                ready.put(None)
+            for process in processes:
+                process.join()
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+            for shm in slots:
+                shm.close()
+                shm.unlink()
+    
+    page_results = defaultdict(list)
+    for job_id, page_index, _ in jobs:
+        page_results[page_index].append(job_results[job_id])
+    results = {}
+    for page_index in page_indices:
+        if page_index in page_segments:
+            results[page_index] = plans._join_ocr_segments(page_segments[page_index], page_results[page_index])
+        else:
+            results[page_index] = page_results[page_index][0]
+        _log_page_dpi(page_index, results[page_index])
+    return results
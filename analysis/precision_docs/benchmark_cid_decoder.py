@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark del decodificador de CID de process_plans_v7.
+
+Compara la implementación anterior (bucle de str.replace sobre ~100 entradas +
+re.sub para los CID desconocidos) con el decodificador de una sola pasada, y
+verifica que ambos producen exactamente el mismo texto.
+
+El texto de prueba se sintetiza a partir del OCR de PPSO, codificando cada
+carácter mapeable como (cid:N) para simular una página con fuentes rotas.
+"""
+
+import sys
+import os
+import re
+
+from benchmark_common import time_function
+from process_plans_v7 import CID_MAPPING, DATA_DIR, clean_cid_characters
+
+SAMPLE_FILE = os.path.join(DATA_DIR, "ppso_ocr_text.txt")
+
+
+def legacy_clean_cid_characters(text: str) -> str:
+    """Copia de referencia de la implementación anterior (un str.replace por entrada)."""
+    if not text:
+        return text
+    cid_mapping = {f"(cid:{num})": char for num, char in CID_MAPPING.items()}
+    for cid, replacement in cid_mapping.items():
+        text = text.replace(cid, replacement)
+    
+    def replace_unknown_cid(match):
+        try:
+            num = int(match.group(1))
+            if 32 <= num <= 47 or 1228 <= num <= 1235:
+                return ' '
+            return ''
+        except ValueError:
+            return ''
+    
+    return re.sub(r'\(cid:(\d+)\)', replace_unknown_cid, text)
+
+
+def build_cid_text(source: str) -> str:
+    """Codifica como (cid:N) cada carácter con CID conocido; intercala CID desconocidos."""
+    inverse = {}
+    for num, char in CID_MAPPING.items():
+        inverse.setdefault(char, num)
+    pieces = []
+    for i, char in enumerate(source):
+        if char in inverse:
+            pieces.append(f"(cid:{inverse[char]})")
+        else:
+            pieces.append(char)
+        # CID sin mapear: separadores (→ espacio), basura (→ eliminado) y ceros a la izquierda
+        if i % 97 == 0:
+            pieces.append("(cid:40)")
+        elif i % 89 == 0:
+            pieces.append("(cid:9001)")
+        elif i % 83 == 0:
+            pieces.append("(cid:0065)")
+    return "".join(pieces)
+
+
+def main():
+    print("=" * 60)
+    print("BENCHMARK DECODIFICADOR CID")
+    print("=" * 60)
+    
+    if not os.path.exists(SAMPLE_FILE):
+        print(f"❌ No se encontró {SAMPLE_FILE}")
+        return 1
+    
+    with open(SAMPLE_FILE, 'r', encoding='utf-8') as f:
+        content = f.read()
+    source_pages = re.split(r'--- Página \d+ ---\n', content)
+    source_pages = [page for page in source_pages if page.strip()]
+    
+    # Páginas con CID + páginas limpias (el caso común, sin tokens)
+    cid_pages = [build_cid_text(page) for page in source_pages]
+    clean_pages = source_pages
+    
+    num_tokens = sum(page.count("(cid:") for page in cid_pages)
+    print(f"📄 {len(cid_pages)} páginas, {num_tokens:,} tokens CID")
+    print()
+    
+    all_ok = True
+    for label, pages in [("Páginas con CID", cid_pages), ("Páginas sin CID", clean_pages)]:
+        legacy_time, legacy_out = time_function(legacy_clean_cid_characters, pages)
+        new_time, new_out = time_function(clean_cid_characters, pages)
+        identical = legacy_out == new_out
+        all_ok = all_ok and identical
+        print(f"📊 {label}:")
+        print(f"   Anterior (bucle replace): {legacy_time*1000:8.2f} ms")
+        print(f"   Una sola pasada:          {new_time*1000:8.2f} ms")
+        print(f"   Aceleración:              {legacy_time / max(new_time, 1e-9):8.1f}x")
+        print(f"   Salida idéntica:          {'✅' if identical else '❌'}")
+        print()
+    
+    return 0 if all_ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
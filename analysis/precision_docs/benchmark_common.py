@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Utilidades compartidas por los benchmarks y reportes de precision_docs.
+
+- Agrega analysis/ al path: se importa antes que los módulos de analysis/
+- time_function / time_batch: mejor tiempo de REPETITIONS pasadas (la máquina puede
+  tener ruido de otros procesos); fresh_process_output para medir en un proceso nuevo
+- Cargadores del corpus de planes/ de solo lectura: usan la caché de extracción si
+  existe pero nunca escriben en ella (ni en las cachés de renders, OCR y paquetes de
+  reglas), así que un benchmark no cambia lo que encuentra la siguiente ejecución
+  de process_plans_v7
+- Copias de referencia de implementaciones anteriores que usa más de un script
+"""
+
+import sys
+import os
+import subprocess
+import time
+from typing import Callable, List, Tuple
+
+# Agregar el directorio analysis/ al path (desde precision_docs)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(script_dir)  # Subir un nivel a analysis/
+sys.path.insert(0, parent_dir)
+
+import rule_packs
+# process_plans_v7 carga los paquetes al importarse: sin escribir data/cache/rules
+rule_packs.set_rule_cache(False)
+
+import ocr_cache
+import process_plans_v7
+import render_cache
+from process_plans_v7 import (
+    DATA_DIR,
+    PDFPLUMBER_AVAILABLE,
+    PARAGRAPH_SPLIT_PATTERN,
+    PILLAR_KEYWORDS,
+    PLANES_DIR,
+    detect_corrupt_text,
+    load_fitz,
+    load_pdfplumber,
+)
+
+REPETITIONS = 5
+
+# Largo mínimo de un párrafo candidato (como en extract_best_proposal_per_pillar)
+MIN_PARAGRAPH_CHARS = 50
+
+# ====================================================================
+# MEDICIÓN
+# ====================================================================
+
+def time_batch(func: Callable, items, repetitions: int = REPETITIONS):
+    """(mejor tiempo en segundos, salida) de func(items) en `repetitions` pasadas."""
+    best = float('inf')
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        output = func(items)
+        best = min(best, time.perf_counter() - start)
+    return best, output
+
+
+def time_function(func: Callable, items, repetitions: int = REPETITIONS):
+    """(mejor tiempo en segundos, salidas) de aplicar func a cada elemento."""
+    return time_batch(lambda batch: [func(item) for item in batch], items, repetitions)
+
+
+def fresh_process_output(code: str) -> str:
+    """Salida de `code` ejecutado en un proceso nuevo de Python, con analysis/ en el path."""
+    script = f"import sys\nsys.path.insert(0, {parent_dir!r})\n{code}"
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    return output.stdout.strip()
+
+# ====================================================================
+# CORPUS DE planes/ (SOLO LECTURA)
+# ====================================================================
+
+def plan_pdfs() -> List[str]:
+    return sorted(f for f in os.listdir(PLANES_DIR) if f.endswith('.pdf'))
+
+
+def load_extractions() -> List[Tuple[str, List[Tuple[int, str]], str]]:
+    """
+    (nombre del PDF, páginas, texto completo) de cada plan, como los extrae
+    process_plans_v7: texto OCR pre-extraído, caché de extracción si es válida o
+    extracción sin caché. La caché solo se lee.
+    """
+    render_enabled = render_cache.RENDER_CACHE_ENABLED
+    ocr_enabled = ocr_cache.OCR_CACHE_ENABLED
+    render_cache.set_render_cache(False)
+    ocr_cache.set_ocr_cache(False)
+    extractions = []
+    try:
+        for pdf_name in plan_pdfs():
+            pdf_path = os.path.join(PLANES_DIR, pdf_name)
+            pdf_id = os.path.splitext(pdf_name)[0].lower()
+            records = None
+            if not os.path.exists(os.path.join(DATA_DIR, f"{pdf_id}_ocr_text.txt")):
+                records = process_plans_v7.load_cached_extraction(process_plans_v7.file_sha256(pdf_path), pdf_id)
+            if records is not None:
+                result = process_plans_v7._assemble_extraction(records)
+            else:
+                result = process_plans_v7.extract_pdf_pages(pdf_path, use_cache=False)
+            extractions.append((pdf_name, result["pages"], result["full_text"]))
+    finally:
+        render_cache.set_render_cache(render_enabled)
+        ocr_cache.set_ocr_cache(ocr_enabled)
+    return extractions
+
+
+def load_plan_texts() -> List[Tuple[str, str]]:
+    """(nombre del PDF, texto completo) de cada plan."""
+    return [(pdf_name, full_text) for pdf_name, _, full_text in load_extractions()]
+
+
+def load_paragraphs() -> List[str]:
+    """Párrafos candidatos de todos los planes (como en extract_best_proposal_per_pillar)."""
+    paragraphs = []
+    for _, pages, _ in load_extractions():
+        for _, text in pages:
+            for paragraph in PARAGRAPH_SPLIT_PATTERN.split(text):
+                paragraph = paragraph.strip()
+                if len(paragraph) >= MIN_PARAGRAPH_CHARS:
+                    paragraphs.append(paragraph)
+    return paragraphs
+
+
+def load_raw_pages() -> List[Tuple[str, str]]:
+    """Texto crudo (sin normalizar) de todas las páginas de planes/, con su pdf_id."""
+    fitz = load_fitz()
+    pages = []
+    for pdf_name in plan_pdfs():
+        pdf_path = os.path.join(PLANES_DIR, pdf_name)
+        pdf_id = os.path.splitext(pdf_name)[0].lower()
+        plumber_pdf = None
+        with fitz.open(pdf_path) as doc:
+            for page_index, page in enumerate(doc):
+                text = page.get_text()
+                pages.append((text, pdf_id))
+                # Las páginas corruptas se reextraen con pdfplumber (con tokens CID)
+                if PDFPLUMBER_AVAILABLE and detect_corrupt_text(text)[0]:
+                    if plumber_pdf is None:
+                        plumber_pdf = load_pdfplumber().open(pdf_path)
+                    pages.append((plumber_pdf.pages[page_index].extract_text() or "", pdf_id))
+        if plumber_pdf is not None:
+            plumber_pdf.close()
+    return pages
+
+# ====================================================================
+# COPIAS DE REFERENCIA COMPARTIDAS
+# ====================================================================
+
+def legacy_pillar_scores(text: str):
+    """Copia de referencia de los conteos anteriores (una búsqueda por palabra clave)."""
+    text_lower = text.lower()
+    return {
+        pillar_id: sum(1 for kw in keywords if kw.lower() in text_lower)
+        for pillar_id, keywords in PILLAR_KEYWORDS.items()
+    }
+
+
+def legacy_identify_primary_pillar(text: str):
+    """Copia de referencia de identify_primary_pillar anterior."""
+    text_lower = text.lower()
+    scores = {}
+
+    for pillar_id, keywords in PILLAR_KEYWORDS.items():
+        score = sum(1 for kw in keywords if kw.lower() in text_lower)
+        if score >= 2:
+            scores[pillar_id] = score
+
+    if not scores:
+        return None
+    return max(scores, key=scores.get)
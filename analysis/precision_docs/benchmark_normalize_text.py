@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Equivalencia y benchmark de normalize_text de process_plans_v7.
+
+Compara la implementación anterior (CID + cinco re.sub encadenados, cada uno con
+una copia completa de la página) con la normalización fusionada (controles y "Ia"
+solo si aparecen + espacios con split/join) sobre el texto crudo de todas las páginas
+de planes/ (PyMuPDF y, en las páginas corruptas, pdfplumber con sus tokens CID),
+más casos sintéticos de caracteres de control y espacios Unicode.
+
+También verifica preserve_paragraphs=True: uniendo los párrafos con un espacio se
+obtiene exactamente la salida por defecto.
+"""
+
+import sys
+import re
+
+from benchmark_common import load_raw_pages, time_batch
+from process_plans_v7 import clean_cid_characters, normalize_text
+
+
+# Casos límite: controles entre letras, "Ia" junto a controles y saltos, espacios Unicode
+SYNTHETIC_PAGES = [
+    "Ia casa\x00 y I\x00a escuela\nIa\n\nde Ia\tIa-Ia_Ia IaIa",
+    "  texto\x0bcon\x0cformularios\x1cy\x1fseparadores\x85NEL línea párrafo  ",
+    "espacios duros em　ideográfico\r\n\r\n\r\nfin\x7f\x9f",
+    "\n\n\n",
+    "\x00\x01\x02",
+    "(cid:40)(cid:9001)Ia(cid:0065)\n \n párrafo",
+]
+
+
+def legacy_normalize_text(text: str, pdf_id=None) -> str:
+    """Copia de referencia de la implementación anterior (un re.sub por regla)."""
+    if not text:
+        return ""
+    text = clean_cid_characters(text, pdf_id)
+    text = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]', '', text)
+    text = re.sub(r'\bIa\b', 'la', text)
+    text = re.sub(r'\bIa\n', 'la\n', text)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\n\s*\n+', '\n\n', text)
+    return text.strip()
+
+
+def all_pages(func):
+    """Aplica func(texto, pdf_id) a todas las páginas."""
+    return lambda pages: [func(text, pdf_id) for text, pdf_id in pages]
+
+
+def main():
+    print("=" * 60)
+    print("EQUIVALENCIA Y BENCHMARK DE normalize_text")
+    print("=" * 60)
+
+    pages = load_raw_pages()
+    pages += [(text, None) for text in SYNTHETIC_PAGES]
+    total_chars = sum(len(text) for text, _ in pages)
+    cid_pages = sum(1 for text, _ in pages if "(cid:" in text)
+    print(f"📄 {len(pages)} páginas ({cid_pages} con tokens CID), {total_chars / 1e6:.1f} M caracteres")
+    print()
+
+    legacy_time, legacy_out = time_batch(all_pages(legacy_normalize_text), pages)
+    new_time, new_out = time_batch(all_pages(normalize_text), pages)
+    mismatches = [i for i, (old, new) in enumerate(zip(legacy_out, new_out)) if old != new]
+
+    paragraph_out = [normalize_text(text, pdf_id, preserve_paragraphs=True) for text, pdf_id in pages]
+    paragraph_mismatches = [
+        i for i, (flat, paragraphs) in enumerate(zip(new_out, paragraph_out))
+        if paragraphs.replace("\n\n", " ") != flat
+    ]
+    num_paragraphs = sum(text.count("\n\n") + 1 for text in paragraph_out if text)
+
+    print("📊 normalize_text (todas las páginas):")
+    print(f"   Anterior (5 re.sub):      {legacy_time*1000:8.1f} ms  ({total_chars / legacy_time / 1e6:6.1f} M car/s)")
+    print(f"   Fusionada:                {new_time*1000:8.1f} ms  ({total_chars / new_time / 1e6:6.1f} M car/s)")
+    print(f"   Aceleración:              {legacy_time / max(new_time, 1e-9):8.1f}x")
+    print(f"   Salida idéntica:          {'✅' if not mismatches else f'❌ {len(mismatches)} páginas'}")
+    print(f"   preserve_paragraphs:      {'✅' if not paragraph_mismatches else f'❌ {len(paragraph_mismatches)} páginas'}"
+          f" ({num_paragraphs:,} párrafos conservados)")
+
+    for i in mismatches[:3]:
+        print(f"\n   ❌ Página {i}:\n      anterior: {legacy_out[i][:120]!r}\n      fusionada: {new_out[i][:120]!r}")
+
+    return 0 if not mismatches and not paragraph_mismatches else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
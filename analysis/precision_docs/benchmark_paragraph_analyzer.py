@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Equivalencia y benchmark de analyze_paragraph de process_plans_v7.
+
+Compara la implementación anterior (identify_primary_pillar + check_existence,
+check_when, check_how y check_funding, cada una con un re.search por patrón) con
+analyze_paragraph (autómata de pilares + IndicatorMatcher con prefiltro literal) sobre
+todos los párrafos candidatos de planes/. Verifica que el pilar, `dimensions` y
+`extracted_fields` son idénticos, y que la primera coincidencia de cada dimensión
+(patrón y posición) es la misma en todos los párrafos, tengan pilar o no.
+"""
+
+import sys
+import re
+
+from benchmark_common import legacy_identify_primary_pillar, load_paragraphs, time_function
+from process_plans_v7 import (
+    DIMENSION_MATCHER,
+    EXISTENCE_INDICATORS,
+    FUNDING_INDICATORS,
+    HOW_INDICATORS,
+    TIME_INDICATORS_VALID,
+    analyze_paragraph,
+)
+
+# Pasadas por medición (cada una recorre todos los párrafos)
+REPETITIONS = 3
+
+
+DIMENSION_INDICATORS = {
+    "existence": EXISTENCE_INDICATORS,
+    "when": TIME_INDICATORS_VALID,
+    "how": HOW_INDICATORS,
+    "funding": FUNDING_INDICATORS,
+}
+
+
+def legacy_first_match(text: str, patterns):
+    """Primer patrón que coincide, buscando uno por uno como antes: (índice, inicio, fin)."""
+    for i, pattern in enumerate(patterns):
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            return i, match.start(), match.end()
+    return None
+
+
+def legacy_context(text: str, patterns) -> str:
+    for pattern in patterns:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            start = max(0, match.start() - 10)
+            end = min(len(text), match.end() + 50)
+            return text[start:end].strip()[:100]
+    return "no_especificado"
+
+
+def legacy_analyze_paragraph(paragraph: str):
+    """Copia de referencia del cuerpo anterior de extract_best_proposal_per_pillar."""
+    pillar_id = legacy_identify_primary_pillar(paragraph)
+    if not pillar_id:
+        return None
+    if not any(re.search(pattern, paragraph, re.IGNORECASE) for pattern in EXISTENCE_INDICATORS):
+        return None
+
+    when_text = "no_especificado"
+    for pattern in TIME_INDICATORS_VALID:
+        match = re.search(pattern, paragraph, re.IGNORECASE)
+        if match:
+            when_text = match.group(0).strip()
+            break
+    how_text = legacy_context(paragraph, HOW_INDICATORS)
+    funding_text = legacy_context(paragraph, FUNDING_INDICATORS)
+
+    return {
+        "pillar_id": pillar_id,
+        "dimensions": {
+            "existence": 1,
+            "when": 1 if when_text != "no_especificado" else 0,
+            "how": 1 if how_text != "no_especificado" else 0,
+            "funding": 1 if funding_text != "no_especificado" else 0
+        },
+        "extracted_fields": {
+            "when_text": when_text,
+            "how_text": how_text,
+            "funding_text": funding_text
+        }
+    }
+
+
+def new_analyze_paragraph(paragraph: str):
+    analysis = analyze_paragraph(paragraph)
+    if analysis is None:
+        return None
+    return {key: analysis[key] for key in ("pillar_id", "dimensions", "extracted_fields")}
+
+
+def new_first_matches(paragraph: str):
+    matches = DIMENSION_MATCHER.first_matches(paragraph)
+    results = {}
+    for dimension, match in matches.items():
+        if match is None:
+            results[dimension] = None
+        else:
+            index = DIMENSION_MATCHER.patterns[dimension].index(match.re)
+            results[dimension] = (index, match.start(), match.end())
+    return results
+
+
+def main():
+    paragraphs = load_paragraphs()
+
+    print("=" * 60)
+    print("EQUIVALENCIA Y BENCHMARK DE analyze_paragraph")
+    print("=" * 60)
+    print(f"📄 {len(paragraphs):,} párrafos, backend del prefiltro: {DIMENSION_MATCHER.automaton.backend}")
+    print()
+
+    legacy_time, legacy_out = time_function(legacy_analyze_paragraph, paragraphs, REPETITIONS)
+    new_time, new_out = time_function(new_analyze_paragraph, paragraphs, REPETITIONS)
+    mismatches = [i for i, (old, new) in enumerate(zip(legacy_out, new_out)) if old != new]
+    proposals = sum(1 for analysis in new_out if analysis)
+
+    print(f"📊 Párrafo completo (pilar + dimensiones, {proposals:,} propuestas):")
+    print(f"   Anterior (re.search por patrón): {legacy_time*1000:8.1f} ms")
+    print(f"   analyze_paragraph:               {new_time*1000:8.1f} ms  ({legacy_time / max(new_time, 1e-9):.1f}x)")
+    print(f"   Salida idéntica:                 {'✅' if not mismatches else f'❌ {len(mismatches)} párrafos'}")
+    for i in mismatches[:3]:
+        print(f"   ❌ {paragraphs[i][:100]!r}\n      anterior: {legacy_out[i]}\n      nueva:    {new_out[i]}")
+    print()
+
+    # Las cuatro dimensiones en todos los párrafos (sin el corte por pilar y existencia)
+    legacy_dims_time, legacy_dims = time_function(
+        lambda paragraph: {
+            dimension: legacy_first_match(paragraph, patterns)
+            for dimension, patterns in DIMENSION_INDICATORS.items()
+        },
+        paragraphs,
+        REPETITIONS
+    )
+    new_dims_time, new_dims = time_function(new_first_matches, paragraphs, REPETITIONS)
+    dim_mismatches = [i for i, (old, new) in enumerate(zip(legacy_dims, new_dims)) if old != new]
+
+    print("📊 Primera coincidencia de las 4 dimensiones (todos los párrafos):")
+    print(f"   Anterior (re.search por patrón): {legacy_dims_time*1000:8.1f} ms")
+    print(f"   IndicatorMatcher:                {new_dims_time*1000:8.1f} ms  "
+          f"({legacy_dims_time / max(new_dims_time, 1e-9):.1f}x)")
+    print(f"   Patrón y posición idénticos:     {'✅' if not dim_mismatches else f'❌ {len(dim_mismatches)} párrafos'}")
+
+    return 0 if not mismatches and not dim_mismatches else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
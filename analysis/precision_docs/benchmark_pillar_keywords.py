@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Prueba dorada y benchmark de identify_primary_pillar con KeywordAutomaton.
+
+Compara la implementación anterior (`kw.lower() in text_lower` para cada palabra
+clave de cada pilar) con el autómata de keyword_automaton sobre todos los párrafos
+candidatos de planes/ (mismo corte que extract_best_proposal_per_pillar: páginas
+extraídas por process_plans_v7, párrafos de 50 caracteres o más). Verifica que el
+pilar asignado y los conteos por pilar son idénticos con cada backend disponible
+(pyahocorasick y la trie regex de respaldo).
+"""
+
+import sys
+
+from benchmark_common import legacy_identify_primary_pillar, legacy_pillar_scores, load_paragraphs, time_function
+import keyword_automaton
+import process_plans_v7
+from process_plans_v7 import PILLAR_KEYWORDS, identify_primary_pillar
+
+# Pasadas por medición (cada una recorre todos los párrafos)
+REPETITIONS = 3
+
+
+def main():
+    paragraphs = load_paragraphs()
+
+    print("=" * 60)
+    print("PRUEBA DORADA: identify_primary_pillar")
+    print("=" * 60)
+    total_chars = sum(len(paragraph) for paragraph in paragraphs)
+    print(f"📄 {len(paragraphs):,} párrafos, {total_chars / 1e6:.1f} M caracteres, "
+          f"{len(process_plans_v7.PILLAR_AUTOMATON.keywords)} palabras clave distintas")
+    print()
+
+    legacy_time, legacy_pillars = time_function(legacy_identify_primary_pillar, paragraphs, REPETITIONS)
+    legacy_scores = [legacy_pillar_scores(paragraph) for paragraph in paragraphs]
+    assigned = sum(1 for pillar_id in legacy_pillars if pillar_id)
+    print(f"📊 Anterior (búsqueda por palabra clave): {legacy_time*1000:8.1f} ms "
+          f"({assigned:,} párrafos con pilar)")
+
+    backends = [True, False] if keyword_automaton.AHOCORASICK_AVAILABLE else [False]
+    all_ok = True
+    # Se recompila el autómata de process_plans_v7 con cada backend y luego se restaura
+    ahocorasick_available = keyword_automaton.AHOCORASICK_AVAILABLE
+    automaton = process_plans_v7.PILLAR_AUTOMATON
+    try:
+        for use_ahocorasick in backends:
+            keyword_automaton.AHOCORASICK_AVAILABLE = use_ahocorasick
+            process_plans_v7.PILLAR_AUTOMATON = keyword_automaton.KeywordAutomaton(PILLAR_KEYWORDS)
+            backend = process_plans_v7.PILLAR_AUTOMATON.backend
+
+            new_time, new_pillars = time_function(identify_primary_pillar, paragraphs, REPETITIONS)
+            new_scores = [process_plans_v7.PILLAR_AUTOMATON.group_counts(paragraph) for paragraph in paragraphs]
+            pillar_mismatches = [i for i, (old, new) in enumerate(zip(legacy_pillars, new_pillars)) if old != new]
+            score_mismatches = [i for i, (old, new) in enumerate(zip(legacy_scores, new_scores)) if old != new]
+            all_ok = all_ok and not pillar_mismatches and not score_mismatches
+
+            print(f"📊 KeywordAutomaton ({backend}):{' ' * max(0, 15 - len(backend))}{new_time*1000:8.1f} ms "
+                  f"({legacy_time / max(new_time, 1e-9):.1f}x)")
+            print(f"   Pilar asignado idéntico:  {'✅' if not pillar_mismatches else f'❌ {len(pillar_mismatches)} párrafos'}")
+            print(f"   Conteos por pilar:        {'✅' if not score_mismatches else f'❌ {len(score_mismatches)} párrafos'}")
+            for i in pillar_mismatches[:3]:
+                print(f"   ❌ {legacy_pillars[i]} → {new_pillars[i]}: {paragraphs[i][:100]!r}")
+    finally:
+        keyword_automaton.AHOCORASICK_AVAILABLE = ahocorasick_available
+        process_plans_v7.PILLAR_AUTOMATON = automaton
+
+    return 0 if all_ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
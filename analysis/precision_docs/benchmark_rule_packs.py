@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de la carga de paquetes de reglas (rule_packs).
+
+Mide, en procesos nuevos (como una ejecución nueva de process_plans_v7), cuánto
+tarda cargar todos los paquetes de data/rules sin caché (validar, construir las
+tablas y compilar) y con la caché en disco (solo compilar las regex). Verifica que
+las tablas cargadas de la caché son las mismas que las recién construidas y que
+dentro de un proceso cada paquete se compila una sola vez: cargarlo de nuevo
+devuelve el mismo objeto mientras el JSON no cambie. La caché del benchmark está en
+una carpeta temporal (no toca data/cache/rules).
+"""
+
+import sys
+import json
+import tempfile
+
+from benchmark_common import REPETITIONS, fresh_process_output
+import rule_packs
+
+# Carga todos los paquetes en un proceso nuevo con la caché en cache_dir e imprime el tiempo en ms
+LOAD_SCRIPT = """
+import time
+import rule_packs
+rule_packs.RULES_CACHE_DIR = {cache_dir!r}
+start = time.perf_counter()
+for name in rule_packs.available_rule_packs():
+    rule_packs.load_rule_pack(name)
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def time_fresh_process(cache_dir: str) -> float:
+    """Tiempo (ms) de cargar todos los paquetes en un proceso nuevo con la caché en cache_dir."""
+    return float(fresh_process_output(LOAD_SCRIPT.format(cache_dir=cache_dir)))
+
+
+def main():
+    print("=" * 60)
+    print("BENCHMARK DE LA CARGA DE PAQUETES DE REGLAS")
+    print("=" * 60)
+    names = rule_packs.available_rule_packs()
+    print(f"📋 Paquetes: {', '.join(names)}")
+    print()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # Sin caché: una carpeta vacía nueva en cada pasada
+        cold = min(time_fresh_process(tempfile.mkdtemp(dir=cache_dir)) for _ in range(REPETITIONS))
+        warm_dir = tempfile.mkdtemp(dir=cache_dir)
+        time_fresh_process(warm_dir)  # la llena
+        warm = min(time_fresh_process(warm_dir) for _ in range(REPETITIONS))
+        print("📊 Cargar todos los paquetes en un proceso nuevo:")
+        print(f"   Sin caché (validar, construir y compilar): {cold:6.1f} ms")
+        print(f"   Con caché (solo re.compile):               {warm:6.1f} ms  ({cold / warm:.1f}x)")
+        print()
+
+        ok = True
+        rule_packs.RULES_CACHE_DIR = warm_dir
+        rule_packs.set_rule_cache(True)
+        for name in names:
+            # process_plans_v7 (importado por benchmark_common) ya cargó los paquetes
+            pack = rule_packs.load_rule_pack(name)
+            data, digest = rule_packs.read_rule_pack(name)
+            cached = rule_packs.load_cached_rule_pack(name, digest)
+            same_tables = cached is not None and (
+                json.dumps(cached.tables(), sort_keys=True)
+                == json.dumps(rule_packs.RulePack(name, data, digest).tables(), sort_keys=True)
+            )
+            reused = rule_packs.load_rule_pack(name) is pack
+            ok = ok and reused and same_tables
+            rules = sum(len(ids) for ids in pack.rule_ids.values())
+            print(f"   {'✅' if reused and same_tables else '❌'} {name}: {rules} reglas, "
+                  f"tablas de la caché {'idénticas' if same_tables else 'DISTINTAS'}, "
+                  f"segunda carga {'reutilizada' if reused else 'recompilada'}")
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
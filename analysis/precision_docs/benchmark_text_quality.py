@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Equivalencia y benchmark del perfil de calidad de texto (text_quality).
+
+Compara el bucle anterior de detect_corrupt_text (sum(1 for char in text if char
+in CORRUPT_CHARS)) con el conteo vectorizado de text_quality sobre el texto de
+todas las páginas de planes/ (PyMuPDF y, en las páginas corruptas, pdfplumber),
+con los conjuntos de caracteres de process_plans_v7 y de ocr_extractor*.py.
+Verifica que la proporción de caracteres corruptos es exactamente la misma (por
+página y por lotes con corrupt_ratios) y que las palabras y palabras vacías de
+profile_text coinciden con el conteo anterior con Counter. Mide también el perfil
+completo, el camino sin NumPy y el costo de la primera llamada en un proceso nuevo
+(construcción de tablas), con y sin alpha_ratio.
+"""
+
+import sys
+from collections import Counter
+
+from benchmark_common import fresh_process_output, load_raw_pages, time_batch, time_function
+import text_quality
+from ocr_extractor_v2 import CORRUPT_CHARS as EXTRACTOR_CORRUPT_CHARS
+from process_plans_v7 import CORRUPT_CHARS
+
+TARGET_SPEEDUP = 10
+
+# Primera llamada en un proceso nuevo: importar NumPy y construir las tablas pedidas
+FIRST_CALL_SCRIPT = """
+import time
+import text_quality
+text_quality._load_numpy()
+start = time.perf_counter()
+text_quality.profile_text("Texto de prueba", metrics={metrics!r})
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def legacy_corrupt_ratio(text: str, corrupt_chars) -> float:
+    """Copia de referencia del bucle anterior (un carácter por iteración)."""
+    if not text:
+        return 0.0
+    total_chars = len(text)
+    corrupt_count = sum(1 for char in text if char in corrupt_chars)
+    return corrupt_count / total_chars if total_chars > 0 else 0
+
+
+def legacy_word_stats(text: str):
+    """Copia de referencia del conteo anterior de palabras vacías (Counter por palabra)."""
+    counts = Counter(text.lower().split())
+    words = sum(counts.values())
+    if not words:
+        return 0, 0.0
+    stopwords = sum(
+        count for word, count in counts.items()
+        if word.strip(text_quality.WORD_PUNCTUATION) in text_quality.SPANISH_STOPWORDS
+    )
+    return words, stopwords / words
+
+
+def first_call_ms(metrics) -> float:
+    return float(fresh_process_output(FIRST_CALL_SCRIPT.format(metrics=tuple(metrics))))
+
+
+def main():
+    print("=" * 60)
+    print("EQUIVALENCIA Y BENCHMARK DE text_quality")
+    print("=" * 60)
+
+    pages = [text for text, _ in load_raw_pages()]
+    total_chars = sum(len(text) for text in pages)
+    print(f"📄 {len(pages)} páginas, {total_chars / 1e6:.1f} M caracteres "
+          f"(NumPy: {'sí' if text_quality.NUMPY_AVAILABLE else 'no'})")
+    print()
+
+    all_ok = True
+    for label, corrupt_chars in [("process_plans_v7", CORRUPT_CHARS), ("ocr_extractor*", EXTRACTOR_CORRUPT_CHARS)]:
+        text_quality.corrupt_ratio("", corrupt_chars)  # tablas precalculadas fuera de la medición
+        text_quality.profile_text("x", corrupt_chars)
+        legacy_time, legacy_out = time_function(lambda text: legacy_corrupt_ratio(text, corrupt_chars), pages)
+        new_time, new_out = time_function(lambda text: text_quality.corrupt_ratio(text, corrupt_chars), pages)
+        batch_time, batch_out = time_batch(lambda pages: text_quality.corrupt_ratios(pages, corrupt_chars), pages)
+        profile_time, profiles = time_function(lambda text: text_quality.profile_text(text, corrupt_chars), pages)
+        char_metrics = [metric for metric in text_quality.PROFILE_METRICS if metric != "stopword_ratio"]
+        char_profile_time, _ = time_function(
+            lambda text: text_quality.profile_text(text, corrupt_chars, char_metrics), pages
+        )
+        identical = legacy_out == new_out == batch_out and [profile["corrupt_ratio"] for profile in profiles] == new_out
+        all_ok = all_ok and identical
+        corrupt_pages = sum(1 for ratio in new_out if ratio > text_quality.CORRUPT_THRESHOLD)
+        print(f"📊 Caracteres corruptos de {label} ({corrupt_pages} páginas > {text_quality.CORRUPT_THRESHOLD:.0%}):")
+        print(f"   Anterior (bucle por carácter): {legacy_time*1000:8.1f} ms")
+        print(f"   Vectorizado, por página:       {new_time*1000:8.1f} ms  ({legacy_time / max(new_time, 1e-9):.1f}x)")
+        print(f"   Vectorizado, por lotes:        {batch_time*1000:8.1f} ms  ({legacy_time / max(batch_time, 1e-9):.1f}x)")
+        print(f"   Perfil completo (5 métricas):  {profile_time*1000:8.1f} ms")
+        print(f"   Perfil sin stopword_ratio:     {char_profile_time*1000:8.1f} ms")
+        print(f"   Proporción idéntica:           {'✅' if identical else '❌'}")
+        print(f"   Objetivo {TARGET_SPEEDUP}x (por lotes):        "
+              f"{'✅' if legacy_time / max(batch_time, 1e-9) >= TARGET_SPEEDUP else '❌'}")
+        print()
+
+    # Palabras y palabras vacías del perfil contra el conteo anterior con Counter
+    legacy_words_time, legacy_words = time_function(legacy_word_stats, pages)
+    words_time, words_out = time_function(text_quality.word_stats, pages)
+    words_ok = legacy_words == words_out
+    all_ok = all_ok and words_ok
+    print("📊 Palabras vacías (stopword_ratio):")
+    print(f"   Anterior (Counter):            {legacy_words_time*1000:8.1f} ms")
+    print(f"   word_stats (map en C):         {words_time*1000:8.1f} ms  "
+          f"({legacy_words_time / max(words_time, 1e-9):.1f}x)")
+    print(f"   Resultado idéntico:            {'✅' if words_ok else '❌'}")
+    print()
+
+    print("📊 Primera llamada en un proceso nuevo (tablas):")
+    print(f"   Solo corrupt_ratio:            {first_call_ms(['corrupt_ratio']):8.1f} ms")
+    print(f"   Perfil completo:               {first_call_ms(text_quality.PROFILE_METRICS):8.1f} ms")
+    print()
+
+    # Camino sin NumPy (str.count por carácter)
+    numpy_available = text_quality.NUMPY_AVAILABLE
+    text_quality.NUMPY_AVAILABLE = False
+    try:
+        fallback_time, fallback_out = time_function(lambda text: text_quality.corrupt_ratio(text, CORRUPT_CHARS), pages)
+    finally:
+        text_quality.NUMPY_AVAILABLE = numpy_available
+    fallback_ok = fallback_out == [legacy_corrupt_ratio(text, CORRUPT_CHARS) for text in pages]
+    all_ok = all_ok and fallback_ok
+    print("📊 Sin NumPy (str.count):")
+    print(f"   Tiempo:                        {fallback_time*1000:8.1f} ms")
+    print(f"   Proporción idéntica:           {'✅' if fallback_ok else '❌'}")
+    print()
+
+    # Resumen del perfil sobre el corpus
+    profiles = [text_quality.profile_text(text) for text in pages if text]
+    for metric in ("corrupt_ratio", "pua_ratio", "cid_density", "alpha_ratio", "stopword_ratio"):
+        values = sorted(profile[metric] for profile in profiles)
+        print(f"   {metric:<15} mediana {values[len(values) // 2]:.3f}   máx {values[-1]:.3f}")
+
+    return 0 if all_ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,22 +2,33 @@
 # -*- coding: utf-8 -*-
 """
 Script de comparación de motores OCR
-Compara Tesseract, EasyOCR y PaddleOCR para evaluar fidelidad de extracción
+Compara Tesseract, EasyOCR (página por página y por lotes) y PaddleOCR para evaluar
+fidelidad de extracción y rendimiento (páginas por minuto en CPU)
+
+Las páginas se leen de la caché de renders (analysis/render_cache.py): cada página se
+renderiza una sola vez para todos los motores y ejecuciones.
 """
 
 import fitz  # PyMuPDF
-from PIL import Image
-import io
 import os
+import sys
 import time
 from typing import List, Tuple, Dict
 import json
 
+# Agregar el directorio analysis/ al path (desde precision_docs)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(script_dir)  # Subir un nivel a analysis/
+sys.path.insert(0, parent_dir)
+
+import render_cache
+
 # ====================================================================
 # CONFIGURACIÓN
 # ====================================================================
 
 RENDER_DPI = 300  # Aumentado para mejor calidad
+EASYOCR_BATCH_SIZE = 8  # Páginas por lote para readtext_batched
 
 # ====================================================================
 # TESSERACT (Actual)
@@ -40,10 +51,7 @@ def extract_with_tesseract(pdf_path: str, max_pages: int = None) -> Tuple[List[T
         
         for page_num in range(pages_to_process):
             page = doc[page_num]
-            mat = fitz.Matrix(RENDER_DPI / 72, RENDER_DPI / 72)
-            pix = page.get_pixmap(matrix=mat)
-            img_data = pix.tobytes("png")
-            img = Image.open(io.BytesIO(img_data))
+            img = render_cache.render_page_image(page, RENDER_DPI)
             
             text = pytesseract.image_to_string(img, config='--oem 3 --psm 6 -l spa')
             
@@ -88,10 +96,7 @@ def extract_with_easyocr(pdf_path: str, max_pages: int = None) -> Tuple[List[Tup
         
         for page_num in range(pages_to_process):
             page = doc[page_num]
-            mat = fitz.Matrix(RENDER_DPI / 72, RENDER_DPI / 72)
-            pix = page.get_pixmap(matrix=mat)
-            img_data = pix.tobytes("png")
-            img = Image.open(io.BytesIO(img_data))
+            img = render_cache.render_page_image(page, RENDER_DPI)
             
             # Convertir PIL Image a numpy array
             import numpy as np
@@ -115,6 +120,60 @@ def extract_with_easyocr(pdf_path: str, max_pages: int = None) -> Tuple[List[Tup
     
     return pages, elapsed
 
+def extract_with_easyocr_batched(
+    pdf_path: str,
+    max_pages: int = None,
+    batch_size: int = EASYOCR_BATCH_SIZE
+) -> Tuple[List[Tuple[int, str]], float]:
+    """
+    Extrae texto usando EasyOCR por lotes (readtext_batched): la detección procesa
+    varias páginas por llamada y el reconocimiento usa lotes de batch_size cajas.
+    """
+    try:
+        import easyocr
+        import numpy as np
+    except ImportError:
+        print("  ⚠️  EasyOCR no instalado. Instalar: pip install easyocr")
+        return [], 0.0
+    
+    pages = []
+    start_time = time.time()
+    
+    try:
+        reader = easyocr.Reader(['es', 'en'], gpu=False)  # Español + Inglés
+    except Exception as e:
+        print(f"  ❌ Error inicializando EasyOCR: {e}")
+        return [], 0.0
+    
+    try:
+        doc = fitz.open(pdf_path)
+        total_pages = len(doc)
+        pages_to_process = min(max_pages or total_pages, total_pages)
+        
+        for batch_start in range(0, pages_to_process, batch_size):
+            # Agrupar por tamaño: readtext_batched requiere imágenes del mismo tamaño
+            groups = {}
+            for page_num in range(batch_start, min(batch_start + batch_size, pages_to_process)):
+                pix = render_cache.render_page(doc[page_num], RENDER_DPI, grayscale=True)
+                img_array = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.stride)[:, :pix.width]
+                groups.setdefault(img_array.shape, []).append((page_num, img_array))
+            
+            for group in groups.values():
+                results = reader.readtext_batched([img for _, img in group], batch_size=batch_size)
+                for (page_num, _), page_results in zip(group, results):
+                    text = "\n".join([result[1] for result in page_results])
+                    if text.strip():
+                        pages.append((page_num + 1, text.strip()))
+        
+        doc.close()
+        elapsed = time.time() - start_time
+        
+    except Exception as e:
+        print(f"  ❌ Error EasyOCR por lotes: {e}")
+        elapsed = time.time() - start_time
+    
+    return sorted(pages), elapsed
+
 # ====================================================================
 # PADDLEOCR (Alternativa 2 - Mayor precisión)
 # ====================================================================
@@ -144,10 +203,7 @@ def extract_with_paddleocr(pdf_path: str, max_pages: int = None) -> Tuple[List[T
         
         for page_num in range(pages_to_process):
             page = doc[page_num]
-            mat = fitz.Matrix(RENDER_DPI / 72, RENDER_DPI / 72)
-            pix = page.get_pixmap(matrix=mat)
-            img_data = pix.tobytes("png")
-            img = Image.open(io.BytesIO(img_data))
+            img = render_cache.render_page_image(page, RENDER_DPI)
             
             # Convertir PIL Image a numpy array
             import numpy as np
@@ -181,10 +237,29 @@ def extract_with_paddleocr(pdf_path: str, max_pages: int = None) -> Tuple[List[T
 # COMPARACIÓN
 # ====================================================================
 
-def compare_ocr_engines(pdf_path: str, output_dir: str = None, max_pages: int = None) -> Dict:
-    """Compara los tres motores OCR y genera reporte."""
+def engine_summary(pages: List[Tuple[int, str]], elapsed: float, pages_processed: int) -> Dict:
+    """Métricas de un motor: páginas con texto, caracteres, tiempo y páginas por minuto."""
+    text = " ".join([text for _, text in pages])
+    return {
+        "pages": len(pages),
+        "characters": len(text),
+        "time_seconds": round(elapsed, 2),
+        "time_per_page": round(elapsed / len(pages) if pages else 0, 2),
+        "pages_per_minute": round(pages_processed / elapsed * 60 if elapsed > 0 and pages else 0, 2)
+    }
+
+
+def compare_ocr_engines(
+    pdf_path: str,
+    output_dir: str = None,
+    max_pages: int = None,
+    batch_size: int = EASYOCR_BATCH_SIZE
+) -> Dict:
+    """Compara los motores OCR y genera reporte."""
     
     pdf_name = os.path.basename(pdf_path)
+    with fitz.open(pdf_path) as doc:
+        pages_processed = min(max_pages or len(doc), len(doc))
     print(f"\n{'='*60}")
     print(f"Comparando motores OCR: {pdf_name}")
     if max_pages:
@@ -194,8 +269,10 @@ def compare_ocr_engines(pdf_path: str, output_dir: str = None, max_pages: int =
     results = {
         "pdf": pdf_name,
         "max_pages": max_pages,
+        "batch_size": batch_size,
         "tesseract": {},
         "easyocr": {},
+        "easyocr_batched": {},
         "paddleocr": {}
     }
     
@@ -203,36 +280,28 @@ def compare_ocr_engines(pdf_path: str, output_dir: str = None, max_pages: int =
     print("📸 Tesseract OCR (actual)...")
     tesseract_pages, tesseract_time = extract_with_tesseract(pdf_path, max_pages)
     tesseract_text = " ".join([text for _, text in tesseract_pages])
-    results["tesseract"] = {
-        "pages": len(tesseract_pages),
-        "characters": len(tesseract_text),
-        "time_seconds": round(tesseract_time, 2),
-        "time_per_page": round(tesseract_time / len(tesseract_pages) if tesseract_pages else 0, 2)
-    }
+    results["tesseract"] = engine_summary(tesseract_pages, tesseract_time, pages_processed)
     print(f"  ✅ {len(tesseract_pages)} páginas en {tesseract_time:.2f}s")
     
     # EasyOCR
     print("\n📸 EasyOCR (alternativa 1)...")
     easyocr_pages, easyocr_time = extract_with_easyocr(pdf_path, max_pages)
     easyocr_text = " ".join([text for _, text in easyocr_pages])
-    results["easyocr"] = {
-        "pages": len(easyocr_pages),
-        "characters": len(easyocr_text),
-        "time_seconds": round(easyocr_time, 2),
-        "time_per_page": round(easyocr_time / len(easyocr_pages) if easyocr_pages else 0, 2)
-    }
+    results["easyocr"] = engine_summary(easyocr_pages, easyocr_time, pages_processed)
     print(f"  ✅ {len(easyocr_pages)} páginas en {easyocr_time:.2f}s")
     
+    # EasyOCR por lotes
+    print(f"\n📸 EasyOCR por lotes ({batch_size} páginas por lote)...")
+    easyocr_batched_pages, easyocr_batched_time = extract_with_easyocr_batched(pdf_path, max_pages, batch_size)
+    easyocr_batched_text = " ".join([text for _, text in easyocr_batched_pages])
+    results["easyocr_batched"] = engine_summary(easyocr_batched_pages, easyocr_batched_time, pages_processed)
+    print(f"  ✅ {len(easyocr_batched_pages)} páginas en {easyocr_batched_time:.2f}s")
+    
     # PaddleOCR
     print("\n📸 PaddleOCR (alternativa 2 - mayor precisión)...")
     paddleocr_pages, paddleocr_time = extract_with_paddleocr(pdf_path, max_pages)
     paddleocr_text = " ".join([text for _, text in paddleocr_pages])
-    results["paddleocr"] = {
-        "pages": len(paddleocr_pages),
-        "characters": len(paddleocr_text),
-        "time_seconds": round(paddleocr_time, 2),
-        "time_per_page": round(paddleocr_time / len(paddleocr_pages) if paddleocr_pages else 0, 2)
-    }
+    results["paddleocr"] = engine_summary(paddleocr_pages, paddleocr_time, pages_processed)
     print(f"  ✅ {len(paddleocr_pages)} páginas en {paddleocr_time:.2f}s")
     
     # Guardar textos para comparación manual
@@ -244,6 +313,7 @@ def compare_ocr_engines(pdf_path: str, output_dir: str = None, max_pages: int =
         for engine, pages, text in [
             ("tesseract", tesseract_pages, tesseract_text),
             ("easyocr", easyocr_pages, easyocr_text),
+            ("easyocr_batched", easyocr_batched_pages, easyocr_batched_text),
             ("paddleocr", paddleocr_pages, paddleocr_text)
         ]:
             output_file = os.path.join(output_dir, f"{base_name}_{engine}.txt")
@@ -264,16 +334,18 @@ def compare_ocr_engines(pdf_path: str, output_dir: str = None, max_pages: int =
     print(f"\n{'='*60}")
     print("RESUMEN DE COMPARACIÓN")
     print(f"{'='*60}")
-    print(f"{'Motor':<15} {'Páginas':<10} {'Caracteres':<12} {'Tiempo':<10} {'s/página':<10}")
-    print("-" * 60)
+    print(f"{'Motor':<17} {'Páginas':<10} {'Caracteres':<12} {'Tiempo':<10} {'s/página':<10} {'pág/min':<10}")
+    print("-" * 70)
     for engine_name, engine_data in [
         ("Tesseract", results["tesseract"]),
         ("EasyOCR", results["easyocr"]),
+        ("EasyOCR (lotes)", results["easyocr_batched"]),
         ("PaddleOCR", results["paddleocr"])
     ]:
         if engine_data.get("pages", 0) > 0:
-            print(f"{engine_name:<15} {engine_data['pages']:<10} {engine_data['characters']:<12} "
-                  f"{engine_data['time_seconds']:<10.2f} {engine_data['time_per_page']:<10.2f}")
+            print(f"{engine_name:<17} {engine_data['pages']:<10} {engine_data['characters']:<12} "
+                  f"{engine_data['time_seconds']:<10.2f} {engine_data['time_per_page']:<10.2f} "
+                  f"{engine_data['pages_per_minute']:<10.2f}")
     
     return results
 
@@ -282,13 +354,16 @@ if __name__ == "__main__":
     import argparse
     
     parser = argparse.ArgumentParser(
-        description='Compara motores OCR: Tesseract, EasyOCR, PaddleOCR'
+        description='Compara motores OCR: Tesseract, EasyOCR (por página y por lotes), PaddleOCR'
     )
     parser.add_argument('pdf_path', help='Ruta al PDF a comparar (relativa desde analysis/ o absoluta)')
     parser.add_argument('--output', '-o', help='Directorio para guardar resultados', default='ocr_comparison_results')
     parser.add_argument('--max-pages', '-n', type=int, help='Número máximo de páginas a procesar (muestra)', default=None)
+    parser.add_argument('--batch-size', '-b', type=int, help='Páginas por lote de EasyOCR', default=EASYOCR_BATCH_SIZE)
+    parser.add_argument('--no-render-cache', action='store_true', help='Renderizar siempre (sin data/cache/renders)')
     
     args = parser.parse_args()
+    render_cache.set_render_cache(not args.no_render_cache)
     
     # Si la ruta no existe, intentar con ../planes/ (desde precision_docs)
     if not os.path.exists(args.pdf_path):
@@ -300,4 +375,4 @@ if __name__ == "__main__":
             print(f"   Intentado también: {alt_path}")
             exit(1)
     
-    compare_ocr_engines(args.pdf_path, args.output, args.max_pages)
+    compare_ocr_engines(args.pdf_path, args.output, args.max_pages, args.batch_size)
@@ -21,6 +21,14 @@ import re
 import argparse
 from typing import List, Tuple, Optional
 
+# Agregar el directorio analysis/ al path (desde precision_docs)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(script_dir)  # Subir un nivel a analysis/
+sys.path.insert(0, parent_dir)
+
+import ocr_cache
+import text_quality
+
 # ====================================================================
 # CONFIGURACIÓN
 # ====================================================================
@@ -48,14 +56,7 @@ def detect_corrupt_text(text: str) -> Tuple[bool, float]:
     Returns:
         Tuple[bool, float]: (es_corrupto, porcentaje_caracteres_corruptos)
     """
-    if not text:
-        return False, 0.0
-    
-    total_chars = len(text)
-    corrupt_count = sum(1 for char in text if char in CORRUPT_CHARS)
-    corrupt_ratio = corrupt_count / total_chars if total_chars > 0 else 0
-    
-    return corrupt_ratio > CORRUPT_THRESHOLD, corrupt_ratio
+    return text_quality.detect_corrupt_text(text, CORRUPT_CHARS, CORRUPT_THRESHOLD)
 
 
 def check_pdf_for_corruption(pdf_path: str) -> Tuple[bool, float, List[int]]:
@@ -68,19 +69,12 @@ def check_pdf_for_corruption(pdf_path: str) -> Tuple[bool, float, List[int]]:
     doc = None
     try:
         doc = fitz.open(pdf_path)
-        corrupt_pages = []
-        total_ratio = 0.0
         num_pages = len(doc)
         
-        for page_num in range(num_pages):
-            page = doc[page_num]
-            text = page.get_text()
-            
-            is_corrupt, ratio = detect_corrupt_text(text)
-            total_ratio += ratio
-            
-            if is_corrupt:
-                corrupt_pages.append(page_num + 1)
+        # Todas las páginas en una sola pasada vectorizada
+        ratios = text_quality.corrupt_ratios((page.get_text() for page in doc), CORRUPT_CHARS)
+        corrupt_pages = [page_num + 1 for page_num, ratio in enumerate(ratios) if ratio > CORRUPT_THRESHOLD]
+        total_ratio = sum(ratios)
         
         avg_ratio = total_ratio / num_pages if num_pages > 0 else 0
         is_corrupt_result = len(corrupt_pages) > 0
@@ -120,6 +114,14 @@ def check_directory_for_corruption(directory: str) -> dict:
 # FUNCIONES DE OCR
 # ====================================================================
 
+def ocr_image(img: Image.Image) -> str:
+    """Aplica Tesseract a la imagen; una imagen idéntica ya reconocida se lee de la caché OCR."""
+    return ocr_cache.cached_ocr(
+        img, "pytesseract", "spa", {"config": TESSERACT_CONFIG},
+        lambda: pytesseract.image_to_string(img, config=TESSERACT_CONFIG)
+    )
+
+
 def extract_text_with_ocr(pdf_path: str, dpi: int = RENDER_DPI) -> List[Tuple[int, str]]:
     """
     Extrae texto de un PDF usando OCR.
@@ -148,7 +150,7 @@ def extract_text_with_ocr(pdf_path: str, dpi: int = RENDER_DPI) -> List[Tuple[in
             img = Image.open(io.BytesIO(img_data))
             
             # Aplicar OCR
-            text = pytesseract.image_to_string(img, config=TESSERACT_CONFIG)
+            text = ocr_image(img)
             
             # Normalizar texto
             text = normalize_text(text)
@@ -200,7 +202,7 @@ def extract_text_hybrid(pdf_path: str) -> List[Tuple[int, str]]:
                 pix = page.get_pixmap(matrix=mat)
                 img_data = pix.tobytes("png")
                 img = Image.open(io.BytesIO(img_data))
-                text = pytesseract.image_to_string(img, config=TESSERACT_CONFIG)
+                text = ocr_image(img)
                 ocr_count += 1
             
             # Normalizar texto
@@ -297,8 +299,14 @@ def main():
         '--output',
         help='Archivo de salida para el texto extraído'
     )
+    parser.add_argument(
+        '--no-ocr-cache',
+        action='store_true',
+        help='Reconocer siempre las páginas (sin data/cache/ocr)'
+    )
     
     args = parser.parse_args()
+    ocr_cache.set_ocr_cache(not args.no_ocr_cache)
     
     if os.path.isdir(args.path):
         # Procesar directorio
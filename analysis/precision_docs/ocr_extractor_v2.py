@@ -3,17 +3,29 @@
 """
 OCR Extractor v2 - Con soporte para múltiples motores OCR
 Versión mejorada con EasyOCR y PaddleOCR como alternativas a Tesseract
+
+Las páginas se renderizan a través de la caché de renders y el texto de cada imagen
+se guarda en la caché OCR (analysis/ocr_cache.py): una página idéntica píxel a píxel
+no se vuelve a reconocer, aunque venga de otra revisión del PDF.
 """
 
 import fitz  # PyMuPDF
 from PIL import Image
-import io
 import os
 import sys
 import re
 import argparse
 from typing import List, Tuple, Optional, Literal
 
+# Agregar el directorio analysis/ al path (desde precision_docs)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(script_dir)  # Subir un nivel a analysis/
+sys.path.insert(0, parent_dir)
+
+import ocr_cache
+import text_quality
+import render_cache
+
 # ====================================================================
 # CONFIGURACIÓN
 # ====================================================================
@@ -28,20 +40,21 @@ RENDER_DPI = 300  # Aumentado de 200 para mejor calidad
 # Motor OCR por defecto
 DEFAULT_OCR_ENGINE = "tesseract"  # "tesseract", "easyocr", "paddleocr"
 
+# Tesseract
+TESSERACT_LANGUAGE = 'spa'
+TESSERACT_CONFIG = f'--oem 3 --psm 6 -l {TESSERACT_LANGUAGE}'
+# Backend de Tesseract: "pytesseract" (un proceso por página), "tesserocr" (motor
+# cargado una vez en el propio proceso) o "mupdf" (Tesseract integrado en PyMuPDF)
+TESSERACT_BACKENDS = ("pytesseract", "tesserocr", "mupdf")
+DEFAULT_TESSERACT_BACKEND = "pytesseract"
+
 # ====================================================================
 # DETECCIÓN DE CORRUPCIÓN
 # ====================================================================
 
 def detect_corrupt_text(text: str) -> Tuple[bool, float]:
     """Detecta si un texto tiene caracteres de fuentes corruptas."""
-    if not text:
-        return False, 0.0
-    
-    total_chars = len(text)
-    corrupt_count = sum(1 for char in text if char in CORRUPT_CHARS)
-    corrupt_ratio = corrupt_count / total_chars if total_chars > 0 else 0
-    
-    return corrupt_ratio > CORRUPT_THRESHOLD, corrupt_ratio
+    return text_quality.detect_corrupt_text(text, CORRUPT_CHARS, CORRUPT_THRESHOLD)
 
 # ====================================================================
 # EXTRACCIÓN CON TESSERACT (Actual)
@@ -51,7 +64,10 @@ def extract_with_tesseract(img: Image.Image) -> str:
     """Extrae texto usando Tesseract OCR."""
     try:
         import pytesseract
-        text = pytesseract.image_to_string(img, config='--oem 3 --psm 6 -l spa')
+        text = ocr_cache.cached_ocr(
+            img, "pytesseract", TESSERACT_LANGUAGE, {"config": TESSERACT_CONFIG},
+            lambda: pytesseract.image_to_string(img, config=TESSERACT_CONFIG)
+        )
         return text
     except ImportError:
         raise ImportError("pytesseract no instalado. Instalar: pip install pytesseract")
@@ -59,6 +75,37 @@ def extract_with_tesseract(img: Image.Image) -> str:
         print(f"  ⚠️  Error Tesseract: {e}")
         return ""
 
+
+def extract_with_tesserocr(pix: fitz.Pixmap, api) -> str:
+    """Extrae texto con la API C de Tesseract (tesserocr) directamente del pixmap."""
+    def recognize() -> str:
+        samples = pix.samples  # Tesseract no copia el buffer
+        api.SetImageBytes(samples, pix.width, pix.height, pix.n, pix.stride)
+        text = api.GetUTF8Text()
+        api.Clear()
+        return text
+    
+    try:
+        return ocr_cache.cached_ocr(pix, "tesserocr", TESSERACT_LANGUAGE, {"oem": 3, "psm": 6}, recognize)
+    except Exception as e:
+        print(f"  ⚠️  Error Tesseract (tesserocr): {e}")
+        return ""
+
+
+def extract_with_mupdf_tesseract(pix: fitz.Pixmap, dpi: int) -> str:
+    """Extrae texto con el Tesseract integrado en PyMuPDF (sin PNG ni archivos temporales)."""
+    def recognize() -> str:
+        pix.set_dpi(dpi, dpi)
+        ocr_pdf = pix.pdfocr_tobytes(compress=False, language=TESSERACT_LANGUAGE)
+        with fitz.open("pdf", ocr_pdf) as ocr_doc:
+            return ocr_doc[0].get_text()
+    
+    try:
+        return ocr_cache.cached_ocr(pix, "mupdf", TESSERACT_LANGUAGE, {"dpi": dpi}, recognize)
+    except Exception as e:
+        print(f"  ⚠️  Error Tesseract (mupdf): {e}")
+        return ""
+
 # ====================================================================
 # EXTRACCIÓN CON EASYOCR (Alternativa 1)
 # ====================================================================
@@ -73,14 +120,17 @@ def extract_with_easyocr(img: Image.Image, reader=None) -> str:
         if reader is None:
             reader = easyocr.Reader(['es', 'en'], gpu=False)
         
-        # Convertir PIL Image a numpy array
-        img_array = np.array(img)
-        
-        # EasyOCR retorna lista de tuplas: (bbox, text, confidence)
-        results = reader.readtext(img_array)
+        def recognize() -> str:
+            # Convertir PIL Image a numpy array
+            img_array = np.array(img)
+            
+            # EasyOCR retorna lista de tuplas: (bbox, text, confidence)
+            results = reader.readtext(img_array)
+            
+            # Combinar todos los textos detectados
+            return "\n".join([result[1] for result in results])
         
-        # Combinar todos los textos detectados
-        text = "\n".join([result[1] for result in results])
+        text = ocr_cache.cached_ocr(img, "easyocr", ['es', 'en'], {"output": "text"}, recognize)
         
         return text
     except ImportError:
@@ -103,20 +153,23 @@ def extract_with_paddleocr(img: Image.Image, ocr=None) -> str:
         if ocr is None:
             ocr = PaddleOCR(use_angle_cls=True, lang='es', use_gpu=False)
         
-        # Convertir PIL Image a numpy array
-        img_array = np.array(img)
-        
-        # PaddleOCR retorna lista de listas: [[bbox, (text, confidence)], ...]
-        results = ocr.ocr(img_array, cls=True)
-        
-        # Extraer textos
-        text_lines = []
-        if results and results[0]:
-            for line in results[0]:
-                if line and len(line) >= 2:
-                    text_lines.append(line[1][0])  # text está en [1][0]
+        def recognize() -> str:
+            # Convertir PIL Image a numpy array
+            img_array = np.array(img)
+            
+            # PaddleOCR retorna lista de listas: [[bbox, (text, confidence)], ...]
+            results = ocr.ocr(img_array, cls=True)
+            
+            # Extraer textos
+            text_lines = []
+            if results and results[0]:
+                for line in results[0]:
+                    if line and len(line) >= 2:
+                        text_lines.append(line[1][0])  # text está en [1][0]
+            
+            return "\n".join(text_lines)
         
-        text = "\n".join(text_lines)
+        text = ocr_cache.cached_ocr(img, "paddleocr", 'es', {"use_angle_cls": True}, recognize)
         
         return text
     except ImportError:
@@ -132,7 +185,8 @@ def extract_with_paddleocr(img: Image.Image, ocr=None) -> str:
 def extract_text_with_ocr(
     pdf_path: str, 
     engine: Literal["tesseract", "easyocr", "paddleocr"] = DEFAULT_OCR_ENGINE,
-    dpi: int = RENDER_DPI
+    dpi: int = RENDER_DPI,
+    tesseract_backend: Literal["pytesseract", "tesserocr", "mupdf"] = DEFAULT_TESSERACT_BACKEND
 ) -> List[Tuple[int, str]]:
     """
     Extrae texto de un PDF usando el motor OCR especificado.
@@ -141,17 +195,28 @@ def extract_text_with_ocr(
         pdf_path: Ruta al PDF
         engine: Motor OCR a usar ("tesseract", "easyocr", "paddleocr")
         dpi: Resolución para renderizar páginas
+        tesseract_backend: Backend de Tesseract ("pytesseract", "tesserocr", "mupdf")
     
     Returns:
         Lista de (número_página, texto)
     """
     pages = []
     
-    # Inicializar motor OCR una sola vez (para EasyOCR y PaddleOCR)
+    # Inicializar motor OCR una sola vez (para EasyOCR, PaddleOCR y tesserocr)
     reader = None
     ocr = None
+    tess_api = None
+    
+    if engine == "tesseract" and tesseract_backend == "tesserocr":
+        try:
+            from tesserocr import PyTessBaseAPI
+            tess_api = PyTessBaseAPI(lang=TESSERACT_LANGUAGE, oem=3, psm=6)
+            print(f"  ✅ Tesseract (tesserocr) inicializado")
+        except Exception as e:
+            print(f"  ❌ Error inicializando tesserocr: {e}")
+            return []
     
-    if engine == "easyocr":
+    elif engine == "easyocr":
         try:
             import easyocr
             reader = easyocr.Reader(['es', 'en'], gpu=False)
@@ -173,26 +238,31 @@ def extract_text_with_ocr(
         doc = fitz.open(pdf_path)
         total_pages = len(doc)
         
-        print(f"  📄 Procesando {total_pages} páginas con {engine.upper()}...")
+        engine_label = engine.upper()
+        if engine == "tesseract":
+            engine_label += f" ({tesseract_backend})"
+        print(f"  📄 Procesando {total_pages} páginas con {engine_label}...")
         
         for page_num in range(total_pages):
             page = doc[page_num]
             
-            # Renderizar página como imagen
-            mat = fitz.Matrix(dpi / 72, dpi / 72)
-            pix = page.get_pixmap(matrix=mat)
-            img_data = pix.tobytes("png")
-            img = Image.open(io.BytesIO(img_data))
-            
-            # Aplicar OCR según motor seleccionado
-            if engine == "tesseract":
-                text = extract_with_tesseract(img)
-            elif engine == "easyocr":
-                text = extract_with_easyocr(img, reader)
-            elif engine == "paddleocr":
-                text = extract_with_paddleocr(img, ocr)
+            # Aplicar OCR según motor seleccionado (tesserocr y MuPDF leen el
+            # pixmap directamente, sin PNG intermedio). Las páginas se renderizan
+            # una sola vez y se reutilizan desde la caché de renders.
+            if engine == "tesseract" and tesseract_backend == "tesserocr":
+                text = extract_with_tesserocr(render_cache.render_page(page, dpi, grayscale=False), tess_api)
+            elif engine == "tesseract" and tesseract_backend == "mupdf":
+                text = extract_with_mupdf_tesseract(render_cache.render_page(page, dpi, grayscale=False), dpi)
             else:
-                raise ValueError(f"Motor OCR desconocido: {engine}")
+                img = render_cache.render_page_image(page, dpi)
+                if engine == "tesseract":
+                    text = extract_with_tesseract(img)
+                elif engine == "easyocr":
+                    text = extract_with_easyocr(img, reader)
+                elif engine == "paddleocr":
+                    text = extract_with_paddleocr(img, ocr)
+                else:
+                    raise ValueError(f"Motor OCR desconocido: {engine}")
             
             # Normalizar texto
             text = normalize_text(text)
@@ -209,6 +279,9 @@ def extract_text_with_ocr(
         
     except Exception as e:
         print(f"  ❌ Error en OCR: {e}")
+    finally:
+        if tess_api is not None:
+            tess_api.End()
     
     return pages
 
@@ -234,7 +307,8 @@ def normalize_text(text: str) -> str:
 def process_single_pdf(
     pdf_path: str, 
     engine: Literal["tesseract", "easyocr", "paddleocr"] = DEFAULT_OCR_ENGINE,
-    force_ocr: bool = False
+    force_ocr: bool = False,
+    tesseract_backend: Literal["pytesseract", "tesserocr", "mupdf"] = DEFAULT_TESSERACT_BACKEND
 ) -> dict:
     """
     Procesa un PDF individual y retorna el texto extraído.
@@ -261,7 +335,7 @@ def process_single_pdf(
     if is_corrupt or force_ocr:
         print(f"  ⚠️  Texto corrupto detectado ({ratio*100:.1f}%)")
         print(f"  📸 Usando {engine.upper()} para extracción...")
-        result['pages'] = extract_text_with_ocr(pdf_path, engine=engine)
+        result['pages'] = extract_text_with_ocr(pdf_path, engine=engine, tesseract_backend=tesseract_backend)
         result['method'] = 'ocr'
     else:
         print(f"  ✅ Texto limpio, usando extracción directa")
@@ -294,6 +368,13 @@ def main():
         default=DEFAULT_OCR_ENGINE,
         help=f'Motor OCR a usar (default: {DEFAULT_OCR_ENGINE})'
     )
+    parser.add_argument(
+        '--tesseract-backend',
+        choices=TESSERACT_BACKENDS,
+        default=DEFAULT_TESSERACT_BACKEND,
+        help='Backend de Tesseract: pytesseract (un proceso por página), tesserocr (motor '
+             f'en el propio proceso) o mupdf (Tesseract de PyMuPDF) (default: {DEFAULT_TESSERACT_BACKEND})'
+    )
     parser.add_argument(
         '--force-ocr',
         action='store_true',
@@ -303,11 +384,26 @@ def main():
         '--output',
         help='Archivo de salida para el texto extraído'
     )
+    parser.add_argument(
+        '--no-render-cache',
+        action='store_true',
+        help='Renderizar siempre las páginas (sin data/cache/renders)'
+    )
+    parser.add_argument(
+        '--no-ocr-cache',
+        action='store_true',
+        help='Reconocer siempre las páginas (sin data/cache/ocr)'
+    )
     
     args = parser.parse_args()
+    render_cache.set_render_cache(not args.no_render_cache)
+    ocr_cache.set_ocr_cache(not args.no_ocr_cache)
     
     if os.path.isfile(args.path):
-        result = process_single_pdf(args.path, engine=args.engine, force_ocr=args.force_ocr)
+        result = process_single_pdf(
+            args.path, engine=args.engine, force_ocr=args.force_ocr,
+            tesseract_backend=args.tesseract_backend
+        )
         
         if args.output:
             with open(args.output, 'w', encoding='utf-8') as f:
@@ -6,10 +6,18 @@ Compara PyMuPDF, pdfplumber, pypdf y pdfminer.six
 """
 
 import os
+import sys
 import time
 import json
 from typing import Dict, List, Tuple
 
+# Agregar el directorio analysis/ al path (desde precision_docs)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(script_dir)  # Subir un nivel a analysis/
+sys.path.insert(0, parent_dir)
+
+import text_quality
+
 # ====================================================================
 # PYMUPDF (Actual)
 # ====================================================================
@@ -152,16 +160,10 @@ def extract_with_pdfminer(pdf_path: str) -> Tuple[str, float, int]:
 # ====================================================================
 
 def analyze_text_quality(text: str, library_name: str) -> Dict:
-    """Analiza la calidad del texto extraído."""
-    if not text:
-        return {
-            "characters": 0,
-            "words": 0,
-            "corrupt_chars": 0,
-            "corrupt_ratio": 0.0,
-            "readable_ratio": 0.0
-        }
-    
+    """
+    Analiza la calidad del texto extraído (perfil vectorizado de text_quality):
+    caracteres corruptos, uso privado, tokens CID, letras y palabras vacías.
+    """
     # Caracteres corruptos comunes
     corrupt_chars = set([
         '\uf0b7', '\uf0a7', '\uf0d8', '\uf020', '\uf06c', '\uf06f', '\uf073',
@@ -170,22 +172,19 @@ def analyze_text_quality(text: str, library_name: str) -> Dict:
         'ӌ', 'Ǣ', 'ņ', 'Ğ', 'ļ', 'š', 'Ź', 'ĵ', 'ū', 'Ô', 'Ť', 'Ņ', 'ƕ', 'ý', 'ð', 'ų', 'ö', 'Ē', 'Ľ', 'Ě'
     ])
     
-    total_chars = len(text)
-    corrupt_count = sum(1 for char in text if char in corrupt_chars)
-    corrupt_ratio = corrupt_count / total_chars if total_chars > 0 else 0
-    
-    # Contar palabras (aproximado)
-    words = len(text.split())
-    
-    # Ratio de texto legible (sin caracteres corruptos)
-    readable_ratio = 1.0 - corrupt_ratio
+    profile = text_quality.profile_text(text, corrupt_chars)
     
     return {
-        "characters": total_chars,
-        "words": words,
-        "corrupt_chars": corrupt_count,
-        "corrupt_ratio": round(corrupt_ratio, 4),
-        "readable_ratio": round(readable_ratio, 4)
+        "characters": profile["characters"],
+        "words": profile["words"],
+        "corrupt_chars": profile["corrupt_chars"],
+        "corrupt_ratio": round(profile["corrupt_ratio"], 4),
+        # Ratio de texto legible (sin caracteres corruptos)
+        "readable_ratio": round(1.0 - profile["corrupt_ratio"], 4) if text else 0.0,
+        "pua_ratio": round(profile["pua_ratio"], 4),
+        "cid_density": round(profile["cid_density"], 4),
+        "alpha_ratio": round(profile["alpha_ratio"], 4),
+        "stopword_ratio": round(profile["stopword_ratio"], 4),
     }
 
 # ====================================================================
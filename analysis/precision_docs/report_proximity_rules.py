@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Reporte de diferencias entre las reglas regex con `.*` y las reglas de proximidad.
+
+process_plans_v7 evaluaba las reglas fiscales sobre el texto completo de cada plan
+(una sola línea) y las de viabilidad, patrones dictatoriales y aprobación de la
+Asamblea sobre el texto de cada propuesta, con regex del tipo r"eliminar.*regla\\s*fiscal".
+Ahora son reglas de proximidad (proximity.py). Este script aplica las dos versiones
+de cada lista (las regex anteriores están copiadas abajo, en el mismo orden que las
+reglas nuevas) a los planes de planes/ y a sus párrafos candidatos, y lista los
+textos donde difieren: coincidencias que solo da la regex (en general términos
+separados por páginas) y coincidencias nuevas (formas que la regex no cubría, como
+"gobernar por decreto sin asamblea"). Mide también el tiempo de ambas versiones.
+"""
+
+import sys
+import re
+import time
+
+from benchmark_common import load_paragraphs, load_plan_texts
+import proximity
+import process_plans_v7
+
+# Ejemplos por lista y por tipo de diferencia
+MAX_EXAMPLES = 3
+SNIPPET_CHARS = 160
+# Repeticiones de la frase del peor caso (~50 caracteres cada una)
+WORST_CASE_REPETITIONS = [1000, 2000, 4000]
+
+# ====================================================================
+# REGLAS ANTERIORES (regex, copia de referencia)
+# ====================================================================
+
+LEGACY_FISCAL_RULE_ATTACK_PATTERNS = [
+    r"(?:flexibilizar|reformar|modificar|eliminar|excluir|suspender).*regla\s*fiscal",
+    r"regla\s*fiscal.*(?:flexibilizar|reformar|modificar|eliminar|excluir|suspender)",
+    r"(?:limita|impide|obstaculiza).*regla\s*fiscal",
+    r"regla\s*fiscal.*(?:limita|impide|obstaculiza)",
+    r"(?:revisión|revisar).*(?:crítica|profunda).*regla\s*fiscal",
+]
+
+LEGACY_DEBT_INCREASE_PATTERNS = [
+    r"(?:aumentar|incrementar|ampliar|expandir)\s*(?:la\s*)?(?:deuda|endeudamiento)",
+    r"(?:nuevo|nueva|más)\s*(?:deuda|endeudamiento|crédito\s*público)",
+    r"(?:emitir|emisión)\s*(?:de\s*)?(?:bonos?|deuda)",
+    r"financiar.*(?:mediante|con)\s*(?:deuda|endeudamiento)",
+]
+
+LEGACY_FISCAL_RESPONSIBILITY_INDICATORS = [
+    r"sostenibilidad\s*fiscal",
+    r"responsabilidad\s*fiscal",
+    r"equilibrio\s*fiscal",
+    r"reducir\s*(?:el\s*)?(?:déficit|gasto)",
+    r"eficiencia\s*(?:del\s*)?gasto",
+    r"austeridad",
+    r"respetar.*regla\s*fiscal",
+    r"cumplir.*regla\s*fiscal",
+    r"mantener.*regla\s*fiscal",
+]
+
+LEGACY_SEPARATION_POWERS_VIOLATIONS = [
+    r"(?:eliminar|disolver|cerrar|suprimir).*asamblea\s+legislativa",
+    r"asamblea\s+legislativa.*(?:eliminar|disolver|cerrar|suprimir)",
+    r"(?:eliminar|disolver|cerrar|suprimir).*poder\s+judicial",
+    r"poder\s+judicial.*(?:eliminar|disolver|cerrar|suprimir)",
+    r"gobierno\s+por\s+decreto\s+(?:sin|sin\s+la\s+)?asamblea",
+    r"gobernar\s+por\s+decreto\s+(?:sin|sin\s+la\s+)?asamblea",
+    r"decretos?\s+(?:permanentes?|indefinidos?)\s+(?:sin|sin\s+la\s+)?asamblea",
+    r"ejecutivo.*(?:legislar|juzgar)",
+    r"presidente.*(?:legislar|juzgar)",
+    r"poder\s+ejecutivo.*(?:legislar|juzgar)",
+    r"ejecutivo\s+legislativo",
+    r"concentración\s+de\s+poderes",
+]
+
+LEGACY_FUNDAMENTAL_RIGHTS_VIOLATIONS = [
+    r"suspender.*libertad\s+de\s+expresión",
+    r"eliminar.*libertad\s+de\s+expresión",
+    r"prohibir.*libertad\s+de\s+expresión",
+    r"suspender.*libertad\s+de\s+prensa",
+    r"eliminar.*libertad\s+de\s+prensa",
+    r"prohibir.*libertad\s+de\s+prensa",
+    r"eliminar.*derecho\s+a\s+huelga",
+    r"prohibir.*derecho\s+a\s+huelga",
+    r"suspender.*derecho\s+a\s+huelga",
+    r"prohibir.*manifestaciones",
+    r"eliminar.*derecho\s+a\s+manifestación",
+    r"suspender.*derecho\s+a\s+manifestación",
+    r"eliminar.*(?:ccss|caja\s+costarricense).*(?:completamente|totalmente|por\s+completo)",
+    r"privatizar.*(?:ccss|caja\s+costarricense).*(?:completamente|totalmente|por\s+completo)",
+    r"eliminar.*educación\s+pública.*(?:completamente|totalmente|por\s+completo)",
+    r"privatizar.*educación\s+pública.*(?:completamente|totalmente|por\s+completo)",
+    r"restringir.*acceso\s+a\s+salud\s+pública.*(?:completamente|totalmente)",
+    r"restringir.*acceso\s+a\s+educación\s+pública.*(?:completamente|totalmente)",
+]
+
+LEGACY_CONSTITUTIONAL_GUARANTEES_VIOLATIONS = [
+    r"eliminar.*hábeas\s+corpus",
+    r"suspender.*hábeas\s+corpus",
+    r"prohibir.*hábeas\s+corpus",
+    r"eliminar.*garantía\s+de\s+amparo",
+    r"suspender.*garantía\s+de\s+amparo",
+    r"prohibir.*garantía\s+de\s+amparo",
+    r"suspender.*garantías\s+individuales",
+    r"eliminar.*garantías\s+individuales",
+    r"suspender.*garantías\s+constitucionales",
+    r"eliminar.*garantías\s+constitucionales",
+    r"restringir.*garantías\s+procesales.*(?:completamente|totalmente)",
+    r"eliminar.*debido\s+proceso",
+    r"suspender.*debido\s+proceso",
+]
+
+LEGACY_CONSTITUTIONAL_PROCEDURE_VIOLATIONS = [
+    r"aprobar\s+presupuesto\s+sin\s+(?:la\s+)?asamblea",
+    r"ratificar\s+tratados\s+sin\s+(?:la\s+)?asamblea",
+    r"declarar\s+guerra\s+sin\s+(?:la\s+)?asamblea",
+    r"nombrar\s+ministros\s+sin\s+(?:la\s+)?asamblea",
+    r"ejecutivo.*(?:aprueba|ratifica|declara).*(?:sin|sin\s+la\s+)?asamblea",
+    r"presidente.*(?:aprueba|ratifica|declara).*(?:sin|sin\s+la\s+)?asamblea",
+]
+
+LEGACY_CUBA_DICTATORIAL_PATTERNS = [
+    r"eliminar.*separación\s+de\s+poderes",
+    r"eliminar.*asamblea\s+legislativa",
+    r"eliminar.*libertad\s+de\s+prensa",
+    r"control.*estatal.*medios",
+    r"eliminar.*garantías\s+constitucionales",
+    r"concentración\s+de\s+poderes.*ejecutivo",
+    r"ejecutivo.*legislativo",
+    r"control.*total.*medios\s+de\s+comunicación",
+]
+
+LEGACY_VENEZUELA_DICTATORIAL_PATTERNS = [
+    r"eliminar.*independencia\s+judicial",
+    r"control.*poder\s+judicial.*ejecutivo",
+    r"gobernar\s+por\s+decreto\s+sin\s+asamblea",
+    r"eliminar.*libertad\s+de\s+expresión",
+    r"cerrar.*medios\s+de\s+comunicación",
+    r"concentración\s+de\s+poderes.*ejecutivo",
+    r"asamblea\s+constituyente.*sin\s+asamblea",
+    r"control.*total.*poder\s+judicial",
+]
+
+LEGACY_ASSEMBLY_APPROVAL_PATTERNS = [
+    r"requiere\s+aprobación\s+de\s+la\s+asamblea",
+    r"necesita\s+aprobación\s+legislativa",
+    r"requiere\s+consenso\s+legislativo",
+    r"aprobación\s+de\s+la\s+asamblea\s+legislativa",
+    r"reforma\s+legal.*asamblea",
+    r"modificar\s+ley.*asamblea",
+    r"nueva\s+ley.*asamblea",
+    r"proyecto\s+de\s+ley",
+    r"presupuesto.*asamblea",
+    r"aprobación\s+presupuestaria",
+    r"ratificación.*asamblea",
+    r"tratado.*asamblea",
+]
+
+# (nombre, regex anteriores, reglas nuevas, alcance): "plan" = texto completo del
+# plan (analyze_fiscal_responsibility), "párrafo" = texto de una propuesta
+RULE_LISTS = [
+    ("FISCAL_RULE_ATTACK", LEGACY_FISCAL_RULE_ATTACK_PATTERNS,
+     process_plans_v7.FISCAL_RULE_ATTACK_RULES, "plan"),
+    ("DEBT_INCREASE", LEGACY_DEBT_INCREASE_PATTERNS,
+     process_plans_v7.DEBT_INCREASE_RULES, "plan"),
+    ("FISCAL_RESPONSIBILITY", LEGACY_FISCAL_RESPONSIBILITY_INDICATORS,
+     process_plans_v7.FISCAL_RESPONSIBILITY_RULES, "plan"),
+    ("SEPARATION_POWERS", LEGACY_SEPARATION_POWERS_VIOLATIONS,
+     process_plans_v7.SEPARATION_POWERS_VIOLATIONS, "párrafo"),
+    ("FUNDAMENTAL_RIGHTS", LEGACY_FUNDAMENTAL_RIGHTS_VIOLATIONS,
+     process_plans_v7.FUNDAMENTAL_RIGHTS_VIOLATIONS, "párrafo"),
+    ("CONSTITUTIONAL_GUARANTEES", LEGACY_CONSTITUTIONAL_GUARANTEES_VIOLATIONS,
+     process_plans_v7.CONSTITUTIONAL_GUARANTEES_VIOLATIONS, "párrafo"),
+    ("CONSTITUTIONAL_PROCEDURE", LEGACY_CONSTITUTIONAL_PROCEDURE_VIOLATIONS,
+     process_plans_v7.CONSTITUTIONAL_PROCEDURE_VIOLATIONS, "párrafo"),
+    ("CUBA_DICTATORIAL", LEGACY_CUBA_DICTATORIAL_PATTERNS,
+     process_plans_v7.CUBA_DICTATORIAL_PATTERNS, "párrafo"),
+    ("VENEZUELA_DICTATORIAL", LEGACY_VENEZUELA_DICTATORIAL_PATTERNS,
+     process_plans_v7.VENEZUELA_DICTATORIAL_PATTERNS, "párrafo"),
+    ("ASSEMBLY_APPROVAL", LEGACY_ASSEMBLY_APPROVAL_PATTERNS,
+     process_plans_v7.ASSEMBLY_APPROVAL_RULES, "párrafo"),
+]
+
+
+def legacy_first_match(patterns, text_lower):
+    """(índice del primer patrón que coincide, span), como el bucle re.search anterior."""
+    for i, pattern in enumerate(patterns):
+        match = re.search(pattern, text_lower)
+        if match:
+            return i, match.span()
+    return None
+
+
+def new_first_match(rules, index):
+    match = proximity.first_match(rules, index)
+    if match is None:
+        return None
+    rule, span = match
+    return rules.index(rule), span
+
+
+def snippet(text, span):
+    start, end = span
+    if end - start > SNIPPET_CHARS:
+        head = text[start:start + SNIPPET_CHARS // 2]
+        tail = text[end - SNIPPET_CHARS // 2:end]
+        return f"{head} [... {end - start:,} caracteres ...] {tail}"
+    return text[start:end]
+
+
+def compare_list(name, legacy_patterns, rules, texts):
+    """Compara una lista sobre los textos; devuelve (tiempo anterior, tiempo nuevo, diferencias)."""
+    legacy_time = 0.0
+    new_time = 0.0
+    differences = []
+    for label, text in texts:
+        text_lower = text.lower()
+        start = time.perf_counter()
+        old = legacy_first_match(legacy_patterns, text_lower)
+        legacy_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        new = new_first_match(rules, proximity.TermIndex(text))
+        new_time += time.perf_counter() - start
+
+        if (old is None) != (new is None) or (old and new and old[0] != new[0]):
+            differences.append((label, text, old, new))
+    return legacy_time, new_time, differences
+
+
+def print_differences(legacy_patterns, rules, differences):
+    kinds = [
+        ("Solo regex anterior", [d for d in differences if d[3] is None]),
+        ("Solo regla de proximidad", [d for d in differences if d[2] is None]),
+        ("Otra regla de la lista", [d for d in differences if d[2] is not None and d[3] is not None]),
+    ]
+    for kind, items in kinds:
+        if not items:
+            continue
+        print(f"   {kind}: {len(items)}")
+        for label, text, old, new in items[:MAX_EXAMPLES]:
+            print(f"     • {label}")
+            if old is not None:
+                print(f"       regex  {legacy_patterns[old[0]]!r}")
+                print(f"              «{snippet(text, old[1])}»")
+            if new is not None:
+                print(f"       regla  {rules[new[0]].source!r}")
+                print(f"              «{snippet(text, new[1])}»")
+
+
+def worst_case():
+    """
+    Texto de una sola línea con muchas apariciones del primer término y ninguna del
+    segundo: la regex recorre el resto del texto desde cada aparición (cuadrático);
+    la regla de proximidad busca cada término una vez (lineal).
+    """
+    pattern = re.compile(LEGACY_FISCAL_RULE_ATTACK_PATTERNS[0])
+    rules = process_plans_v7.FISCAL_RULE_ATTACK_RULES[:1]
+    print("📊 Peor caso (\"eliminar ...\" repetido, sin \"regla fiscal\"):")
+    for repetitions in WORST_CASE_REPETITIONS:
+        text = " ".join(["eliminar los trámites y mejorar la gestión pública"] * repetitions)
+        start = time.perf_counter()
+        pattern.search(text)
+        legacy_time = time.perf_counter() - start
+        start = time.perf_counter()
+        proximity.first_match(rules, proximity.TermIndex(text))
+        new_time = time.perf_counter() - start
+        print(f"   {len(text):>9,} caracteres: regex {legacy_time*1000:8.1f} ms, "
+              f"proximidad {new_time*1000:6.1f} ms")
+
+
+def main():
+    plans = load_plan_texts()
+    paragraphs = load_paragraphs()
+    scopes = {
+        "plan": plans,
+        "párrafo": [(f"párrafo {i}: {paragraph[:60]!r}", paragraph) for i, paragraph in enumerate(paragraphs)],
+    }
+
+    print("=" * 60)
+    print("REPORTE: REGEX CON .* → REGLAS DE PROXIMIDAD")
+    print("=" * 60)
+    print(f"📄 {len(plans)} planes, {len(paragraphs):,} párrafos, "
+          f"ventana de {proximity.PROXIMITY_WINDOW} palabras")
+    print()
+
+    total_legacy = {scope: 0.0 for scope in scopes}
+    total_new = {scope: 0.0 for scope in scopes}
+    total_differences = 0
+    for name, legacy_patterns, rules, scope in RULE_LISTS:
+        legacy_time, new_time, differences = compare_list(name, legacy_patterns, rules, scopes[scope])
+        total_legacy[scope] += legacy_time
+        total_new[scope] += new_time
+        total_differences += len(differences)
+        status = "✅ sin diferencias" if not differences else f"⚠️  {len(differences)} textos difieren"
+        print(f"📊 {name} ({scope}): {status}  "
+              f"[regex {legacy_time*1000:.1f} ms, proximidad {new_time*1000:.1f} ms]")
+        print_differences(legacy_patterns, rules, differences)
+    print()
+
+    for scope in scopes:
+        print(f"⏱️  Total por {scope}: regex {total_legacy[scope]*1000:8.1f} ms, "
+              f"proximidad {total_new[scope]*1000:8.1f} ms "
+              f"({total_legacy[scope] / max(total_new[scope], 1e-9):.1f}x)")
+    print(f"📋 Textos con resultado distinto: {total_differences}")
+    print()
+    worst_case()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
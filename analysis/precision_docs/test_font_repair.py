@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Prueba de la reparación de fuentes de process_plans_v7 sin depender de OCR.
+
+Simula una capa de texto rota moviendo todos los glifos de un PDF limpio al área
+de uso privado de Unicode, y usa las líneas reales de la página como si fueran las
+cajas devueltas por EasyOCR. Mide cuántas páginas se recuperan con el mapa aprendido
+de las páginas de muestra y qué tan parecido es el texto al original.
+"""
+
+import sys
+import os
+import difflib
+from collections import Counter, defaultdict
+
+# Agregar el directorio analysis/ al path (desde precision_docs)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(script_dir)  # Subir un nivel a analysis/
+sys.path.insert(0, parent_dir)
+
+from process_plans_v7 import (
+    FONT_REPAIR_MAX_UNRESOLVED,
+    PLANES_DIR,
+    broken_glyph_keys,
+    build_glyph_map,
+    collect_glyph_votes,
+    decode_page_glyphs,
+    detect_corrupt_text,
+    load_fitz,
+    normalize_text,
+    page_glyphs,
+    select_font_samples,
+)
+
+
+def corrupt_glyphs(glyphs):
+    """Reasigna cada carácter visible a un código de uso privado (fuente sin ToUnicode)."""
+    corrupted = []
+    for key, char, origin, bbox in glyphs:
+        if key is None:
+            corrupted.append((key, char, origin, bbox))
+            continue
+        font, gid, ucs = key
+        if ucs > 32:
+            ucs = 0xE000 + (ucs % 0x1000)
+            char = chr(ucs)
+        corrupted.append(((font, gid, ucs), char, origin, bbox))
+    return corrupted
+
+
+def simulated_ocr_lines(page):
+    """Cajas de línea con su texto real, como las que devuelve EasyOCR."""
+    lines = []
+    for block in page.get_text("dict")["blocks"]:
+        if block["type"] != 0:
+            continue
+        for line in block["lines"]:
+            lines.append((*line["bbox"], "".join(span["text"] for span in line["spans"])))
+    return lines
+
+
+def test_pdf(pdf_name):
+    doc = load_fitz().open(os.path.join(PLANES_DIR, pdf_name))
+    glyph_data = {}
+    page_keys = {}
+    for page_index in range(len(doc)):
+        glyphs = corrupt_glyphs(page_glyphs(doc[page_index]))
+        keys = broken_glyph_keys(glyphs)
+        if keys:
+            glyph_data[page_index] = glyphs
+            page_keys[page_index] = keys
+    
+    samples = select_font_samples(page_keys)
+    votes = defaultdict(Counter)
+    for page_index in samples:
+        collect_glyph_votes(glyph_data[page_index], simulated_ocr_lines(doc[page_index]), set(page_keys[page_index]), votes)
+    glyph_map = build_glyph_map(votes)
+    
+    repaired = 0
+    similarity = []
+    for page_index, glyphs in glyph_data.items():
+        if page_index in samples:
+            continue
+        text, unresolved = decode_page_glyphs(glyphs, glyph_map, set(page_keys[page_index]))
+        if unresolved > FONT_REPAIR_MAX_UNRESOLVED or detect_corrupt_text(text)[0]:
+            continue
+        repaired += 1
+        # Similitud por palabras (más rápida y estable que por caracteres)
+        reference = normalize_text(doc[page_index].get_text()).split()
+        similarity.append(difflib.SequenceMatcher(None, reference, normalize_text(text).split(), autojunk=False).ratio())
+    
+    fonts = {font for keys in page_keys.values() for font in keys}
+    pending = len(glyph_data) - len(samples)
+    mean_similarity = sum(similarity) / len(similarity) if similarity else 0.0
+    print(f"📄 {pdf_name}: {len(doc)} págs., {len(fonts)} fuentes rotas")
+    print(f"   OCR de muestra: {len(samples)} págs.")
+    print(f"   Reparadas:      {repaired}/{pending} págs. (similitud media por palabras {mean_similarity*100:.2f}%)")
+    print()
+    doc.close()
+    return pending > 0 and repaired >= 0.8 * pending and mean_similarity >= 0.98
+
+
+def main():
+    print("=" * 60)
+    print("PRUEBA DE REPARACIÓN DE FUENTES (corrupción simulada)")
+    print("=" * 60)
+    print()
+    
+    pdf_names = sys.argv[1:] or ["PLP.pdf", "CAC.pdf"]
+    results = [test_pdf(pdf_name) for pdf_name in pdf_names]
+    print("✅ Reparación correcta" if all(results) else "❌ Reparación por debajo de lo esperado")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -24,6 +24,8 @@ import os
 import re
 import json
 import hashlib
+import importlib
+import importlib.util
 import io
 from collections import defaultdict
 from typing import Dict, List, Tuple, Optional, Any
@@ -33,47 +35,47 @@ from pathlib import Path
 # CONFIGURACIÓN OCR (heredada de v5)
 # ====================================================================
 
-try:
-    import fitz  # PyMuPDF
-    PDF_AVAILABLE = True
-except ImportError:
-    PDF_AVAILABLE = False
+# PyMuPDF, pdfplumber, PIL, NumPy y los motores OCR (EasyOCR arrastra torch) no se
+# importan al cargar el módulo: se comprueba su disponibilidad con find_spec y se
+# importan la primera vez que se abre un PDF o que una página necesita OCR.
+fitz = None
+Image = None
+pytesseract = None
+
+def _module_available(name: str) -> bool:
+    """Comprueba si un módulo está instalado sin importarlo."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+PDF_AVAILABLE = _module_available("fitz")
+if not PDF_AVAILABLE:
     print("⚠️ PyMuPDF no disponible. Instalar: pip install PyMuPDF")
 
+def load_fitz():
+    """Importa PyMuPDF la primera vez que se abre un PDF."""
+    global fitz
+    if fitz is None:
+        fitz = importlib.import_module("fitz")
+    return fitz
+
 # Verificar disponibilidad de pdfplumber (mejor para PDFs corruptos)
-PDFPLUMBER_AVAILABLE = False
-try:
-    import pdfplumber
-    PDFPLUMBER_AVAILABLE = True
-except ImportError:
-    pass  # pdfplumber es opcional pero recomendado
-
-# Verificar disponibilidad de motores OCR
-OCR_AVAILABLE = False
-EASYOCR_AVAILABLE = False
-TESSERACT_AVAILABLE = False
-
-try:
-    from PIL import Image
-    import numpy as np
-    OCR_AVAILABLE = True
-except ImportError:
-    print("⚠️ PIL/Pillow no disponible. Instalar: pip install Pillow")
-
-try:
-    import easyocr
-    EASYOCR_AVAILABLE = True
-    OCR_AVAILABLE = True
-except ImportError:
-    print("⚠️ EasyOCR no disponible. Instalar: pip install easyocr")
-
-try:
-    import pytesseract
-    TESSERACT_AVAILABLE = True
-    if not OCR_AVAILABLE:
-        OCR_AVAILABLE = True
-except ImportError:
-    print("⚠️ Tesseract no disponible. Instalar: pip install pytesseract")
+PDFPLUMBER_AVAILABLE = _module_available("pdfplumber")
+
+# Verificar disponibilidad de motores OCR (ambos reciben la página como imagen PIL)
+_PIL_AVAILABLE = _module_available("PIL")
+EASYOCR_AVAILABLE = _PIL_AVAILABLE and _module_available("easyocr") and _module_available("numpy")
+TESSERACT_AVAILABLE = _PIL_AVAILABLE and _module_available("pytesseract")
+OCR_AVAILABLE = EASYOCR_AVAILABLE or TESSERACT_AVAILABLE
+
+def _load_ocr_modules() -> None:
+    """Importa PIL y pytesseract la primera vez que una página requiere OCR."""
+    global Image, pytesseract
+    if Image is None:
+        Image = importlib.import_module("PIL.Image")
+    if pytesseract is None and TESSERACT_AVAILABLE:
+        pytesseract = importlib.import_module("pytesseract")
 
 # Configuración OCR
 RENDER_DPI = 300  # Aumentado para mejor calidad
@@ -370,9 +372,10 @@ def extract_page_with_ocr(page, dpi: int = RENDER_DPI) -> str:
     if not OCR_AVAILABLE:
         return ""
     
+    _load_ocr_modules()
     try:
         # Renderizar página como imagen
-        mat = fitz.Matrix(dpi / 72, dpi / 72)
+        mat = load_fitz().Matrix(dpi / 72, dpi / 72)
         pix = page.get_pixmap(matrix=mat)
         img_data = pix.tobytes("png")
         img = Image.open(io.BytesIO(img_data))
@@ -412,6 +415,7 @@ def extract_text_with_pdfplumber(pdf_path: str) -> Tuple[List[Tuple[int, str]],
     full_text = ""
     
     try:
+        import pdfplumber
         with pdfplumber.open(pdf_path) as pdf:
             num_pages = len(pdf.pages)
             
@@ -474,7 +478,7 @@ def extract_text_from_pdf(pdf_path: str) -> Tuple[List[Tuple[int, str]], str]:
     doc = None
     try:
         # ESTRATEGIA HÍBRIDA: Detección rápida con PyMuPDF
-        doc = fitz.open(pdf_path)
+        doc = load_fitz().open(pdf_path)
         num_pages = len(doc)
         
         # Primera pasada: detectar si hay texto corrupto (muestra de primeras 10 páginas)
@@ -501,18 +505,18 @@ def extract_text_from_pdf(pdf_path: str) -> Tuple[List[Tuple[int, str]], str]:
             else:
                 # pdfplumber falló, usar OCR como último recurso
                 print(f"  ⚠️  pdfplumber falló, usando PyMuPDF + OCR como último recurso...")
-                doc = fitz.open(pdf_path)
+                doc = load_fitz().open(pdf_path)
                 use_ocr = True  # Forzar OCR ya que hay corrupción
         elif is_corrupt and ratio > 0.05 and not PDFPLUMBER_AVAILABLE:
             # ESTRATEGIA 2: Corrupción detectada pero pdfplumber no disponible → usar OCR
             if OCR_AVAILABLE:
                 engine = "EasyOCR" if EASYOCR_AVAILABLE else ("Tesseract" if TESSERACT_AVAILABLE else "N/A")
                 print(f"  ⚠️  {pdf_name}: Texto corrupto ({ratio*100:.1f}%), extrayendo con {engine}...")
-                doc = fitz.open(pdf_path)
+                doc = load_fitz().open(pdf_path)
                 use_ocr = True
             else:
                 print(f"  ⚠️  {pdf_name}: Texto corrupto ({ratio*100:.1f}%) pero OCR no disponible")
-                doc = fitz.open(pdf_path)
+                doc = load_fitz().open(pdf_path)
                 use_ocr = False
         else:
             # ESTRATEGIA 3: PDF limpio → usar PyMuPDF directo (rápido y fidedigno)
@@ -520,7 +524,7 @@ def extract_text_from_pdf(pdf_path: str) -> Tuple[List[Tuple[int, str]], str]:
                 print(f"  ℹ️  {pdf_name}: Corrupción menor ({ratio*100:.1f}%), usando PyMuPDF directo...")
             else:
                 print(f"  ✅ {pdf_name}: Texto limpio, usando PyMuPDF directo...")
-            doc = fitz.open(pdf_path)
+            doc = load_fitz().open(pdf_path)
             use_ocr = False  # No usar OCR para PDFs limpios
         
         # Segunda pasada: extraer texto con PyMuPDF (con o sin OCR según estrategia)
@@ -29,398 +29,448 @@ import os
 import re
 import json
 import hashlib
-import io
-from collections import defaultdict
+import importlib
+import importlib.util
+import inspect
+import sys
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from typing import Dict, List, Tuple, Optional, Any
 from pathlib import Path
 
+import ocr_cache
+import ocr_pipeline
+import proximity
+import render_cache
+import rule_packs
+import text_quality
+
 # ====================================================================
 # CONFIGURACIÓN OCR (heredada de v5)
 # ====================================================================
 
-try:
-    import fitz  # PyMuPDF
-    PDF_AVAILABLE = True
-except ImportError:
-    PDF_AVAILABLE = False
+# Los módulos pesados (PyMuPDF, pdfplumber, NumPy, PIL, motores OCR) no se importan
+# al cargar el script: la disponibilidad se comprueba con find_spec (sin importar) y
+# cada módulo se importa la primera vez que una página lo necesita.
+fitz = None
+pdfplumber = None
+np = None
+Image = None
+pytesseract = None
+
+def _module_available(name: str) -> bool:
+    """Comprueba si un módulo está instalado sin importarlo."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+PDF_AVAILABLE = _module_available("fitz")
+if not PDF_AVAILABLE:
     print("⚠️ PyMuPDF no disponible. Instalar: pip install PyMuPDF")
 
-# Verificar disponibilidad de pdfplumber (mejor para PDFs corruptos)
-PDFPLUMBER_AVAILABLE = False
-try:
-    import pdfplumber
-    PDFPLUMBER_AVAILABLE = True
-except ImportError:
-    pass  # pdfplumber es opcional pero recomendado
-
-# Verificar disponibilidad de motores OCR
-OCR_AVAILABLE = False
-EASYOCR_AVAILABLE = False
-TESSERACT_AVAILABLE = False
-
-try:
-    from PIL import Image
-    import numpy as np
-    OCR_AVAILABLE = True
-except ImportError:
-    print("⚠️ PIL/Pillow no disponible. Instalar: pip install Pillow")
-
-try:
-    import easyocr
-    EASYOCR_AVAILABLE = True
-    OCR_AVAILABLE = True
-except ImportError:
-    print("⚠️ EasyOCR no disponible. Instalar: pip install easyocr")
-
-try:
-    import pytesseract
-    TESSERACT_AVAILABLE = True
-    if not OCR_AVAILABLE:
-        OCR_AVAILABLE = True
-except ImportError:
-    print("⚠️ Tesseract no disponible. Instalar: pip install pytesseract")
+# pdfplumber es opcional pero recomendado (mejor para PDFs corruptos)
+PDFPLUMBER_AVAILABLE = _module_available("pdfplumber")
+
+# Motores OCR: EasyOCR trabaja sobre arrays NumPy, Tesseract sobre imágenes PIL
+# (pytesseract) o directamente sobre el buffer del pixmap (tesserocr, MuPDF)
+EASYOCR_AVAILABLE = _module_available("easyocr") and _module_available("numpy")
+PYTESSERACT_AVAILABLE = _module_available("pytesseract") and _module_available("PIL")
+TESSEROCR_AVAILABLE = _module_available("tesserocr")
+TESSERACT_AVAILABLE = PYTESSERACT_AVAILABLE or TESSEROCR_AVAILABLE
+OCR_AVAILABLE = EASYOCR_AVAILABLE or TESSERACT_AVAILABLE
+
+_ocr_warning_shown = False
+
+def warn_missing_ocr_engines() -> None:
+    """Muestra (una sola vez) cómo instalar los motores OCR que faltan."""
+    global _ocr_warning_shown
+    if _ocr_warning_shown:
+        return
+    _ocr_warning_shown = True
+    if not EASYOCR_AVAILABLE:
+        print("⚠️ EasyOCR no disponible. Instalar: pip install easyocr numpy")
+    if not TESSERACT_AVAILABLE:
+        print("⚠️ Tesseract no disponible. Instalar: pip install pytesseract Pillow (o tesserocr)")
+
+
+def load_fitz():
+    """Importa PyMuPDF la primera vez que se abre un PDF."""
+    global fitz
+    if fitz is None:
+        fitz = importlib.import_module("fitz")
+    return fitz
+
+
+def load_pdfplumber():
+    """Importa pdfplumber la primera vez que se necesita."""
+    global pdfplumber
+    if pdfplumber is None:
+        pdfplumber = importlib.import_module("pdfplumber")
+    return pdfplumber
+
+
+def load_ocr_modules() -> None:
+    """Importa NumPy, PIL y pytesseract la primera vez que una página requiere OCR."""
+    global np, Image, pytesseract
+    load_fitz()
+    if np is None and _module_available("numpy"):
+        np = importlib.import_module("numpy")
+    if Image is None and _module_available("PIL"):
+        Image = importlib.import_module("PIL.Image")
+    if pytesseract is None and PYTESSERACT_AVAILABLE:
+        pytesseract = importlib.import_module("pytesseract")
 
 # Configuración OCR
 RENDER_DPI = 300  # Aumentado para mejor calidad
-TESSERACT_CONFIG = '--oem 3 --psm 6 -l spa'  # Configuración optimizada
-
-# Caracteres de fuentes corruptas (ampliado para detectar más casos)
-CORRUPT_CHARS = set([
-    # Unicode privado (fuentes corruptas comunes)
-    '\uf0b7', '\uf0a7', '\uf0d8', '\uf020', '\uf06c', '\uf06f', '\uf073',
-    '\uf061', '\uf065', '\uf06e', '\uf072', '\uf074', '\uf075', '\uf069',
-    '\uf064', '\uf063', '\uf06d', '\uf070', '\uf067', '\uf0fc', '\uf0e0',
-    # Caracteres cirílicos/extraños que aparecen en PDFs corruptos
-    'ӌ', 'Ǣ', 'ņ', 'Ğ', 'ļ', 'š', 'Ź', 'ĵ', 'ū', 'Ô', 'Ť', 'Ņ', 'ƕ', 'ý', 'ð', 'ų', 'ö', 'Ē', 'Ľ', 'Ě',
-    'Ņ', 'Ť', 'Ź', 'Ľ', 'Ť', 'Ņ', 'ƕ', 'ý', 'ð', 'ų', 'ö', 'Ē', 'Ľ', 'Ě',
-])
-CORRUPT_THRESHOLD = 0.02  # 2% de caracteres corruptos
+TESSERACT_LANGUAGE = 'spa'
+TESSERACT_OEM = 3   # motor LSTM (o el disponible)
+TESSERACT_PSM = 6   # un único bloque de texto
+TESSERACT_CONFIG = f'--oem {TESSERACT_OEM} --psm {TESSERACT_PSM} -l {TESSERACT_LANGUAGE}'  # Configuración optimizada
+# Backend de Tesseract:
+#   "pytesseract": un proceso `tesseract` y una imagen temporal por página (recarga el modelo cada vez)
+#   "tesserocr":   API C en el propio proceso; un motor por proceso, cargado una sola vez
+#   "mupdf":       Tesseract integrado en PyMuPDF, sobre el pixmap y sin archivos temporales
+TESSERACT_BACKENDS = ("pytesseract", "tesserocr", "mupdf")
+TESSERACT_BACKEND = "pytesseract" if PYTESSERACT_AVAILABLE or not TESSEROCR_AVAILABLE else "tesserocr"
+EASYOCR_LANGUAGES = ['es', 'en']
+# EasyOCR y Tesseract trabajan sobre escala de grises: renderizar en color solo triplica el buffer
+OCR_RENDER_GRAYSCALE = True
+# OCR por regiones: en páginas corruptas solo se rasterizan las imágenes y los bloques
+# con texto corrupto; los bloques con capa de texto limpia se conservan
+OCR_REGIONS = True
+OCR_REGION_MIN_SIZE = 24        # puntos: regiones menores (iconos, viñetas) se omiten
+OCR_REGION_MAX_COVERAGE = 0.6   # si las regiones cubren más de la página, OCR completo
+OCR_REGION_PADDING = 2          # puntos de margen alrededor de cada región
+# Cascada de resolución (EasyOCR): primera lectura a OCR_BASE_DPI y relectura a
+# RENDER_DPI solo de las cajas con confianza menor que OCR_MIN_CONFIDENCE
+OCR_ADAPTIVE_DPI = True
+OCR_BASE_DPI = 150
+OCR_MIN_CONFIDENCE = 0.5
+OCR_FULL_RERENDER_RATIO = 0.5   # si las cajas dudosas cubren más del texto, relectura completa
+# Páginas por lote de EasyOCR (readtext_batched); 1 = una llamada por página
+EASYOCR_BATCH_SIZE = 1
+# Páginas por PDF que se revisan antes de precargar el modelo para el pool de PDFs
+OCR_PRELOAD_SAMPLE_PAGES = 8
+
+# Caracteres de fuentes corruptas y umbral (definidos en text_quality, compartidos con precision_docs)
+CORRUPT_CHARS = text_quality.CORRUPT_CHARS
+CORRUPT_THRESHOLD = text_quality.CORRUPT_THRESHOLD
 
 # Rutas
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PLANES_DIR = os.path.join(SCRIPT_DIR, "planes")
 DATA_DIR = os.path.join(SCRIPT_DIR, "data")
+CACHE_DIR = os.path.join(DATA_DIR, "cache")
+EXTRACTION_CACHE_DIR = os.path.join(CACHE_DIR, "extraction")
+# Última extracción de cada pdf_id (para reutilizar las páginas sin cambios de una revisión)
+EXTRACTION_LATEST_DIR = os.path.join(EXTRACTION_CACHE_DIR, "latest")
+
+# Versión de la normalización de texto. La clave de la caché de extracción ya incluye
+# el código de normalize_text() y de la decodificación de CID, sus patrones y las
+# tablas de CID (ver normalization_fingerprint); incrementar solo al cambiar algo
+# fuera de ellos que cambie el texto normalizado.
+NORMALIZATION_VERSION = 1
+# Versión de la estrategia de selección de motor por página (ídem para la caché).
+EXTRACTION_STRATEGY_VERSION = 3
+
+# ====================================================================
+# PAQUETES DE REGLAS (data/rules/*.json)
+# ====================================================================
+
+# Palabras clave, indicadores, reglas y penalizaciones están en data/rules; cada
+# paquete se valida y se compila una sola vez por proceso, y sus tablas se guardan
+# en data/cache/rules indexadas por su hash (ver rule_packs). Los ids de las reglas
+# quedan en penalizaciones y flags.
 
 # ====================================================================
 # PILARES NACIONALES (10 pilares)
 # ====================================================================
 
+PILLAR_RULES = rule_packs.load_rule_pack("pillars")
+
 PILLARS = [
-    {"pillar_id": "P1", "pillar_name": "Responsabilidad Fiscal", "weight": 0.14},
-    {"pillar_id": "P2", "pillar_name": "Empleo e Inversión", "weight": 0.11},
-    {"pillar_id": "P3", "pillar_name": "Seguridad Ciudadana", "weight": 0.18},
-    {"pillar_id": "P4", "pillar_name": "Salud y CCSS", "weight": 0.16},
-    {"pillar_id": "P5", "pillar_name": "Educación", "weight": 0.10},
-    {"pillar_id": "P6", "pillar_name": "Ambiente y Sostenibilidad", "weight": 0.03},
-    {"pillar_id": "P7", "pillar_name": "Reforma del Estado", "weight": 0.12},
-    {"pillar_id": "P8", "pillar_name": "Pobreza y Vulnerabilidad", "weight": 0.05},
-    {"pillar_id": "P9", "pillar_name": "Política Exterior", "weight": 0.02},
-    {"pillar_id": "P10", "pillar_name": "Infraestructura", "weight": 0.09},
+    {"pillar_id": pillar_id, "pillar_name": spec["name"], "weight": spec["weight"]}
+    for pillar_id, spec in PILLAR_RULES.groups.items()
 ]
 
 PILLAR_WEIGHTS = {p["pillar_id"]: p["weight"] for p in PILLARS}
 
-# Pilares prioritarios (urgencia nacional 2026)
-PRIORITY_PILLARS = {"P3", "P4", "P1", "P7"}  # Seguridad, Salud, Fiscal, Reforma
+# Pilares prioritarios (urgencia nacional 2026): Seguridad, Salud, Fiscal, Reforma
+PRIORITY_PILLARS = set(PILLAR_RULES.data["priority_pillars"])
 
 # Pilares críticos (incluye empleo y educación)
-CRITICAL_PILLARS = {"P3", "P4", "P1", "P7", "P2", "P5"}
+CRITICAL_PILLARS = set(PILLAR_RULES.data["critical_pillars"])
+
+def ordered_pillar_ids(pillar_ids) -> List[str]:
+    """Retorna los pilares del conjunto en el orden de PILLARS (salida determinista)."""
+    return [p["pillar_id"] for p in PILLARS if p["pillar_id"] in pillar_ids]
 
 # ====================================================================
 # KEYWORDS POR PILAR
 # ====================================================================
 
-PILLAR_KEYWORDS = {
-    "P1": [
-        "fiscal", "presupuesto", "deuda", "déficit", "regla fiscal", "gasto público",
-        "Hacienda", "finanzas", "tributario", "austeridad", "eficiencia",
-        "racionalización", "consolidación fiscal", "sostenibilidad", "reforma tributaria"
-    ],
-    "P2": [
-        "empleo", "trabajo", "desempleo", "informalidad", "PYME", "inversión extranjera",
-        "zona franca", "nearshoring", "competitividad", "IED", "exportación",
-        "productividad", "capacitación laboral", "salario", "formalización"
-    ],
-    "P3": [
-        "seguridad", "crimen", "narcotráfico", "policía", "fuerza pública", "OIJ",
-        "violencia", "homicidio", "robo", "hurto", "extorsión", "sicariato",
-        "cárcel", "prisión", "delito", "penitenciario", "vigilancia", "inteligencia"
-    ],
-    "P4": [
-        "salud", "CCSS", "Caja Costarricense", "hospital", "clínica", "médic",
-        "EBAIS", "lista de espera", "seguridad social", "pensión", "jubilación",
-        "IVM", "déficit actuarial", "cotizante", "asegurado", "farmacia"
-    ],
-    "P5": [
-        "educación", "escuela", "colegio", "universidad", "docente", "MEP",
-        "deserción escolar", "aprendizaje", "PISA", "educación técnica", "INA",
-        "beca", "infraestructura educativa", "calidad educativa", "8% PIB"
-    ],
-    "P6": [
-        "ambiente", "ambiental", "cambio climático", "carbono", "emisiones",
-        "renovable", "agua", "bosque", "biodiversidad", "conservación",
-        "contaminación", "reciclaje", "residuos", "SINAC", "MINAE"
-    ],
-    "P7": [
-        "reforma del estado", "modernización", "digitalización", "gobierno digital",
-        "simplificación", "corrupción", "transparencia", "contraloría", "auditoría",
-        "ética", "servidor público", "eficiencia", "burocracia", "trámite"
-    ],
-    "P8": [
-        "pobreza", "vulnerable", "desigualdad", "bono", "subsidio", "IMAS",
-        "FODESAF", "programa social", "niñez", "adulto mayor", "discapacidad",
-        "vivienda social", "BANHVI", "focalización"
-    ],
-    "P9": [
-        "política exterior", "diplomacia", "comercio internacional", "TLC",
-        "exportación", "cooperación internacional", "ONU", "OEA", "SICA",
-        "bilateral", "multilateral", "Estados Unidos", "China"
-    ],
-    "P10": [
-        "infraestructura", "carretera", "ruta", "puente", "puerto", "aeropuerto",
-        "obra pública", "concesión", "APP", "alianza público-privada", "CONAVI",
-        "MOPT", "transporte", "ferrocarril", "tren", "vial", "construcción"
-    ]
-}
+PILLAR_KEYWORDS = {pillar_id: PILLAR_RULES.keywords(pillar_id) for pillar_id in PILLAR_RULES.groups}
+
+# Compiladas una sola vez (Aho-Corasick con pyahocorasick, trie regex sin él)
+PILLAR_AUTOMATON = PILLAR_RULES.automaton
 
 # ====================================================================
 # INDICADORES PARA DIMENSIONES D1-D4
 # ====================================================================
 
-TIME_INDICATORS_VALID = [
-    r"primer(?:o|a)?\s*(?:año|mes|semestre|trimestre)",
-    r"primeros?\s*100\s*días",
-    r"primeros?\s*\d+\s*(?:años?|meses?|días?)",
-    r"20\d{2}[-–]20\d{2}",
-    r"cuatrienio",
-    r"durante\s*el\s*(?:gobierno|período|cuatrienio)",
-    r"al\s*(?:inicio|final)\s*del?\s*gobierno",
-]
+DIMENSION_RULES = rule_packs.load_rule_pack("dimensions")
 
-HOW_INDICATORS = [
-    r"mediante\s+(?:la|el|un|una)\s+\w+",
-    r"a\s*través\s*de",
-    r"proyecto\s*de\s*ley",
-    r"decreto\s*ejecutivo",
-    r"programa\s+(?:de|para|nacional)",
-    r"plan\s*(?:de\s*)?(?:acción|nacional)",
-    r"reforma\s+(?:a|de|del|al)",
-    r"crear(?:á|emos)?\s+(?:una?|el|la)",
-    r"establecer(?:á|emos)?",
-    r"implementar(?:á|emos)?",
-]
+TIME_INDICATORS_VALID = DIMENSION_RULES.patterns("when")
+HOW_INDICATORS = DIMENSION_RULES.patterns("how")
+FUNDING_INDICATORS = DIMENSION_RULES.patterns("funding")
+EXISTENCE_INDICATORS = DIMENSION_RULES.patterns("existence")
 
-FUNDING_INDICATORS = [
-    r"financ(?:iar|iamiento|iado)",
-    r"presupuest(?:o|ar|ario)",
-    r"recursos?\s*(?:públicos?|del\s+Estado)",
-    r"fondos?\s*(?:públicos?|del\s+Estado)",
-    r"reasignación",
-    r"ahorro\s*(?:fiscal|público)",
-    r"eficiencia\s*en\s*el\s*gasto",
-    r"cooperación\s*internacional",
-    r"APP\b",
-    r"alianza\s*público[-\s]?privada",
-    r"concesión",
-    r"\d+(?:\.\d+)?\s*(?:millones?|billones?)",
-    r"\d+(?:[.,]\d+)?%\s*del\s*(?:PIB|presupuesto)",
-]
+# Indicadores de cada dimensión, compilados una sola vez; cuenta el primer patrón de
+# la lista que aparece en el párrafo (ver indicator_matcher)
+DIMENSION_MATCHER = DIMENSION_RULES.matcher
 
 # ====================================================================
 # PENALIZACIONES v6 - NEUTRAL + ESTRICTO
 # ====================================================================
 
-# PENALIZACIÓN FISCAL SEVERA: Flexibilizar regla fiscal (-2)
-# Objetivo: basado en Ley 9635 vigente
-FISCAL_RULE_ATTACK_PATTERNS = [
-    r"(?:flexibilizar|reformar|modificar|eliminar|excluir|suspender).*regla\s*fiscal",
-    r"regla\s*fiscal.*(?:flexibilizar|reformar|modificar|eliminar|excluir|suspender)",
-    r"(?:limita|impide|obstaculiza).*regla\s*fiscal",
-    r"regla\s*fiscal.*(?:limita|impide|obstaculiza)",
-    r"(?:revisión|revisar).*(?:crítica|profunda).*regla\s*fiscal",
-]
-
-# PENALIZACIÓN FISCAL: Proponer aumento de deuda (-1)
-DEBT_INCREASE_PATTERNS = [
-    r"(?:aumentar|incrementar|ampliar|expandir)\s*(?:la\s*)?(?:deuda|endeudamiento)",
-    r"(?:nuevo|nueva|más)\s*(?:deuda|endeudamiento|crédito\s*público)",
-    r"(?:emitir|emisión)\s*(?:de\s*)?(?:bonos?|deuda)",
-    r"financiar.*(?:mediante|con)\s*(?:deuda|endeudamiento)",
-]
-
-# NOTA v6: ELIMINADO - proponer impuestos NO se penaliza (es posición ideológica legítima)
-# TAX_INCREASE_PATTERNS = [...]  # REMOVIDO
-
-# INDICADORES POSITIVOS (mitigan riesgo)
-FISCAL_RESPONSIBILITY_INDICATORS = [
-    r"sostenibilidad\s*fiscal",
-    r"responsabilidad\s*fiscal",
-    r"equilibrio\s*fiscal",
-    r"reducir\s*(?:el\s*)?(?:déficit|gasto)",
-    r"eficiencia\s*(?:del\s*)?gasto",
-    r"austeridad",
-    r"respetar.*regla\s*fiscal",
-    r"cumplir.*regla\s*fiscal",
-    r"mantener.*regla\s*fiscal",
-]
+# Las reglas con términos separados ("A ... B") son reglas de proximidad (ver
+# proximity.py): B debe aparecer a PROXIMITY_WINDOW palabras o menos de A. Se evalúan
+# sobre el texto completo del plan, que es una sola línea: un `.*` unía términos
+# separados por decenas de páginas.
+
+# Penalización y motivo de cada grupo en data/rules/fiscal.json:
+#   attacks_fiscal_rule (-2, Ley 9635 vigente), proposes_debt_increase (-1),
+#   shows_fiscal_responsibility (indicadores positivos, mitigan riesgo)
+# NOTA v6: proponer impuestos NO se penaliza (es posición ideológica legítima)
+FISCAL_RULES = rule_packs.load_rule_pack("fiscal")
+
+FISCAL_RULE_ATTACK_RULES = FISCAL_RULES.rules("attacks_fiscal_rule")
+DEBT_INCREASE_RULES = FISCAL_RULES.rules("proposes_debt_increase")
+FISCAL_RESPONSIBILITY_RULES = FISCAL_RULES.rules("shows_fiscal_responsibility")
+
+# Penalización de cada grupo fiscal (la registran ranking.json y el resumen de
+# process_all_pdfs, con los mismos nombres que recalculate_scores_v6.py)
+FISCAL_PENALTIES = {
+    group: spec["penalty"]
+    for group, spec in FISCAL_RULES.groups.items()
+    if "penalty" in spec
+}
 
 # ====================================================================
 # URGENCIAS NACIONALES v6 - CRITERIOS DE OMISIÓN
 # ====================================================================
 
-# Términos que indican que el candidato aborda la urgencia
-URGENCY_TERMS = {
-    "security_operations": {
-        "terms": ["policía", "fuerza pública", "OIJ", "inteligencia", "patrullaje", 
-                  "operativo", "vigilancia", "control territorial"],
-        "description": "Seguridad operativa",
-        "penalty": -1
-    },
-    "ccss_crisis": {
-        "terms": ["CCSS", "Caja Costarricense", "déficit actuarial", "listas de espera", 
-                  "IVM", "régimen de pensiones", "sostenibilidad CCSS"],
-        "description": "Crisis de la CCSS",
-        "penalty": -1
-    },
-    "formal_employment": {
-        "terms": ["empleo formal", "formalización", "informalidad laboral", "trabajo decente",
-                  "cotizante", "seguro social obligatorio"],
-        "description": "Empleo formal",
-        "penalty": -0.5
-    },
-    "organized_crime": {
-        "terms": ["crimen organizado", "narcotráfico", "sicariato", "extorsión",
-                  "lavado de dinero", "cartel", "banda criminal"],
-        "description": "Crimen organizado",
-        "penalty": -0.5
-    }
-}
+# Términos que indican que el candidato aborda cada urgencia, con su descripción y
+# penalización si no aparece ninguno
+URGENCY_RULES = rule_packs.load_rule_pack("urgencies")
 
 # Penalización por pilar prioritario sin propuesta concreta
-MISSING_PRIORITY_PILLAR_PENALTY = -0.5
+MISSING_PRIORITY_PILLAR_PENALTY = URGENCY_RULES.data["missing_priority_pillar_penalty"]
+
+# Penalización por omisión, indexada por el omission_flag de cada urgencia
+OMISSION_PENALTIES = {
+    spec["omission_flag"]: spec["penalty"]
+    for spec in URGENCY_RULES.groups.values()
+}
+OMISSION_PENALTIES["missing_priority_pillar"] = MISSING_PRIORITY_PILLAR_PENALTY
 
 # ====================================================================
-# FUNCIONES UTILITARIAS
+# DECODIFICACIÓN DE CID
 # ====================================================================
 
-def clean_cid_characters(text: str) -> str:
+# Mapeo de CID comunes a caracteres reales (basado en patrones comunes en PDFs)
+# Estos son valores comunes que aparecen frecuentemente en PDFs con problemas de encoding
+# NOTA: Los CID son específicos de cada PDF y fuente, por lo que este mapeo es aproximado.
+# Para corregir un PDF o una fuente concreta sin tocar el código usar CID_OVERRIDES_FILE.
+CID_MAPPING = {
+    # Espacios y separadores comunes
+    1228: ' ',  # Espacio común en muchos PDFs
+    32: ' ',    # Espacio estándar ASCII
+    # Letras mayúsculas, minúsculas y números comunes (ASCII)
+    **{code: chr(code) for code in range(ord('A'), ord('Z') + 1)},
+    **{code: chr(code) for code in range(ord('a'), ord('z') + 1)},
+    **{code: chr(code) for code in range(ord('0'), ord('9') + 1)},
+    # Caracteres comunes en español (aproximaciones basadas en patrones observados en PPSO)
+    # NOTA: Estos son aproximaciones basadas en análisis de contexto y pueden no ser 100% precisos
+    # Los CID son específicos de cada PDF y fuente, pero estos son patrones comunes observados
+    212: 'é',  # é común (observado en "estandarizada", "establecer")
+    240: 'ó',  # ó común (observado en "correcta", "organizada")
+    253: 'í',  # í común (observado en "implementación", "digital")
+    246: 'ó',  # ó común (variante, observado en "totalidad")
+    282: 'a',  # a común
+    286: 'c',  # c común (observado en "correcta", "actualización")
+    309: 'a',  # a común (observado en "actualización", "aprobación")
+    316: 'n',  # n común (observado en "implementación", "organizada")
+    317: 'o',  # o común (observado en "correcta", "organizada")
+    323: 'i',  # i común
+    325: 's',  # s común (observado en "estandarizada", "establecer")
+    353: 'e',  # e común (observado en "estandarizada", "establecer")
+    355: 'e',  # e común (variante)
+    356: 'l',  # l común (observado en "legislación", "laboral")
+    363: 'o',  # o común (variante)
+    371: 'r',  # r común (observado en "correcta", "organizada")
+    377: 't',  # t común (observado en "totalidad", "establecer")
+    398: 'a',  # a común (variante)
+    402: '•',  # viñeta/bullet point común
+    404: '•',  # viñeta/bullet point (variante)
+    414: 'a',  # a común (variante)
+    482: 'a',  # a común (variante)
+    # Rango común de espacios y separadores
+    1139: ' ', 1140: ' ', 1235: ' ', 1236: ' ', 1237: ' ',
+}
+
+# Tablas de corrección por PDF: {"pdf_id": {"cid": "carácter"}}
+# Las claves que empiezan con "_" se ignoran (comentarios). Los tokens (cid:N) salen
+# de extract_text() de pdfplumber, que no conserva la fuente de cada carácter: las
+# correcciones aplican a todo el PDF.
+CID_OVERRIDES_FILE = os.path.join(DATA_DIR, "cid_overrides.json")
+
+CID_TOKEN_PATTERN = re.compile(r'\(cid:(\d+)\)')
+
+
+def _unknown_cid_replacement(num: int) -> str:
+    """CID no mapeado: espacio si está en un rango común de separadores, si no se elimina."""
+    if 32 <= num <= 47 or 1228 <= num <= 1235:
+        return ' '
+    return ''
+
+
+def _build_cid_table(mapping: Dict[int, str]) -> Dict[str, str]:
+    """
+    Tabla de búsqueda indexada por los dígitos del token, con el reemplazo ya
+    resuelto (incluido el de los CID desconocidos de los rangos habituales).
+    """
+    table = {str(num): _unknown_cid_replacement(num) for num in range(0, 2048)}
+    table.update({str(num): replacement for num, replacement in mapping.items()})
+    return table
+
+
+_CID_BASE_TABLE = _build_cid_table(CID_MAPPING)
+_cid_overrides = None
+_cid_tables = {}
+
+
+def load_cid_overrides() -> Dict[str, Dict[int, str]]:
+    """Carga (una sola vez) las tablas de corrección de CID por PDF."""
+    global _cid_overrides
+    if _cid_overrides is not None:
+        return _cid_overrides
+    
+    _cid_overrides = {}
+    if os.path.exists(CID_OVERRIDES_FILE):
+        try:
+            with open(CID_OVERRIDES_FILE, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for pdf_id, table in data.items():
+                if pdf_id.startswith("_"):
+                    continue
+                _cid_overrides[pdf_id.lower()] = {
+                    int(cid): char for cid, char in table.items()
+                    if not cid.startswith("_")
+                }
+        except (json.JSONDecodeError, ValueError, AttributeError, OSError) as e:
+            print(f"⚠️  Error cargando {os.path.basename(CID_OVERRIDES_FILE)}: {e}")
+    return _cid_overrides
+
+
+def cid_overrides_digest(pdf_id: Optional[str]) -> str:
+    """Huella de las correcciones de CID de un PDF (para la clave de caché)."""
+    if not pdf_id:
+        return ""
+    overrides = load_cid_overrides().get(pdf_id.lower())
+    if not overrides:
+        return ""
+    payload = json.dumps(overrides, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def get_cid_table(pdf_id: Optional[str] = None) -> Dict[str, str]:
+    """Tabla de decodificación para un PDF: mapeo base más las correcciones del PDF."""
+    key = (pdf_id or "").lower()
+    table = _cid_tables.get(key)
+    if table is not None:
+        return table
+    
+    overrides = load_cid_overrides().get(key) if pdf_id else None
+    if not overrides:
+        table = _CID_BASE_TABLE
+    else:
+        mapping = dict(CID_MAPPING)
+        mapping.update(overrides)
+        table = _build_cid_table(mapping)
+    _cid_tables[key] = table
+    return table
+
+
+def clean_cid_characters(text: str, pdf_id: Optional[str] = None) -> str:
     """
-    Limpia caracteres CID (Character ID) que aparecen cuando PyMuPDF no puede
+    Limpia caracteres CID (Character ID) que aparecen cuando el extractor no puede
     interpretar correctamente ciertos caracteres del PDF.
     
     Formato: (cid:XXX) donde XXX es un número.
     
-    Estrategia:
-    1. Algunos CID comunes se mapean a caracteres conocidos (espacios, letras comunes)
-    2. El resto se elimina o reemplaza con espacio según contexto
+    Todos los tokens se resuelven en una sola pasada con una tabla precalculada:
+    1. Los CID conocidos se mapean a caracteres (CID_MAPPING + correcciones del PDF)
+    2. El resto se reemplaza por espacio (rangos de separadores) o se elimina
     """
-    if not text:
+    if not text or '(cid:' not in text:
         return text
     
-    # Mapeo de CID comunes a caracteres reales (basado en patrones comunes en PDFs)
-    # Estos son valores comunes que aparecen frecuentemente en PDFs con problemas de encoding
-    # NOTA: Los CID son específicos de cada PDF y fuente, por lo que este mapeo es aproximado
-    cid_mapping = {
-        # Espacios y separadores comunes
-        '(cid:1228)': ' ',  # Espacio común en muchos PDFs
-        '(cid:32)': ' ',   # Espacio estándar ASCII
-        # Letras mayúsculas comunes (ASCII)
-        '(cid:65)': 'A', '(cid:66)': 'B', '(cid:67)': 'C', '(cid:68)': 'D',
-        '(cid:69)': 'E', '(cid:70)': 'F', '(cid:71)': 'G', '(cid:72)': 'H',
-        '(cid:73)': 'I', '(cid:74)': 'J', '(cid:75)': 'K', '(cid:76)': 'L',
-        '(cid:77)': 'M', '(cid:78)': 'N', '(cid:79)': 'O', '(cid:80)': 'P',
-        '(cid:81)': 'Q', '(cid:82)': 'R', '(cid:83)': 'S', '(cid:84)': 'T',
-        '(cid:85)': 'U', '(cid:86)': 'V', '(cid:87)': 'W', '(cid:88)': 'X',
-        '(cid:89)': 'Y', '(cid:90)': 'Z',
-        # Letras minúsculas comunes (ASCII)
-        '(cid:97)': 'a', '(cid:98)': 'b', '(cid:99)': 'c', '(cid:100)': 'd',
-        '(cid:101)': 'e', '(cid:102)': 'f', '(cid:103)': 'g', '(cid:104)': 'h',
-        '(cid:105)': 'i', '(cid:106)': 'j', '(cid:107)': 'k', '(cid:108)': 'l',
-        '(cid:109)': 'm', '(cid:110)': 'n', '(cid:111)': 'o', '(cid:112)': 'p',
-        '(cid:113)': 'q', '(cid:114)': 'r', '(cid:115)': 's', '(cid:116)': 't',
-        '(cid:117)': 'u', '(cid:118)': 'v', '(cid:119)': 'w', '(cid:120)': 'x',
-        '(cid:121)': 'y', '(cid:122)': 'z',
-        # Números comunes
-        '(cid:48)': '0', '(cid:49)': '1', '(cid:50)': '2', '(cid:51)': '3',
-        '(cid:52)': '4', '(cid:53)': '5', '(cid:54)': '6', '(cid:55)': '7',
-        '(cid:56)': '8', '(cid:57)': '9',
-        # Caracteres comunes en español (aproximaciones basadas en patrones observados en PPSO)
-        # NOTA: Estos son aproximaciones basadas en análisis de contexto y pueden no ser 100% precisos
-        # Los CID son específicos de cada PDF y fuente, pero estos son patrones comunes observados
-        '(cid:212)': 'é',  # é común (observado en "estandarizada", "establecer")
-        '(cid:240)': 'ó',  # ó común (observado en "correcta", "organizada")
-        '(cid:253)': 'í',  # í común (observado en "implementación", "digital")
-        '(cid:246)': 'ó',  # ó común (variante, observado en "totalidad")
-        '(cid:282)': 'a',  # a común
-        '(cid:286)': 'c',  # c común (observado en "correcta", "actualización")
-        '(cid:309)': 'a',  # a común (observado en "actualización", "aprobación")
-        '(cid:316)': 'n',  # n común (observado en "implementación", "organizada")
-        '(cid:317)': 'o',  # o común (observado en "correcta", "organizada")
-        '(cid:323)': 'i',  # i común
-        '(cid:325)': 's',  # s común (observado en "estandarizada", "establecer")
-        '(cid:353)': 'e',  # e común (observado en "estandarizada", "establecer")
-        '(cid:355)': 'e',  # e común (variante)
-        '(cid:356)': 'l',  # l común (observado en "legislación", "laboral")
-        '(cid:363)': 'o',  # o común (variante)
-        '(cid:371)': 'r',  # r común (observado en "correcta", "organizada")
-        '(cid:377)': 't',  # t común (observado en "totalidad", "establecer")
-        '(cid:398)': 'a',  # a común (variante)
-        '(cid:402)': '•',  # viñeta/bullet point común
-        '(cid:404)': '•',  # viñeta/bullet point (variante)
-        '(cid:414)': 'a',  # a común (variante)
-        '(cid:482)': 'a',  # a común (variante)
-        # Rango común de espacios y separadores
-        '(cid:1139)': ' ', '(cid:1140)': ' ', '(cid:1235)': ' ', '(cid:1236)': ' ', '(cid:1237)': ' ',
-    }
+    table = get_cid_table(pdf_id)
     
-    # Primero, reemplazar CID conocidos
-    for cid, replacement in cid_mapping.items():
-        text = text.replace(cid, replacement)
+    # split() deja el texto en las posiciones pares y los números de CID en las impares
+    # (los números fuera de la tabla, grandes o con ceros a la izquierda, no coinciden
+    # con ningún CID mapeado y se resuelven con _unknown_cid_replacement)
+    parts = CID_TOKEN_PATTERN.split(text)
+    parts[1::2] = [
+        table[digits] if digits in table else _unknown_cid_replacement(int(digits))
+        for digits in parts[1::2]
+    ]
+    return "".join(parts)
+
+# ====================================================================
+# FUNCIONES UTILITARIAS
+# ====================================================================
+
+# Caracteres de control que se eliminan (se conservan \t, \n y \r, que son espacios)
+CONTROL_CHARS_PATTERN = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]')
+# "Ia" → "la" (error común de EasyOCR en español)
+EASYOCR_IA_PATTERN = re.compile(r'\bIa\b')
+# Separación entre párrafos: una línea en blanco (o más)
+PARAGRAPH_BREAK_PATTERN = re.compile(r'\n\s*\n')
+
+def normalize_text(text: str, pdf_id: Optional[str] = None, preserve_paragraphs: bool = False) -> str:
+    """
+    Normaliza el texto extraído, incluyendo correcciones para EasyOCR y limpieza de CID.
     
-    # Para CID no mapeados, intentar inferir si es espacio o eliminarlo
-    # Patrón: (cid:XXX) donde XXX es cualquier número
-    def replace_unknown_cid(match):
-        cid_num = match.group(1)
-        # Si el CID está entre valores comunes de espacios/separadores, usar espacio
-        # De lo contrario, eliminar
-        try:
-            num = int(cid_num)
-            # Rango común de espacios y caracteres de control
-            if 32 <= num <= 47 or 1228 <= num <= 1235:
-                return ' '
-            # Otros CID: eliminar (no podemos inferir el carácter real)
-            return ''
-        except ValueError:
-            return ''
-    
-    # Reemplazar todos los CID restantes
-    text = re.sub(r'\(cid:(\d+)\)', replace_unknown_cid, text)
+    Cada regla solo copia la página si tiene algo que corregir (los caracteres de
+    control y "Ia" son raros: se buscan antes de reemplazar) y los espacios se
+    colapsan y recortan en una pasada con split/join (mismo conjunto de espacios
+    Unicode que \\s).
     
-    return text
-
-def normalize_text(text: str) -> str:
-    """Normaliza el texto extraído, incluyendo correcciones para EasyOCR y limpieza de CID."""
+    Con preserve_paragraphs=True las líneas en blanco se conservan como "\\n\\n"
+    (el resto de los espacios se colapsa igual); por defecto todo queda en una línea.
+    """
     if not text:
         return ""
     
     # PRIMERO: Limpiar caracteres CID (debe hacerse antes de otras normalizaciones)
-    text = clean_cid_characters(text)
+    text = clean_cid_characters(text, pdf_id)
     
     # Eliminar caracteres de control
-    text = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]', '', text)
+    if CONTROL_CHARS_PATTERN.search(text):
+        text = CONTROL_CHARS_PATTERN.sub('', text)
     
     # Correcciones específicas para EasyOCR
-    # "Ia" → "la" (error común de EasyOCR en español)
-    text = re.sub(r'\bIa\b', 'la', text)
-    text = re.sub(r'\bIa\n', 'la\n', text)
-    
-    # Normalizar espacios múltiples
-    text = re.sub(r'\s+', ' ', text)
+    if 'Ia' in text:
+        text = EASYOCR_IA_PATTERN.sub('la', text)
     
-    # Normalizar saltos de línea múltiples
-    text = re.sub(r'\n\s*\n+', '\n\n', text)
-    
-    return text.strip()
+    # Normalizar espacios (y saltos de línea, salvo los de párrafo si se piden)
+    if preserve_paragraphs:
+        paragraphs = (" ".join(paragraph.split()) for paragraph in PARAGRAPH_BREAK_PATTERN.split(text))
+        return "\n\n".join(paragraph for paragraph in paragraphs if paragraph)
+    return " ".join(text.split())
 
 def generate_proposal_id(pdf_id: str, text: str) -> str:
     hash_input = f"{pdf_id}:{text[:100]}"
@@ -440,13 +490,8 @@ def slugify(text: str) -> str:
 # ====================================================================
 
 def detect_corrupt_text(text: str) -> Tuple[bool, float]:
-    """Detecta si un texto tiene caracteres de fuentes corruptas."""
-    if not text:
-        return False, 0.0
-    total_chars = len(text)
-    corrupt_count = sum(1 for char in text if char in CORRUPT_CHARS)
-    corrupt_ratio = corrupt_count / total_chars if total_chars > 0 else 0
-    return corrupt_ratio > CORRUPT_THRESHOLD, corrupt_ratio
+    """Detecta si un texto tiene caracteres de fuentes corruptas (conteo vectorizado, ver text_quality)."""
+    return text_quality.detect_corrupt_text(text, CORRUPT_CHARS, CORRUPT_THRESHOLD)
 
 
 # Variable global para el lector EasyOCR (inicializado una sola vez)
@@ -458,97 +503,1034 @@ def get_easyocr_reader():
     if _easyocr_reader is None and EASYOCR_AVAILABLE:
         try:
             import easyocr
-            _easyocr_reader = easyocr.Reader(['es', 'en'], gpu=False)
+            _easyocr_reader = easyocr.Reader(EASYOCR_LANGUAGES, gpu=False)
         except Exception as e:
             print(f"    ⚠️  Error inicializando EasyOCR: {e}")
             return None
     return _easyocr_reader
 
 
-def extract_page_with_ocr(page, dpi: int = RENDER_DPI) -> str:
+def render_page_for_ocr(page, dpi: int = RENDER_DPI, grayscale: bool = OCR_RENDER_GRAYSCALE, clip=None):
     """
-    Extrae texto de una página usando OCR.
-    Prioriza EasyOCR, con fallback a Tesseract si EasyOCR no está disponible.
+    Renderiza una página (o solo la región clip) como pixmap para OCR
+    (escala de grises por defecto, sin canal alfa). Las páginas completas pasan
+    por la caché de renders en disco (render_cache).
+    """
+    load_fitz()
+    return render_cache.render_page(page, dpi, grayscale, clip)
+
+
+def pixmap_to_array(pix):
+    """
+    Vista NumPy sobre los píxeles del pixmap, sin copiar ni recodificar.
+    El pixmap debe seguir vivo mientras se use la vista.
+    """
+    load_ocr_modules()
+    rows = np.frombuffer(pix.samples_mv, dtype=np.uint8).reshape(pix.height, pix.stride)
+    pixels = rows[:, :pix.width * pix.n]
+    if pix.n == 1:
+        return pixels
+    return pixels.reshape(pix.height, pix.width, pix.n)
+
+
+def pixmap_to_pil(pix):
+    """Imagen PIL que comparte el buffer del pixmap (solo para Tesseract)."""
+    load_ocr_modules()
+    mode = "L" if pix.n == 1 else "RGB"
+    return Image.frombuffer(mode, (pix.width, pix.height), pix.samples_mv, "raw", mode, pix.stride, 1)
+
+
+# Palabra reconocida por OCR: (x0, y0, x1, y1, texto) en coordenadas de la página (puntos PDF)
+OcrWord = Tuple[float, float, float, float, str]
+
+def _tesseract_text_and_words(image, scale: float, offset: Tuple[float, float] = (0.0, 0.0)) -> Tuple[str, List[OcrWord]]:
+    """Texto (una línea por renglón de Tesseract) y cajas de palabras con image_to_data."""
+    data = pytesseract.image_to_data(image, config=TESSERACT_CONFIG, output_type=pytesseract.Output.DICT)
+    lines = defaultdict(list)
+    words = []
+    for i, word in enumerate(data["text"]):
+        if not word or not word.strip():
+            continue
+        lines[(data["block_num"][i], data["par_num"][i], data["line_num"][i])].append(word)
+        left, top = data["left"][i], data["top"][i]
+        words.append((
+            offset[0] + left / scale, offset[1] + top / scale,
+            offset[0] + (left + data["width"][i]) / scale, offset[1] + (top + data["height"][i]) / scale,
+            word
+        ))
+    text = "\n".join(" ".join(line) for line in lines.values())
+    return text, words
+
+
+# Motor tesserocr del proceso actual (el modelo se carga una sola vez por proceso)
+_tesserocr_api = None
+# Carpeta tessdata para el Tesseract integrado en MuPDF (se busca una sola vez)
+_mupdf_tessdata = None
+
+def get_tesserocr_api():
+    """Obtiene o inicializa el motor tesserocr (singleton por proceso)."""
+    global _tesserocr_api
+    if _tesserocr_api is None:
+        tesserocr = importlib.import_module("tesserocr")
+        _tesserocr_api = tesserocr.PyTessBaseAPI(lang=TESSERACT_LANGUAGE, oem=TESSERACT_OEM, psm=TESSERACT_PSM)
+    return _tesserocr_api
+
+
+def get_mupdf_tessdata() -> Optional[str]:
+    """Carpeta tessdata que usará MuPDF (TESSDATA_PREFIX o la instalación de Tesseract), o None."""
+    global _mupdf_tessdata
+    if _mupdf_tessdata is None:
+        try:
+            _mupdf_tessdata = load_fitz().get_tessdata()
+        except Exception:
+            return None
+    return _mupdf_tessdata
+
+
+def tesseract_backend_available(backend: str) -> bool:
+    """Indica si el backend de Tesseract puede usarse en este entorno."""
+    if backend == "pytesseract":
+        return PYTESSERACT_AVAILABLE
+    if backend == "tesserocr":
+        return TESSEROCR_AVAILABLE
+    if backend == "mupdf":
+        return PDF_AVAILABLE and get_mupdf_tessdata() is not None
+    return False
+
+
+def set_tesseract_backend(backend: str) -> str:
+    """
+    Selecciona el backend de Tesseract del proceso actual. Si no está disponible
+    se conserva el actual. Retorna el backend en uso.
+    """
+    global TESSERACT_BACKEND, TESSERACT_AVAILABLE, OCR_AVAILABLE
+    if backend not in TESSERACT_BACKENDS:
+        raise ValueError(f"Backend de Tesseract desconocido: {backend}")
+    if backend != TESSERACT_BACKEND:
+        if tesseract_backend_available(backend):
+            TESSERACT_BACKEND = backend
+            TESSERACT_AVAILABLE = True
+            OCR_AVAILABLE = True
+        else:
+            print(f"⚠️ Backend Tesseract '{backend}' no disponible, se usa '{TESSERACT_BACKEND}'")
+    return TESSERACT_BACKEND
+
+
+def _tesserocr_text_and_words(pix, scale: float, offset: Tuple[float, float], with_words: bool) -> Tuple[str, List[OcrWord]]:
+    """Tesseract en el propio proceso: lee el buffer del pixmap sin imagen intermedia."""
+    api = get_tesserocr_api()
+    # Tesseract no copia el buffer: debe seguir vivo hasta reconocer la imagen
+    samples = pix.samples
+    api.SetImageBytes(samples, pix.width, pix.height, pix.n, pix.stride)
+    api.SetSourceResolution(round(scale * 72))
+    try:
+        text = api.GetUTF8Text()
+        words = []
+        if with_words:
+            tesserocr = importlib.import_module("tesserocr")
+            level = tesserocr.RIL.WORD
+            for item in tesserocr.iterate_level(api.GetIterator(), level):
+                word = item.GetUTF8Text(level)
+                box = item.BoundingBox(level)
+                if not word or not word.strip() or box is None:
+                    continue
+                left, top, right, bottom = box
+                words.append((
+                    offset[0] + left / scale, offset[1] + top / scale,
+                    offset[0] + right / scale, offset[1] + bottom / scale,
+                    word
+                ))
+        return text, words
+    finally:
+        api.Clear()
+
+
+def _mupdf_text_and_words(pix, dpi: int, offset: Tuple[float, float], with_words: bool) -> Tuple[str, List[OcrWord]]:
+    """
+    Tesseract integrado en MuPDF: el pixmap se convierte en una página PDF con capa
+    de texto en memoria (sin PNG ni archivos temporales) y se lee con get_text.
+    """
+    pix.set_dpi(dpi, dpi)  # la página OCR mide lo mismo que la región original
+    ocr_pdf = pix.pdfocr_tobytes(compress=False, language=TESSERACT_LANGUAGE, tessdata=get_mupdf_tessdata())
+    with load_fitz().open("pdf", ocr_pdf) as ocr_doc:
+        ocr_page = ocr_doc[0]
+        text = ocr_page.get_text()
+        words = [
+            (offset[0] + x0, offset[1] + y0, offset[0] + x1, offset[1] + y1, word)
+            for x0, y0, x1, y1, word, *_ in ocr_page.get_text("words")
+        ] if with_words else []
+    return text, words
+
+
+def _tesseract_recognize(pix, dpi: int, with_words: bool) -> List[Any]:
+    """Reconoce el pixmap con TESSERACT_BACKEND. Retorna [texto, palabras] (relativas al pixmap)."""
+    scale = dpi / 72
+    offset = (0.0, 0.0)
+    if TESSERACT_BACKEND == "tesserocr":
+        text, words = _tesserocr_text_and_words(pix, scale, offset, with_words)
+    elif TESSERACT_BACKEND == "mupdf":
+        text, words = _mupdf_text_and_words(pix, dpi, offset, with_words)
+    elif with_words:
+        text, words = _tesseract_text_and_words(pixmap_to_pil(pix), scale, offset)
+    else:
+        text, words = pytesseract.image_to_string(pixmap_to_pil(pix), config=TESSERACT_CONFIG), []
+    return [text, [list(word) for word in words]]
+
+
+def _tesseract_pixmap(pix, dpi: int, offset: Tuple[float, float] = (0.0, 0.0), with_words: bool = False) -> Tuple[str, List[OcrWord]]:
+    """
+    Texto y (con with_words=True) cajas de palabras de un pixmap con el backend
+    TESSERACT_BACKEND. Un pixmap idéntico ya reconocido se lee de la caché OCR.
+    """
+    config = {"config": TESSERACT_CONFIG, "dpi": dpi, "words": with_words}
+    text, words = ocr_cache.cached_ocr(
+        pix, TESSERACT_BACKEND, TESSERACT_LANGUAGE, config,
+        lambda: _tesseract_recognize(pix, dpi, with_words)
+    )
+    return text, [
+        (offset[0] + x0, offset[1] + y0, offset[0] + x1, offset[1] + y1, word)
+        for x0, y0, x1, y1, word in words
+    ]
+
+
+# Caja de EasyOCR en coordenadas de la página, con su confianza
+EasyOcrBox = Tuple[float, float, float, float, str, float]
+
+def _easyocr_results_to_boxes(results, render_dpi: int, region=None) -> List[EasyOcrBox]:
+    """Convierte la salida de readtext (píxeles del render) a coordenadas de la página."""
+    scale = render_dpi / 72
+    offset_x, offset_y = (region.x0, region.y0) if region is not None else (0.0, 0.0)
+    boxes = []
+    for box, box_text, confidence in results:
+        xs = [float(point[0]) for point in box]
+        ys = [float(point[1]) for point in box]
+        boxes.append((
+            offset_x + min(xs) / scale, offset_y + min(ys) / scale,
+            offset_x + max(xs) / scale, offset_y + max(ys) / scale,
+            box_text, float(confidence)
+        ))
+    return boxes
+
+
+def _easyocr_results_to_json(results) -> List[Any]:
+    """Salida de readtext como listas y floats (serializable; misma forma que la caché OCR)."""
+    return [
+        [[[float(point[0]), float(point[1])] for point in box], box_text, float(confidence)]
+        for box, box_text, confidence in results
+    ]
+
+
+def easyocr_cache_key(pix, batch_size: int = 1) -> Optional[str]:
+    """Clave en la caché OCR de la lectura de un pixmap con EasyOCR (None si no aplica)."""
+    # El reconocimiento agrupa las cajas en lotes de batch_size: forma parte de la configuración
+    return ocr_cache.ocr_cache_key(pix, "easyocr", EASYOCR_LANGUAGES, {"batch_size": batch_size})
+
+
+def _easyocr_readtext(reader, pix) -> List[Any]:
+    """readtext sobre un pixmap; un pixmap idéntico ya reconocido se lee de la caché OCR."""
+    key = easyocr_cache_key(pix)
+    results = ocr_cache.load_ocr_result(key)
+    if results is None:
+        results = _easyocr_results_to_json(reader.readtext(pixmap_to_array(pix)))
+        ocr_cache.save_ocr_result(key, "easyocr", results)
+    return results
+
+
+def _easyocr_read(page, reader, render_dpi: int, region=None) -> Tuple[List[EasyOcrBox], int]:
+    """Renderiza la página (o la región) y la lee con EasyOCR. Retorna (cajas, píxeles)."""
+    pix = render_page_for_ocr(page, render_dpi, clip=region)
+    results = _easyocr_readtext(reader, pix)
+    return _easyocr_results_to_boxes(results, render_dpi, region), pix.width * pix.height
+
+
+def _refine_easyocr_boxes(
+    page,
+    reader,
+    boxes: List[EasyOcrBox],
+    pixels: int,
+    dpi: int,
+    clip=None
+) -> Tuple[List[OcrWord], int, int]:
+    """
+    Segunda etapa de la cascada: a partir de una lectura a OCR_BASE_DPI, vuelve a
+    renderizar a `dpi` solo las cajas con confianza menor que OCR_MIN_CONFIDENCE.
+    Si no se detectó nada o las cajas dudosas cubren más de OCR_FULL_RERENDER_RATIO
+    del texto, se relee todo a `dpi`.
+    
+    Retorna (cajas sin confianza, píxeles procesados en total, DPI máximo usado).
+    """
+    low = [i for i, box in enumerate(boxes) if box[5] < OCR_MIN_CONFIDENCE]
+    if boxes and not low:
+        return [box[:5] for box in boxes], pixels, OCR_BASE_DPI
+    
+    def area(box) -> float:
+        return (box[2] - box[0]) * (box[3] - box[1])
+    
+    if not boxes or sum(area(boxes[i]) for i in low) > OCR_FULL_RERENDER_RATIO * sum(area(box) for box in boxes):
+        full_boxes, full_pixels = _easyocr_read(page, reader, dpi, clip)
+        return [box[:5] for box in full_boxes], pixels + full_pixels, dpi
+    
+    boxes = list(boxes)
+    bounds = clip if clip is not None else page.rect
+    for i in low:
+        x0, y0, x1, y1, _, confidence = boxes[i]
+        region = fitz.Rect(x0, y0, x1, y1) + (-OCR_REGION_PADDING, -OCR_REGION_PADDING, OCR_REGION_PADDING, OCR_REGION_PADDING)
+        region &= bounds
+        if region.is_empty:
+            continue
+        reread, region_pixels = _easyocr_read(page, reader, dpi, region)
+        pixels += region_pixels
+        if reread:
+            reread_confidence = sum(box[5] for box in reread) / len(reread)
+            if reread_confidence > confidence:
+                boxes[i] = (x0, y0, x1, y1, " ".join(box[4] for box in reread), reread_confidence)
+    return [box[:5] for box in boxes], pixels, dpi
+
+
+def _easyocr_boxes(page, reader, dpi: int, clip=None) -> Tuple[List[OcrWord], int, int]:
+    """
+    Cascada de resolución para EasyOCR: lee la página (o la región clip) a
+    OCR_BASE_DPI y relee a `dpi` solo lo dudoso (ver _refine_easyocr_boxes).
+    
+    Retorna (cajas en coordenadas de la página, píxeles procesados, DPI máximo usado).
+    """
+    if not OCR_ADAPTIVE_DPI or dpi <= OCR_BASE_DPI:
+        boxes, pixels = _easyocr_read(page, reader, dpi, clip)
+        return [box[:5] for box in boxes], pixels, dpi
+    
+    boxes, pixels = _easyocr_read(page, reader, OCR_BASE_DPI, clip)
+    return _refine_easyocr_boxes(page, reader, boxes, pixels, dpi, clip)
+
+
+def _ocr_page(
+    page,
+    dpi: int = RENDER_DPI,
+    with_words: bool = False,
+    clip=None
+) -> Tuple[str, str, List[OcrWord], int, int]:
+    """
+    Extrae texto de una página (o solo de la región clip) usando OCR.
+    Retorna (texto, motor, palabras, píxeles procesados, DPI final) donde motor es
+    "easyocr", "tesseract" o "" si falló. Con EasyOCR, `dpi` es la resolución máxima
+    de la cascada (ver _easyocr_boxes).
+    Las cajas de palabras solo se calculan con with_words=True (si no, lista vacía).
     """
     if not OCR_AVAILABLE:
-        return ""
+        warn_missing_ocr_engines()
+        return "", "", [], 0, 0
     
+    load_ocr_modules()
+    offset = (clip.x0, clip.y0) if clip is not None else (0.0, 0.0)
+    pixels = 0
     try:
-        # Renderizar página como imagen
-        mat = fitz.Matrix(dpi / 72, dpi / 72)
-        pix = page.get_pixmap(matrix=mat)
-        img_data = pix.tobytes("png")
-        img = Image.open(io.BytesIO(img_data))
-        
         # Intentar EasyOCR primero (mejor calidad)
         if EASYOCR_AVAILABLE:
             try:
                 reader = get_easyocr_reader()
                 if reader:
-                    import numpy as np
-                    img_array = np.array(img)
-                    results = reader.readtext(img_array)
+                    boxes, pixels, final_dpi = _easyocr_boxes(page, reader, dpi, clip)
                     # Combinar todos los textos detectados
-                    text = "\n".join([result[1] for result in results])
-                    return text
+                    text = "\n".join([box[4] for box in boxes])
+                    return text, "easyocr", boxes if with_words else [], pixels, final_dpi
             except Exception as e:
                 print(f"    ⚠️  Error EasyOCR, usando Tesseract: {e}")
         
         # Fallback a Tesseract
         if TESSERACT_AVAILABLE:
-            text = pytesseract.image_to_string(img, config=TESSERACT_CONFIG)
-            return text
+            # Renderizar página; el motor lee directamente el buffer del pixmap
+            pix = render_page_for_ocr(page, dpi, clip=clip)
+            pixels += pix.width * pix.height
+            text, words = _tesseract_pixmap(pix, dpi, offset, with_words)
+            return text, "tesseract", words, pixels, dpi
         
-        return ""
+        return "", "", [], pixels, 0
         
     except Exception as e:
         print(f"    ⚠️  Error OCR en página: {e}")
-        return ""
+        return "", "", [], pixels, 0
 
 
-def extract_text_with_pdfplumber(pdf_path: str) -> Tuple[List[Tuple[int, str]], str]:
+def page_ocr_segments(page) -> Optional[List[Tuple[str, Any]]]:
     """
-    Extrae texto usando pdfplumber (mejor para PDFs con texto corrupto).
-    Retorna páginas y texto completo.
+    Divide una página en bloques, en orden de lectura: ("text", texto) para los
+    bloques con capa de texto limpia y ("ocr", región) para imágenes y bloques
+    de texto corrupto.
+    
+    Retorna None si conviene el OCR de página completa: no hay regiones que
+    procesar o estas cubren más de OCR_REGION_MAX_COVERAGE de la página.
     """
-    pages = []
-    full_text = ""
+    load_fitz()
+    blocks = page.get_text("blocks", flags=fitz.TEXTFLAGS_BLOCKS | fitz.TEXT_PRESERVE_IMAGES)
+    clean_rects = [
+        fitz.Rect(block[:4]) for block in blocks
+        if block[6] == 0 and not detect_corrupt_text(block[4])[0]
+    ]
+    
+    segments = []
+    ocr_area = 0.0
+    for x0, y0, x1, y1, text, _, block_type in blocks:
+        rect = fitz.Rect(x0, y0, x1, y1) & page.rect
+        if block_type == 0 and not detect_corrupt_text(text)[0]:
+            segments.append(("text", text))
+            continue
+        # Iconos, viñetas y restos demasiado pequeños para contener texto
+        if rect.is_empty or rect.width < OCR_REGION_MIN_SIZE or rect.height < OCR_REGION_MIN_SIZE:
+            continue
+        # Imagen de fondo detrás de texto nativo: su contenido ya está en la capa de texto
+        if block_type == 1 and any(rect.contains(clean) for clean in clean_rects):
+            continue
+        region = (rect + (-OCR_REGION_PADDING, -OCR_REGION_PADDING, OCR_REGION_PADDING, OCR_REGION_PADDING)) & page.rect
+        segments.append(("ocr", region))
+        ocr_area += region.get_area()
+    
+    if ocr_area == 0 or ocr_area > OCR_REGION_MAX_COVERAGE * page.rect.get_area():
+        return None
+    return segments
+
+
+def _ocr_page_regions(page, dpi: int = RENDER_DPI) -> Tuple[str, str, List[OcrWord], int, int]:
+    """
+    OCR solo de las imágenes y bloques corruptos de la página; el resto conserva la
+    capa de texto. Las piezas se unen en el orden de lectura de los bloques.
+    Mismo retorno que _ocr_page (sin cajas de palabras).
+    """
+    segments = page_ocr_segments(page)
+    if segments is None:
+        return _ocr_page(page, dpi)
+    region_results = [_ocr_page(page, dpi, clip=value) for kind, value in segments if kind == "ocr"]
+    return _join_ocr_segments(segments, region_results)
+
+
+def _join_ocr_segments(
+    segments: List[Tuple[str, Any]],
+    region_results: List[Tuple[str, str, List[OcrWord], int, int]]
+) -> Tuple[str, str, List[OcrWord], int, int]:
+    """Une la capa de texto y el OCR de cada región (en el orden de segments)."""
+    parts = []
+    engines = []
+    pixels = 0
+    final_dpi = 0
+    region_results = iter(region_results)
+    for kind, value in segments:
+        if kind == "text":
+            parts.append(value)
+            continue
+        text, engine, _, region_pixels, region_dpi = next(region_results)
+        pixels += region_pixels
+        final_dpi = max(final_dpi, region_dpi)
+        engines.append(engine)
+        parts.append(text)
+    # Una región fallida marca la página como fallida (no se cachea)
+    engine = engines[0] if all(engines) else ""
+    return "\n".join(parts), engine, [], pixels, final_dpi
+
+
+def extract_page_with_ocr(page, dpi: int = RENDER_DPI) -> str:
+    """
+    Extrae texto de una página usando OCR.
+    Prioriza EasyOCR, con fallback a Tesseract si EasyOCR no está disponible.
+    """
+    text, _, _, _, _ = _ocr_page(page, dpi)
+    return text
+
+# ====================================================================
+# OCR PARALELO Y PIPELINE RENDER → OCR (ver ocr_pipeline.py)
+# ====================================================================
+
+# Los pools de procesos OCR, el reparto de núcleos, la precarga del modelo y el
+# pipeline en memoria compartida están en ocr_pipeline, que usa los motores de arriba
+ocr_pipeline.set_ocr_engine(sys.modules[__name__])
+
+# ====================================================================
+# REPARACIÓN DE FUENTES (glifo → carácter aprendido por fuente)
+# ====================================================================
+
+# Páginas OCR de muestra por fuente rota para aprender su mapa de glifos
+FONT_REPAIR_SAMPLE_PAGES = 5
+# Máximo de glifos rotos sin resolver para aceptar una página reparada
+FONT_REPAIR_MAX_UNRESOLVED = 0.005
+# Votos mínimos (proporción) para fijar el carácter de un glifo
+FONT_REPAIR_MIN_AGREEMENT = 0.6
+
+# Glifo del texto de la página: (clave, carácter de la capa de texto, origen, bbox)
+# La clave es (fuente, id de glifo, código de la capa de texto): estable dentro de un PDF,
+# incluso cuando la fuente rota asigna U+FFFD a todos sus glifos. Clave None = fin de línea.
+PageGlyph = Tuple[Optional[Tuple[str, int, int]], str, Tuple[float, float], Tuple[float, float, float, float]]
+
+
+def is_broken_char(char: str) -> bool:
+    """Carácter que delata una fuente sin mapeo Unicode válido."""
+    return char in CORRUPT_CHARS or char == '\ufffd' or '\ue000' <= char <= '\uf8ff'
+
+
+def page_glyphs(page) -> List[PageGlyph]:
+    """
+    Glifos de la capa de texto en orden de lectura (el mismo que get_text()), con su
+    fuente e id de glifo; cada fin de línea se marca con un glifo sin clave ('\\n').
+    
+    El orden y las fuentes salen de get_text("rawdict"); el id de glifo, que rawdict
+    no expone (colapsa los glifos sin mapeo en U+FFFD), se toma de get_texttrace()
+    emparejando por punto de origen.
+    """
+    gids = {}
+    for span in page.get_texttrace():
+        for ucs, gid, origin, _ in span["chars"]:
+            gids[(round(origin[0], 1), round(origin[1], 1), ucs)] = gid
+    
+    glyphs = []
+    for block in page.get_text("rawdict")["blocks"]:
+        if block["type"] != 0:
+            continue
+        for line in block["lines"]:
+            for span in line["spans"]:
+                font = span["font"]
+                for char_info in span["chars"]:
+                    char = char_info["c"]
+                    origin = char_info["origin"]
+                    # Los espacios sintéticos de MuPDF no tienen glifo (-1)
+                    gid = gids.get((round(origin[0], 1), round(origin[1], 1), ord(char)), -1)
+                    glyphs.append(((font, gid, ord(char)), char, tuple(origin), tuple(char_info["bbox"])))
+            glyphs.append((None, '\n', (0.0, 0.0), (0.0, 0.0, 0.0, 0.0)))
+    return glyphs
+
+
+def broken_glyph_keys(glyphs: List[PageGlyph]) -> Dict[str, set]:
+    """Glifos distintos de cada fuente rota de la página ({fuente: {clave}})."""
+    broken_fonts = {key[0] for key, char, _, _ in glyphs if key and is_broken_char(char)}
+    keys = defaultdict(set)
+    for key, char, _, _ in glyphs:
+        if key and key[0] in broken_fonts and not char.isspace():
+            keys[key[0]].add(key)
+    return keys
+
+
+def select_font_samples(page_keys: Dict[int, Dict[str, set]], per_font: int = FONT_REPAIR_SAMPLE_PAGES) -> List[int]:
+    """
+    Elige hasta per_font páginas por fuente rota, priorizando las que aportan más
+    glifos aún no vistos de esa fuente (cobertura voraz).
+    """
+    samples = set()
+    fonts = sorted({font for keys in page_keys.values() for font in keys})
+    for font in fonts:
+        seen = set()
+        for page_index in samples:
+            seen |= page_keys[page_index].get(font, set())
+        chosen = sum(1 for page_index in samples if font in page_keys[page_index])
+        while chosen < per_font:
+            best, best_gain = None, 0
+            for page_index in sorted(page_keys):
+                if page_index in samples:
+                    continue
+                gain = len(page_keys[page_index].get(font, set()) - seen)
+                if gain > best_gain:
+                    best, best_gain = page_index, gain
+            if best is None:
+                break
+            samples.add(best)
+            seen |= page_keys[best][font]
+            chosen += 1
+    return sorted(samples)
+
+
+def collect_glyph_votes(glyphs: List[PageGlyph], words: List[OcrWord], broken_fonts: set, votes: Dict) -> None:
+    """
+    Alinea los glifos de fuentes rotas con las cajas de palabras del OCR de la misma
+    página. Una caja aporta votos solo si contiene tantos glifos como caracteres
+    reconoció el OCR (con o sin espacios); los glifos fuera de toda caja votan espacio.
+    """
+    glyphs = [glyph for glyph in glyphs if glyph[0] is not None]
+    centers = [((bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2) for _, _, _, bbox in glyphs]
+    in_box = [False] * len(glyphs)
+    for x0, y0, x1, y1, word_text in words:
+        inside = [
+            i for i, (cx, cy) in enumerate(centers)
+            if x0 <= cx <= x1 and y0 <= cy <= y1
+        ]
+        for i in inside:
+            in_box[i] = True
+        compact = "".join(word_text.split())
+        if len(inside) == len(word_text):
+            pairs = zip(inside, word_text)
+        elif len(inside) == len(compact):
+            pairs = zip(inside, compact)
+        else:
+            continue
+        for i, char in pairs:
+            key = glyphs[i][0]
+            if key[0] in broken_fonts:
+                votes[key][char] += 1
+    for i, (key, _, _, _) in enumerate(glyphs):
+        if not in_box[i] and key[0] in broken_fonts:
+            votes[key][' '] += 1
+
+
+def build_glyph_map(votes: Dict) -> Dict[Tuple[str, int, int], str]:
+    """Carácter mayoritario de cada glifo, si el acuerdo entre votos es suficiente."""
+    glyph_map = {}
+    for key, counter in votes.items():
+        char, count = counter.most_common(1)[0]
+        if count / sum(counter.values()) >= FONT_REPAIR_MIN_AGREEMENT:
+            glyph_map[key] = char
+    return glyph_map
+
+
+def decode_page_glyphs(
+    glyphs: List[PageGlyph],
+    glyph_map: Dict[Tuple[str, int, int], str],
+    broken_fonts: set
+) -> Tuple[str, float]:
+    """
+    Reconstruye el texto de la página con el mapa aprendido, conservando los glifos
+    de fuentes sanas. Retorna (texto, proporción de glifos rotos sin resolver).
+    """
+    pieces = []
+    unresolved = 0
+    visible = 0
+    for key, char, _, _ in glyphs:
+        if key in glyph_map:
+            char = glyph_map[key]
+        elif key and key[0] in broken_fonts and is_broken_char(char):
+            unresolved += 1
+            char = ''
+        if not char.isspace():
+            visible += 1
+        pieces.append(char)
+    ratio = unresolved / visible if visible else 1.0
+    return "".join(pieces), ratio
+
+
+def ocr_with_font_repair(
+    pdf_path: str,
+    doc,
+    page_indices: List[int],
+    workers: int = 1,
+    threads: Optional[int] = None,
+    batch_size: int = EASYOCR_BATCH_SIZE,
+    render_workers: int = 0
+) -> Dict[int, Tuple[str, str, int]]:
+    """
+    Resuelve las páginas con capa de texto corrupta aplicando OCR solo a unas pocas:
+    1. Elige hasta FONT_REPAIR_SAMPLE_PAGES páginas de muestra por fuente rota
+    2. Las procesa con OCR (con cajas de palabras) y aprende el mapa glifo → carácter
+    3. Decodifica el resto desde la capa de texto; las que siguen corruptas van a OCR
+       (por regiones si OCR_REGIONS está activo)
+    
+    Retorna {índice de página: (texto, motor, píxeles procesados por OCR)}.
+    """
+    glyph_data = {}
+    page_keys = {}
+    for page_index in page_indices:
+        page = doc[page_index]
+        if page.rotation:
+            continue
+        glyphs = page_glyphs(page)
+        keys = broken_glyph_keys(glyphs)
+        if keys:
+            glyph_data[page_index] = glyphs
+            page_keys[page_index] = keys
+    
+    samples = select_font_samples(page_keys)
+    # Sin páginas que decodificar no hay nada que ganar: OCR directo
+    if len(samples) >= len(page_keys):
+        results = ocr_pipeline.ocr_pdf_pages(
+            pdf_path, doc, page_indices, workers, threads, regions=OCR_REGIONS, batch_size=batch_size,
+            render_workers=render_workers
+        )
+        return {page_index: (text, engine, pixels) for page_index, (text, engine, _, pixels, _) in results.items()}
+    
+    results = {}
+    votes = defaultdict(Counter)
+    sample_results = ocr_pipeline.ocr_pdf_pages(
+        pdf_path, doc, samples, workers, threads, with_words=True, batch_size=batch_size,
+        render_workers=render_workers
+    )
+    for page_index, (text, engine, words, pixels, _) in sample_results.items():
+        results[page_index] = (text, engine, pixels)
+        collect_glyph_votes(glyph_data[page_index], words, set(page_keys[page_index]), votes)
+    glyph_map = build_glyph_map(votes)
+    
+    ocr_indices = []
+    for page_index in page_indices:
+        if page_index in results:
+            continue
+        if page_index not in glyph_data:
+            ocr_indices.append(page_index)
+            continue
+        text, unresolved = decode_page_glyphs(glyph_data[page_index], glyph_map, set(page_keys[page_index]))
+        if text.strip() and unresolved <= FONT_REPAIR_MAX_UNRESOLVED and not detect_corrupt_text(text)[0]:
+            results[page_index] = (text, "font_repair", 0)
+        else:
+            ocr_indices.append(page_index)
     
+    repaired = sum(1 for _, engine, _ in results.values() if engine == "font_repair")
+    print(f"  🔧 Reparación de fuentes: {len(samples)} págs. OCR de muestra, "
+          f"{repaired} decodificadas, {len(ocr_indices)} a OCR")
+    
+    if ocr_indices:
+        ocr_results = ocr_pipeline.ocr_pdf_pages(
+            pdf_path, doc, ocr_indices, workers, threads, regions=OCR_REGIONS, batch_size=batch_size,
+            render_workers=render_workers
+        )
+        for page_index, (text, engine, _, pixels, _) in ocr_results.items():
+            results[page_index] = (text, engine, pixels)
+    return results
+
+# ====================================================================
+# CACHÉ DE EXTRACCIÓN (por página, direccionada por contenido)
+# ====================================================================
+
+def file_sha256(path: str) -> str:
+    """Calcula el SHA-256 del contenido de un archivo."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+_normalization_fingerprint = None
+
+
+def normalization_fingerprint() -> str:
+    """
+    Huella de lo que determina el texto normalizado de una página: el código de
+    normalize_text() y de la decodificación de CID, sus patrones, la tabla base de
+    CID y NORMALIZATION_VERSION (las correcciones de cada PDF van aparte, con
+    cid_overrides_digest). Al cambiar cualquiera de ellos se invalida la caché sin
+    depender de incrementar la versión a mano.
+    """
+    global _normalization_fingerprint
+    if _normalization_fingerprint is None:
+        digest = hashlib.sha256(str(NORMALIZATION_VERSION).encode('utf-8'))
+        for func in (normalize_text, clean_cid_characters, get_cid_table, _build_cid_table, _unknown_cid_replacement):
+            digest.update(inspect.getsource(func).encode('utf-8'))
+        for pattern in (CID_TOKEN_PATTERN, CONTROL_CHARS_PATTERN, EASYOCR_IA_PATTERN, PARAGRAPH_BREAK_PATTERN):
+            digest.update(pattern.pattern.encode('utf-8'))
+        digest.update(json.dumps(_CID_BASE_TABLE, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+        _normalization_fingerprint = digest.hexdigest()[:16]
+    return _normalization_fingerprint
+
+
+def extractor_settings(extractor: str) -> Dict[str, Any]:
+    """
+    Parámetros que determinan el texto producido por un extractor.
+    Cualquier cambio en estos valores invalida las páginas cacheadas con ese extractor.
+    """
+    settings = {
+        "normalization": normalization_fingerprint(),
+        "strategy_version": EXTRACTION_STRATEGY_VERSION,
+        # La estrategia de extracción depende de los motores instalados
+        "available_engines": sorted(
+            name for name, available in [
+                ("pdfplumber", PDFPLUMBER_AVAILABLE),
+                ("easyocr", EASYOCR_AVAILABLE),
+                ("tesseract", TESSERACT_AVAILABLE),
+            ] if available
+        ),
+    }
+    if extractor in ("easyocr", "tesseract", "font_repair"):
+        settings["render_dpi"] = RENDER_DPI
+        settings["render_colorspace"] = "gray" if OCR_RENDER_GRAYSCALE else "rgb"
+        settings["ocr_regions"] = {
+            "enabled": OCR_REGIONS,
+            "min_size": OCR_REGION_MIN_SIZE,
+            "max_coverage": OCR_REGION_MAX_COVERAGE,
+            "padding": OCR_REGION_PADDING,
+        } if OCR_REGIONS else {"enabled": False}
+    if extractor in ("easyocr", "font_repair"):
+        settings["easyocr_languages"] = EASYOCR_LANGUAGES
+        settings["adaptive_dpi"] = {
+            "base_dpi": OCR_BASE_DPI,
+            "min_confidence": OCR_MIN_CONFIDENCE,
+            "full_rerender_ratio": OCR_FULL_RERENDER_RATIO,
+        } if OCR_ADAPTIVE_DPI else None
+    if extractor in ("tesseract", "font_repair"):
+        settings["tesseract_config"] = TESSERACT_CONFIG
+        # El backend por defecto no se registra para conservar la caché existente
+        if TESSERACT_BACKEND != "pytesseract":
+            settings["tesseract_backend"] = TESSERACT_BACKEND
+    if extractor == "font_repair":
+        # El mapa de glifos se aprende del OCR de las páginas de muestra
+        settings["font_repair"] = {
+            "sample_pages": FONT_REPAIR_SAMPLE_PAGES,
+            "max_unresolved": FONT_REPAIR_MAX_UNRESOLVED,
+            "min_agreement": FONT_REPAIR_MIN_AGREEMENT,
+        }
+    return settings
+
+
+def page_cache_key(pdf_sha: str, page_index: int, extractor: str, pdf_id: Optional[str] = None) -> str:
+    """Clave de caché de una página: SHA del PDF + índice + extractor + configuración."""
+    key_data = {
+        "pdf_sha256": pdf_sha,
+        "page_index": page_index,
+        "extractor": extractor,
+        "settings": extractor_settings(extractor),
+    }
+    # Las correcciones de CID del PDF cambian el texto normalizado
+    overrides_digest = cid_overrides_digest(pdf_id)
+    if overrides_digest:
+        key_data["cid_overrides"] = overrides_digest
+    payload = json.dumps(key_data, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _extraction_cache_path(pdf_sha: str) -> str:
+    return os.path.join(EXTRACTION_CACHE_DIR, f"{pdf_sha}.json")
+
+
+# Referencia indirecta en la definición de un objeto PDF ("12 0 R")
+PDF_REF_PATTERN = re.compile(r'\b(\d+) (\d+) R\b')
+PDF_PARENT_PATTERN = re.compile(r'/Parent\s*\d+ \d+ R')
+PDF_PAGE_TYPE_PATTERN = re.compile(r'/Type\s*/Pages?\b')
+# Claves de un stream que dependen de cómo se comprimió, no de su contenido
+PDF_STREAM_ENCODING_PATTERN = re.compile(r'/(?:Length|Filter|DecodeParms)\s*(?:\d+ \d+ R|\[[^\]]*\]|<<.*?>>|/?[\w.]+)', re.S)
+# Atributos que una página puede heredar de su nodo /Pages
+PAGE_INHERITED_KEYS = ("Resources", "MediaBox", "CropBox", "Rotate")
+
+
+def page_fingerprint(doc, page_index: int, memo: Optional[Dict[int, str]] = None) -> str:
+    """
+    Huella del contenido de una página: SHA-256 del objeto página (con los atributos
+    heredados), sus content streams y todo lo que alcanzan sus recursos (fuentes,
+    imágenes, XObjects, anotaciones). Cada referencia se reemplaza por la huella del
+    objeto referenciado y los streams cuentan descomprimidos, así que una página sin
+    cambios conserva la huella aunque la revisión del PDF renumere, deduplique o
+    recomprima sus objetos. No se entra en otras páginas (destinos de enlaces).
+    
+    memo: huellas de objetos y streams ya calculadas, compartido entre las páginas de
+    un mismo documento (las fuentes e imágenes comunes se procesan una sola vez).
+    """
+    if memo is None:
+        memo = {}
+    page_xref = doc[page_index].xref
+    visiting = set()
+    
+    def object_digest(xref: int) -> Tuple[str, bool]:
+        """Huella del objeto y si depende del recorrido (ciclo): entonces no se memoriza."""
+        if xref in memo:
+            return memo[xref], False
+        if xref in visiting:
+            return "<ciclo>", True
+        definition = doc.xref_object(xref, compressed=True)
+        if xref == page_xref:
+            # Sin /Parent (llevaría a todo el árbol de páginas), pero con lo que se hereda de él
+            definition = PDF_PARENT_PATTERN.sub("", definition)
+            for key in PAGE_INHERITED_KEYS:
+                node = page_xref
+                while doc.xref_get_key(node, key)[0] == "null":
+                    kind, parent = doc.xref_get_key(node, "Parent")
+                    if kind != "xref":
+                        break
+                    node = int(parent.split()[0])
+                if node != page_xref:
+                    definition += f"/{key} {doc.xref_get_key(node, key)[1]}"
+        elif PDF_PAGE_TYPE_PATTERN.search(definition):
+            return "<página>", True  # otra página: solo cuenta que se la referencia
+        
+        visiting.add(xref)
+        digest = hashlib.sha256()
+        if doc.xref_is_stream(xref):
+            definition = PDF_STREAM_ENCODING_PATTERN.sub("", definition)
+            digest.update(hashlib.sha256(doc.xref_stream(xref) or b"").digest())
+        path_dependent = xref == page_xref
+        
+        def ref_digest(match) -> str:
+            nonlocal path_dependent
+            ref, ref_path_dependent = object_digest(int(match.group(1)))
+            path_dependent = path_dependent or ref_path_dependent
+            return ref
+        
+        digest.update(PDF_REF_PATTERN.sub(ref_digest, definition).encode('utf-8'))
+        visiting.discard(xref)
+        if not path_dependent:
+            memo[xref] = digest.hexdigest()
+        return digest.hexdigest(), path_dependent
+    
+    return object_digest(page_xref)[0]
+
+
+def _latest_extraction_path(pdf_id: str) -> str:
+    return os.path.join(EXTRACTION_LATEST_DIR, f"{pdf_id}.json")
+
+
+def load_previous_extraction(pdf_id: str, pdf_sha: str) -> Dict[str, Tuple[str, str]]:
+    """
+    Páginas de la última extracción cacheada de pdf_id si corresponde a otro contenido
+    (una revisión anterior del PDF). Retorna {huella de página: (extractor, texto)}
+    solo con las páginas extraídas con la configuración actual; vacío si no hay.
+    """
+    latest_path = _latest_extraction_path(pdf_id)
+    if not os.path.exists(latest_path):
+        return {}
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            num_pages = len(pdf.pages)
-            
-            for page_num in range(num_pages):
-                page = pdf.pages[page_num]
-                text = page.extract_text()
-                
-                if text:
-                    normalized = normalize_text(text)
-                    if normalized:
-                        pages.append((page_num + 1, normalized))
-                        full_text += " " + normalized
-            
-            return pages, full_text
-    except Exception as e:
-        print(f"  ⚠️  Error con pdfplumber: {e}")
-        return [], ""
+        with open(latest_path, 'r', encoding='utf-8') as f:
+            previous_sha = json.load(f)["pdf_sha256"]
+        if previous_sha == pdf_sha or not os.path.exists(_extraction_cache_path(previous_sha)):
+            return {}
+        with open(_extraction_cache_path(previous_sha), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return {
+            entry["fingerprint"]: (entry["extractor"], entry["text"])
+            for entry in data["pages"]
+            if entry.get("fingerprint")
+            and entry["key"] == page_cache_key(previous_sha, entry["page_index"], entry["extractor"], pdf_id)
+        }
+    except (json.JSONDecodeError, KeyError, TypeError, OSError) as e:
+        print(f"  ⚠️  Extracción anterior inválida ({e}), extrayendo todas las páginas...")
+        return {}
 
 
-def extract_text_from_pdf(pdf_path: str) -> Tuple[List[Tuple[int, str]], str]:
+def save_latest_extraction(pdf_id: str, pdf_sha: str, pdf_name: str) -> None:
+    """Registra pdf_sha como la última extracción de pdf_id (un archivo por PDF: sin carreras entre procesos)."""
+    latest_path = _latest_extraction_path(pdf_id)
+    tmp_path = latest_path + ".tmp"
+    try:
+        if os.path.exists(latest_path):
+            with open(latest_path, 'r', encoding='utf-8') as f:
+                if json.load(f).get("pdf_sha256") == pdf_sha:
+                    return
+        os.makedirs(EXTRACTION_LATEST_DIR, exist_ok=True)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"pdf_sha256": pdf_sha, "pdf_name": pdf_name}, f)
+        os.replace(tmp_path, latest_path)
+    except (json.JSONDecodeError, OSError) as e:
+        print(f"  ⚠️  No se pudo registrar la última extracción: {e}")
+
+
+def load_cached_extraction(pdf_sha: str, pdf_id: Optional[str] = None) -> Optional[List[Tuple[int, str, str]]]:
     """
-    Extrae texto de un PDF usando estrategia híbrida:
-    1. PyMuPDF para detección rápida de corrupción
-    2. pdfplumber si hay texto corrupto (mejor calidad, sin OCR)
-    3. EasyOCR/Tesseract como último recurso
+    Carga las páginas cacheadas de un PDF sin abrirlo.
+    Retorna [(índice de página, extractor, texto)] o None si no hay caché o si
+    alguna página fue extraída con otra configuración.
+    """
+    cache_path = _extraction_cache_path(pdf_sha)
+    if not os.path.exists(cache_path):
+        return None
     
-    Retorna páginas y texto completo.
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        
+        records = []
+        for entry in data["pages"]:
+            expected_key = page_cache_key(pdf_sha, entry["page_index"], entry["extractor"], pdf_id)
+            if entry["key"] != expected_key:
+                return None
+            records.append((entry["page_index"], entry["extractor"], entry["text"]))
+        return records
+    except (json.JSONDecodeError, KeyError, TypeError, OSError) as e:
+        print(f"  ⚠️  Caché de extracción inválida ({e}), re-extrayendo...")
+        return None
+
+
+def save_extraction_cache(
+    pdf_sha: str,
+    pdf_name: str,
+    records: List[Tuple[int, str, str]],
+    pdf_id: Optional[str] = None,
+    fingerprints: Optional[List[str]] = None
+) -> None:
     """
+    Guarda la extracción de un PDF en la caché.
+    records: lista de (índice de página, extractor, texto normalizado), incluyendo páginas vacías.
+    fingerprints: huella de cada página (page_fingerprint), para reutilizar las páginas
+    sin cambios cuando se procese una revisión del PDF.
+    """
+    os.makedirs(EXTRACTION_CACHE_DIR, exist_ok=True)
+    data = {
+        "pdf_sha256": pdf_sha,
+        "pdf_name": pdf_name,
+        "pages": [
+            {
+                "page_index": page_index,
+                "extractor": extractor,
+                "key": page_cache_key(pdf_sha, page_index, extractor, pdf_id),
+                "text": text,
+            }
+            for page_index, extractor, text in records
+        ],
+    }
+    if fingerprints:
+        for entry in data["pages"]:
+            entry["fingerprint"] = fingerprints[entry["page_index"]]
+    cache_path = _extraction_cache_path(pdf_sha)
+    tmp_path = cache_path + ".tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"  ⚠️  No se pudo guardar la caché de extracción: {e}")
+
+# ====================================================================
+# EXTRACCIÓN HÍBRIDA (motor elegido por página)
+# ====================================================================
+
+EXTRACTOR_LABELS = {
+    "pymupdf": "PyMuPDF",
+    "pdfplumber": "pdfplumber",
+    "easyocr": "EasyOCR",
+    "tesseract": "Tesseract",
+    "font_repair": "Fuentes reparadas",
+    "ocr_sidecar": "OCR pre-extraído",
+}
+
+def _assemble_extraction(records: List[Tuple[int, str, str]]) -> Dict[str, Any]:
+    """Construye páginas, texto completo y motor por página a partir de registros de extracción."""
     pages = []
     full_text = ""
-    ocr_pages = 0
-    doc = None
+    engines = {}
+    for page_index, extractor, text in records:
+        engines[page_index + 1] = extractor
+        if text:
+            pages.append((page_index + 1, text))
+            full_text += " " + text
+    return {"pages": pages, "full_text": full_text, "engines": engines}
+
+
+def summarize_engines(engines: Dict[int, str]) -> str:
+    """Resumen legible de cuántas páginas produjo cada motor."""
+    counts = defaultdict(int)
+    for extractor in engines.values():
+        counts[extractor] += 1
+    return ", ".join(
+        f"{EXTRACTOR_LABELS.get(extractor, extractor or 'OCR fallido')} {count}"
+        for extractor, count in sorted(counts.items(), key=lambda item: -item[1])
+    )
+
+
+def extract_pdf_pages(
+    pdf_path: str,
+    use_cache: bool = True,
+    ocr_workers: int = 1,
+    ocr_threads: Optional[int] = None,
+    ocr_batch: int = EASYOCR_BATCH_SIZE,
+    ocr_render_workers: int = 0
+) -> Dict[str, Any]:
+    """
+    Extrae el texto de un PDF eligiendo el motor página por página, con una sola apertura:
+    1. PyMuPDF para todas las páginas (rápido)
+    2. pdfplumber solo para las páginas que fallan detect_corrupt_text
+    3. Si pdfplumber tampoco obtiene texto limpio: reparación de fuentes a partir de
+       unas pocas páginas OCR de muestra, y EasyOCR/Tesseract para las que no se reparan
+       (solo sobre las imágenes y bloques corruptos de la página si OCR_REGIONS)
+    
+    Si use_cache es True, las páginas se guardan en (y se leen de) la caché de
+    extracción, indexada por el SHA-256 del PDF. Si el PDF cambió (una revisión del
+    plan), las páginas cuya huella de contenido coincide con una página de la última
+    extracción del mismo pdf_id se reutilizan y solo se extraen las demás.
+    
+    Las páginas que requieren OCR se procesan con ocr_workers procesos en paralelo
+    (ocr_threads hilos internos por proceso), en lotes de ocr_batch páginas con
+    EasyOCR, y se reensamblan en orden. Con ocr_render_workers > 0 el render de las
+    páginas corre en esos procesos aparte, solapado con el OCR.
+    
+    Retorna {"pages": [(página, texto)], "full_text": str, "engines": {página: motor}}.
+    """
     pdf_name = os.path.basename(pdf_path)
     pdf_id = os.path.splitext(pdf_name)[0].lower()
+    empty = {"pages": [], "full_text": "", "engines": {}}
     
     # Verificar si existe un archivo de texto OCR pre-extraído
     ocr_text_file = os.path.join(DATA_DIR, f"{pdf_id}_ocr_text.txt")
@@ -562,104 +1544,155 @@ def extract_text_from_pdf(pdf_path: str) -> Tuple[List[Tuple[int, str]], str]:
             page_pattern = r'--- Página (\d+) ---\n(.*?)(?=--- Página \d+ ---|$)'
             matches = re.findall(page_pattern, content, re.DOTALL)
             
-            for page_num_str, page_text in matches:
-                page_num = int(page_num_str)
-                normalized = normalize_text(page_text)
-                if normalized:
-                    pages.append((page_num, normalized))
-                    full_text += " " + normalized
-            
-            print(f"  ✅ Cargadas {len(pages)} páginas desde archivo OCR")
-            return pages, full_text
+            records = [
+                (int(page_num_str) - 1, "ocr_sidecar", normalize_text(page_text, pdf_id))
+                for page_num_str, page_text in matches
+            ]
+            result = _assemble_extraction(records)
+            print(f"  ✅ Cargadas {len(result['pages'])} páginas desde archivo OCR")
+            return result
         except Exception as e:
             print(f"  ⚠️  Error leyendo archivo OCR: {e}, intentando extraer del PDF...")
     
+    # Caché de extracción: devuelve las páginas sin abrir el PDF
+    pdf_sha = None
+    if use_cache:
+        try:
+            pdf_sha = file_sha256(pdf_path)
+        except OSError as e:
+            print(f"Error leyendo {pdf_path}: {e}")
+            return empty
+        cached_records = load_cached_extraction(pdf_sha, pdf_id)
+        if cached_records is not None:
+            result = _assemble_extraction(cached_records)
+            print(f"  ⚡ {pdf_name}: Usando caché de extracción ({summarize_engines(result['engines'])})")
+            save_latest_extraction(pdf_id, pdf_sha, pdf_name)
+            return result
+    
+    # (índice de página, extractor, texto normalizado) de cada página
+    records = []
+    ocr_failures = 0
+    completed = False
     doc = None
+    plumber_pdf = None
+    fingerprints = []
+    
     try:
-        # ESTRATEGIA HÍBRIDA: Detección rápida con PyMuPDF
-        doc = fitz.open(pdf_path)
+        doc = load_fitz().open(pdf_path)
         num_pages = len(doc)
         
-        # Primera pasada: detectar si hay texto corrupto (muestra de primeras 10 páginas)
-        sample_text = ""
-        for page_num in range(min(10, num_pages)):
-            sample_text += doc[page_num].get_text()
-        
-        is_corrupt, ratio = detect_corrupt_text(sample_text)
-        doc.close()
-        doc = None  # Marcar como cerrado
-        
-        # ESTRATEGIA RECOMENDADA:
-        # 1. Si hay corrupción significativa (>5%) y pdfplumber disponible → usar pdfplumber
-        # 2. Si pdfplumber falla o no disponible → usar PyMuPDF + OCR
-        # 3. Si no hay corrupción → usar PyMuPDF directo (rápido)
-        
-        if is_corrupt and ratio > 0.05 and PDFPLUMBER_AVAILABLE:
-            # ESTRATEGIA 1: pdfplumber para PDFs corruptos (mejor calidad, sin OCR)
-            print(f"  ⚠️  {pdf_name}: Texto corrupto ({ratio*100:.1f}%), usando pdfplumber...")
-            pages, full_text = extract_text_with_pdfplumber(pdf_path)
-            if pages:
-                print(f"  ✅ pdfplumber completado: {len(pages)} páginas procesadas")
-                return pages, full_text
-            else:
-                # pdfplumber falló, usar OCR como último recurso
-                print(f"  ⚠️  pdfplumber falló, usando PyMuPDF + OCR como último recurso...")
-                doc = fitz.open(pdf_path)
-                use_ocr = True  # Forzar OCR ya que hay corrupción
-        elif is_corrupt and ratio > 0.05 and not PDFPLUMBER_AVAILABLE:
-            # ESTRATEGIA 2: Corrupción detectada pero pdfplumber no disponible → usar OCR
-            if OCR_AVAILABLE:
-                engine = "EasyOCR" if EASYOCR_AVAILABLE else ("Tesseract" if TESSERACT_AVAILABLE else "N/A")
-                print(f"  ⚠️  {pdf_name}: Texto corrupto ({ratio*100:.1f}%), extrayendo con {engine}...")
-                doc = fitz.open(pdf_path)
-                use_ocr = True
-            else:
-                print(f"  ⚠️  {pdf_name}: Texto corrupto ({ratio*100:.1f}%) pero OCR no disponible")
-                doc = fitz.open(pdf_path)
-                use_ocr = False
-        else:
-            # ESTRATEGIA 3: PDF limpio → usar PyMuPDF directo (rápido y fidedigno)
-            if is_corrupt:
-                print(f"  ℹ️  {pdf_name}: Corrupción menor ({ratio*100:.1f}%), usando PyMuPDF directo...")
-            else:
-                print(f"  ✅ {pdf_name}: Texto limpio, usando PyMuPDF directo...")
-            doc = fitz.open(pdf_path)
-            use_ocr = False  # No usar OCR para PDFs limpios
-        
-        # Segunda pasada: extraer texto con PyMuPDF (con o sin OCR según estrategia)
-        for page_num in range(num_pages):
-            page = doc[page_num]
+        # Revisión de un PDF ya extraído: páginas sin cambios (misma huella) ya normalizadas
+        reused = {}
+        if pdf_sha:
+            previous_pages = load_previous_extraction(pdf_id, pdf_sha)
+            memo = {}
+            fingerprints = [page_fingerprint(doc, page_index, memo) for page_index in range(num_pages)]
+            reused = {
+                page_index: previous_pages[fingerprint]
+                for page_index, fingerprint in enumerate(fingerprints)
+                if fingerprint in previous_pages
+            }
+            if previous_pages:
+                print(f"  ♻️  {pdf_name}: revisión de un PDF ya extraído, "
+                      f"{len(reused)}/{num_pages} páginas sin cambios reutilizadas")
+        
+        page_results = {}
+        ocr_indices = []
+        for page_index in range(num_pages):
+            if page_index in reused:
+                continue
             
-            if use_ocr:
-                # Usar OCR para esta página (último recurso)
-                text = extract_page_with_ocr(page)
-                ocr_pages += 1
-            else:
-                # Extracción directa con PyMuPDF
-                text = page.get_text()
-                # Verificar si esta página específica tiene problemas (fallback por página)
-                page_corrupt, _ = detect_corrupt_text(text)
-                if page_corrupt and OCR_AVAILABLE:
-                    # Solo esta página tiene problemas, usar OCR solo para esta
-                    text = extract_page_with_ocr(page)
-                    ocr_pages += 1
+            # 1. PyMuPDF
+            text = doc[page_index].get_text()
+            page_corrupt, ratio = detect_corrupt_text(text)
+            if not page_corrupt:
+                page_results[page_index] = (text, "pymupdf")
+                continue
             
-            normalized = normalize_text(text)
-            if normalized:
-                pages.append((page_num + 1, normalized))
-                full_text += " " + normalized
-        
-        if ocr_pages > 0:
-            engine_used = "EasyOCR" if EASYOCR_AVAILABLE else "Tesseract"
-            print(f"  ✅ OCR completado ({engine_used}): {ocr_pages}/{num_pages} páginas procesadas")
+            # 2. pdfplumber, solo para esta página
+            if PDFPLUMBER_AVAILABLE:
+                try:
+                    if plumber_pdf is None:
+                        plumber_pdf = load_pdfplumber().open(pdf_path)
+                    plumber_text = plumber_pdf.pages[page_index].extract_text() or ""
+                    if plumber_text.strip() and not detect_corrupt_text(plumber_text)[0]:
+                        page_results[page_index] = (plumber_text, "pdfplumber")
+                        continue
+                except Exception as e:
+                    print(f"  ⚠️  Error con pdfplumber en página {page_index + 1}: {e}")
             
+            # 3. OCR (se procesa por lotes más abajo)
+            if OCR_AVAILABLE:
+                ocr_indices.append(page_index)
+            else:
+                print(f"  ⚠️  {pdf_name} pág. {page_index + 1}: texto corrupto ({ratio*100:.1f}%) pero OCR no disponible")
+                warn_missing_ocr_engines()
+                page_results[page_index] = (text, "pymupdf")
+        
+        # OCR de las páginas escaladas (en paralelo si ocr_workers > 1)
+        if ocr_indices:
+            ocr_pixels = 0
+            for page_index, (text, extractor, pixels) in ocr_with_font_repair(
+                pdf_path, doc, ocr_indices, ocr_workers, ocr_threads, ocr_batch, ocr_render_workers
+            ).items():
+                page_results[page_index] = (text, extractor)
+                ocr_pixels += pixels
+            # Referencia: píxeles del OCR de página completa de las mismas páginas
+            scale = RENDER_DPI / 72
+            full_pixels = sum(
+                int(doc[page_index].rect.width * scale) * int(doc[page_index].rect.height * scale)
+                for page_index in ocr_indices
+            )
+            print(f"  🖼️  OCR: {ocr_pixels / 1e6:.1f} Mpx procesados "
+                  f"(página completa: {full_pixels / 1e6:.1f} Mpx)")
+        
+        # Reensamblar en orden de página
+        for page_index in range(num_pages):
+            if page_index in reused:
+                extractor, text = reused[page_index]
+                records.append((page_index, extractor, text))
+                continue
+            text, extractor = page_results[page_index]
+            if not extractor:
+                ocr_failures += 1
+            records.append((page_index, extractor, normalize_text(text, pdf_id)))
+        completed = True
     except Exception as e:
         print(f"Error leyendo {pdf_path}: {e}")
     finally:
+        if plumber_pdf is not None:
+            plumber_pdf.close()
         if doc:
             doc.close()
     
-    return pages, full_text
+    if not completed:
+        return empty
+    
+    result = _assemble_extraction(records)
+    print(f"  ✅ {pdf_name}: {len(records)} páginas ({summarize_engines(result['engines'])})")
+    
+    # Solo se cachean extracciones completas (un fallo de OCR puede ser transitorio)
+    if ocr_failures == 0 and pdf_sha:
+        save_extraction_cache(pdf_sha, pdf_name, records, pdf_id, fingerprints)
+        save_latest_extraction(pdf_id, pdf_sha, pdf_name)
+    
+    return result
+
+
+def extract_text_from_pdf(
+    pdf_path: str,
+    use_cache: bool = True,
+    ocr_workers: int = 1,
+    ocr_threads: Optional[int] = None,
+    ocr_batch: int = EASYOCR_BATCH_SIZE,
+    ocr_render_workers: int = 0
+) -> Tuple[List[Tuple[int, str]], str]:
+    """
+    Extrae texto de un PDF (ver extract_pdf_pages).
+    Retorna páginas y texto completo.
+    """
+    result = extract_pdf_pages(pdf_path, use_cache, ocr_workers, ocr_threads, ocr_batch, ocr_render_workers)
+    return result["pages"], result["full_text"]
 
 def extract_candidate_info(pages: List[Tuple[int, str]], pdf_id: str) -> Dict[str, str]:
     """Extrae información del candidato."""
@@ -701,181 +1734,99 @@ def extract_candidate_info(pages: List[Tuple[int, str]], pdf_id: str) -> Dict[st
 # ====================================================================
 
 def identify_primary_pillar(text: str) -> Optional[str]:
-    text_lower = text.lower()
-    scores = {}
-    
-    for pillar_id, keywords in PILLAR_KEYWORDS.items():
-        score = sum(1 for kw in keywords if kw.lower() in text_lower)
-        if score >= 2:
-            scores[pillar_id] = score
+    # Palabras clave de todos los pilares en una sola pasada (ver keyword_automaton)
+    scores = {
+        pillar_id: score
+        for pillar_id, score in PILLAR_AUTOMATON.group_counts(text).items()
+        if score >= 2
+    }
     
     if not scores:
         return None
     return max(scores, key=scores.get)
 
 def check_existence(text: str) -> bool:
-    patterns = [
-        r"(?:crear|establecer|implementar|desarrollar|reformar|construir|ampliar)(?:á|emos)?",
-        r"(?:programa|proyecto|plan|estrategia|política)\s+(?:de|para|nacional)",
-        r"(?:ley|decreto|reglamento)",
-        r"(?:invertir|destinar|asignar)\s+(?:recursos?|fondos?)",
-    ]
-    for pattern in patterns:
-        if re.search(pattern, text, re.IGNORECASE):
-            return True
-    return False
+    return DIMENSION_MATCHER.first_match(text, "existence") is not None
+
+def when_field(match: Optional[re.Match]) -> str:
+    return match.group(0).strip() if match else "no_especificado"
+
+def context_field(text: str, match: Optional[re.Match]) -> str:
+    """Contexto de la coincidencia (10 caracteres antes, 50 después, máximo 100)."""
+    if not match:
+        return "no_especificado"
+    start = max(0, match.start() - 10)
+    end = min(len(text), match.end() + 50)
+    return text[start:end].strip()[:100]
 
 def check_when(text: str) -> Tuple[bool, str]:
-    for pattern in TIME_INDICATORS_VALID:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            return True, match.group(0).strip()
-    return False, "no_especificado"
+    match = DIMENSION_MATCHER.first_match(text, "when")
+    return match is not None, when_field(match)
 
 def check_how(text: str) -> Tuple[bool, str]:
-    for pattern in HOW_INDICATORS:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            start = max(0, match.start() - 10)
-            end = min(len(text), match.end() + 50)
-            return True, text[start:end].strip()[:100]
-    return False, "no_especificado"
+    match = DIMENSION_MATCHER.first_match(text, "how")
+    return match is not None, context_field(text, match)
 
 def check_funding(text: str) -> Tuple[bool, str]:
-    for pattern in FUNDING_INDICATORS:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            start = max(0, match.start() - 10)
-            end = min(len(text), match.end() + 50)
-            return True, text[start:end].strip()[:100]
-    return False, "no_especificado"
+    match = DIMENSION_MATCHER.first_match(text, "funding")
+    return match is not None, context_field(text, match)
+
+def analyze_paragraph(paragraph: str) -> Optional[Dict[str, Any]]:
+    """
+    Pilar y dimensiones de un párrafo candidato: una pasada del autómata de pilares y
+    otra del prefiltro de indicadores, compartida por las cuatro dimensiones.
+    Retorna None si el párrafo no tiene pilar o no es concreto; si no, el pilar, la
+    primera coincidencia de cada dimensión (id de la regla, inicio, fin) y los campos
+    de la propuesta.
+    """
+    pillar_id = identify_primary_pillar(paragraph)
+    if not pillar_id:
+        return None
+    
+    candidates = DIMENSION_MATCHER.candidates(paragraph)
+    existence = DIMENSION_RULES.first_regex(paragraph, "existence", candidates)
+    if not existence:
+        return None
+    
+    # (id de la regla, coincidencia) de cada dimensión
+    found = {"existence": existence}
+    for dimension in ("when", "how", "funding"):
+        found[dimension] = DIMENSION_RULES.first_regex(paragraph, dimension, candidates)
+    matches = {dimension: hit[1] if hit else None for dimension, hit in found.items()}
+    
+    return {
+        "pillar_id": pillar_id,
+        "rule_ids": {dimension: hit[0] if hit else None for dimension, hit in found.items()},
+        "spans": {dimension: match.span() if match else None for dimension, match in matches.items()},
+        "dimensions": {dimension: 1 if match else 0 for dimension, match in matches.items()},
+        "extracted_fields": {
+            "when_text": when_field(matches["when"]),
+            "how_text": context_field(paragraph, matches["how"]),
+            "funding_text": context_field(paragraph, matches["funding"])
+        }
+    }
 
 # ====================================================================
 # VERIFICACIÓN DE VIABILIDAD LEGAL v7 - FASE 1
 # ====================================================================
 
-# Indicadores de reforma constitucional REAL (alta confianza)
-# Solo cambios estructurales que realmente requieren reforma constitucional
-CONSTITUTIONAL_REFORM_INDICATORS = [
-    # Eliminar/modificar instituciones constitucionales
-    r"eliminar\s+(?:la\s+)?asamblea\s+legislativa",
-    r"eliminar\s+(?:el\s+)?poder\s+judicial",
-    r"disolver\s+(?:la\s+)?asamblea\s+legislativa",
-    r"disolver\s+(?:el\s+)?poder\s+judicial",
-    r"suprimir\s+(?:la\s+)?asamblea\s+legislativa",
-    r"suprimir\s+(?:el\s+)?poder\s+judicial",
-    # Modificar artículos constitucionales específicos
-    r"modificar.*art\.?\s*\d+.*constitución",
-    r"modificar.*artículo\s*\d+.*constitución",
-    r"cambiar.*art\.?\s*\d+.*constitución",
-    r"cambiar.*artículo\s*\d+.*constitución",
-    r"reformar.*art\.?\s*\d+.*constitución",
-    r"reformar.*artículo\s*\d+.*constitución",
-    # Cambios estructurales del Estado
-    r"cambiar\s+(?:la\s+)?estructura\s+del\s+estado",
-    r"modificar\s+(?:la\s+)?estructura\s+del\s+estado",
-    r"reformar\s+constitución\s+para\s+(?:eliminar|modificar|cambiar|suprimir)",
-    # Reforma general (Asamblea Constituyente)
-    r"asamblea\s+constituyente",
-    r"reforma\s+general\s+de\s+la\s+constitución",
-]
-
-# Menciones genéricas que NO requieren reforma constitucional (excluir)
-# Estas son menciones de "reforma constitucional" pero sin cambios reales
-GENERIC_CONSTITUTIONAL_MENTIONS = [
-    r"reforma\s+constitucional\s+y\s+[a-z]+",  # "reforma constitucional y fiscal"
-    r"reafirmar.*(?:art\.?\s*\d+|constitución|derecho)",
-    r"garantizar.*(?:art\.?\s*\d+|constitución|derecho)",
-    r"fortalecer.*(?:art\.?\s*\d+|constitución|derecho)",
-    r"respetar.*(?:art\.?\s*\d+|constitución)",
-    r"cumplir.*(?:art\.?\s*\d+|constitución)",
-]
-
-# Indicadores de violación de separación de poderes
-SEPARATION_POWERS_VIOLATIONS = [
-    # Eliminar/disolver instituciones constitucionales (viola separación de poderes)
-    r"(?:eliminar|disolver|cerrar|suprimir).*asamblea\s+legislativa",
-    r"asamblea\s+legislativa.*(?:eliminar|disolver|cerrar|suprimir)",
-    r"(?:eliminar|disolver|cerrar|suprimir).*poder\s+judicial",
-    r"poder\s+judicial.*(?:eliminar|disolver|cerrar|suprimir)",
-    # Gobernar por decreto sin Asamblea (viola separación de poderes)
-    r"gobierno\s+por\s+decreto\s+(?:sin|sin\s+la\s+)?asamblea",
-    r"gobernar\s+por\s+decreto\s+(?:sin|sin\s+la\s+)?asamblea",
-    r"decretos?\s+(?:permanentes?|indefinidos?)\s+(?:sin|sin\s+la\s+)?asamblea",
-    # Ejecutivo legisla/juzga (viola separación de poderes)
-    r"ejecutivo.*(?:legislar|juzgar)",
-    r"presidente.*(?:legislar|juzgar)",
-    r"poder\s+ejecutivo.*(?:legislar|juzgar)",
-    # Concentración de poderes
-    r"ejecutivo\s+legislativo",
-    r"concentración\s+de\s+poderes",
-]
-
-# Indicadores de violación de derechos fundamentales (art. 11-89)
-# NOTA: Solo detectar eliminación/suspensión completa, NO reformas legítimas
-FUNDAMENTAL_RIGHTS_VIOLATIONS = [
-    # Suspender/eliminar libertades fundamentales
-    r"suspender.*libertad\s+de\s+expresión",
-    r"eliminar.*libertad\s+de\s+expresión",
-    r"prohibir.*libertad\s+de\s+expresión",
-    r"suspender.*libertad\s+de\s+prensa",
-    r"eliminar.*libertad\s+de\s+prensa",
-    r"prohibir.*libertad\s+de\s+prensa",
-    # Eliminar derechos laborales fundamentales
-    r"eliminar.*derecho\s+a\s+huelga",
-    r"prohibir.*derecho\s+a\s+huelga",
-    r"suspender.*derecho\s+a\s+huelga",
-    # Prohibir manifestaciones
-    r"prohibir.*manifestaciones",
-    r"eliminar.*derecho\s+a\s+manifestación",
-    r"suspender.*derecho\s+a\s+manifestación",
-    # Eliminar instituciones constitucionales de derechos (solo eliminación completa)
-    r"eliminar.*(?:ccss|caja\s+costarricense).*(?:completamente|totalmente|por\s+completo)",
-    r"privatizar.*(?:ccss|caja\s+costarricense).*(?:completamente|totalmente|por\s+completo)",
-    r"eliminar.*educación\s+pública.*(?:completamente|totalmente|por\s+completo)",
-    r"privatizar.*educación\s+pública.*(?:completamente|totalmente|por\s+completo)",
-    # Restringir acceso a servicios públicos fundamentales
-    r"restringir.*acceso\s+a\s+salud\s+pública.*(?:completamente|totalmente)",
-    r"restringir.*acceso\s+a\s+educación\s+pública.*(?:completamente|totalmente)",
-]
+# Reglas de proximidad (ver proximity.py) de violación de la Constitución, con la
+# penalización y el motivo de cada grupo, en data/rules/viability.json:
+#   violates_separation_powers (-1.0), violates_fundamental_rights (-1.0, solo
+#   eliminación/suspensión completa, NO reformas legítimas),
+#   violates_constitutional_guarantees (-1.0), violates_constitutional_procedures (-0.5)
+VIABILITY_RULES = rule_packs.load_rule_pack("viability")
 
-# Indicadores de violación de garantías constitucionales (art. 40-71)
-CONSTITUTIONAL_GUARANTEES_VIOLATIONS = [
-    # Eliminar/suspender garantías procesales
-    r"eliminar.*hábeas\s+corpus",
-    r"suspender.*hábeas\s+corpus",
-    r"prohibir.*hábeas\s+corpus",
-    r"eliminar.*garantía\s+de\s+amparo",
-    r"suspender.*garantía\s+de\s+amparo",
-    r"prohibir.*garantía\s+de\s+amparo",
-    # Suspender garantías individuales
-    r"suspender.*garantías\s+individuales",
-    r"eliminar.*garantías\s+individuales",
-    r"suspender.*garantías\s+constitucionales",
-    r"eliminar.*garantías\s+constitucionales",
-    # Restringir garantías procesales
-    r"restringir.*garantías\s+procesales.*(?:completamente|totalmente)",
-    r"eliminar.*debido\s+proceso",
-    r"suspender.*debido\s+proceso",
-]
-
-# Indicadores de violación de procedimientos constitucionales
-CONSTITUTIONAL_PROCEDURE_VIOLATIONS = [
-    # Aprobar/ratificar sin Asamblea (viola procedimientos)
-    r"aprobar\s+presupuesto\s+sin\s+(?:la\s+)?asamblea",
-    r"ratificar\s+tratados\s+sin\s+(?:la\s+)?asamblea",
-    r"declarar\s+guerra\s+sin\s+(?:la\s+)?asamblea",
-    r"nombrar\s+ministros\s+sin\s+(?:la\s+)?asamblea",
-    # Ejecutivo hace funciones de Asamblea
-    r"ejecutivo.*(?:aprueba|ratifica|declara).*(?:sin|sin\s+la\s+)?asamblea",
-    r"presidente.*(?:aprueba|ratifica|declara).*(?:sin|sin\s+la\s+)?asamblea",
-]
+SEPARATION_POWERS_VIOLATIONS = VIABILITY_RULES.rules("violates_separation_powers")
+FUNDAMENTAL_RIGHTS_VIOLATIONS = VIABILITY_RULES.rules("violates_fundamental_rights")
+CONSTITUTIONAL_GUARANTEES_VIOLATIONS = VIABILITY_RULES.rules("violates_constitutional_guarantees")
+CONSTITUTIONAL_PROCEDURE_VIOLATIONS = VIABILITY_RULES.rules("violates_constitutional_procedures")
 
 def check_viability(text: str, pillar_id: str) -> Dict:
     """
     v7 Fase 1 Ampliada: Verifica viabilidad legal y constitucional de una propuesta.
     
-    Verificaciones:
+    Verificaciones (grupos de data/rules/viability.json):
     - Viola separación de poderes: -1.0
     - Viola derechos fundamentales: -1.0
     - Viola garantías constitucionales: -1.0
@@ -889,71 +1840,30 @@ def check_viability(text: str, pillar_id: str) -> Dict:
     Retorna penalizaciones por inviabilidad.
     """
     penalties = []
-    flags = {
-        "violates_separation_powers": False,
-        "violates_fundamental_rights": False,
-        "violates_constitutional_guarantees": False,
-        "violates_constitutional_procedures": False,
-    }
+    flags = {violation: False for violation in VIABILITY_RULES.groups}
     
-    text_lower = text.lower()
+    # Tokens del texto, compartidos por todas las reglas
+    index = proximity.TermIndex(text)
     
-    # Función auxiliar para extraer evidencia
-    def extract_evidence(pattern):
-        match = re.search(pattern, text_lower)
-        if match:
-            start = max(0, match.start() - 50)
-            end = min(len(text), match.end() + 150)
-            return text[start:end].strip()[:200]
-        return text[:200]
-    
-    # 1. Verificación: Viola separación de poderes (-1.0)
-    for pattern in SEPARATION_POWERS_VIOLATIONS:
-        if re.search(pattern, text_lower):
-            flags["violates_separation_powers"] = True
-            penalties.append({
-                "type": "violates_separation_powers",
-                "value": -1.0,
-                "reason": "Viola separación de poderes (art. 9, 11, 12 de la Constitución)",
-                "evidence": extract_evidence(pattern)
-            })
-            break  # Solo una penalización por tipo
+    # Función auxiliar para extraer evidencia (span de la coincidencia)
+    def extract_evidence(span):
+        start = max(0, span[0] - 50)
+        end = min(len(text), span[1] + 150)
+        return text[start:end].strip()[:200]
     
-    # 2. Verificación: Viola derechos fundamentales (-1.0)
-    for pattern in FUNDAMENTAL_RIGHTS_VIOLATIONS:
-        if re.search(pattern, text_lower):
-            flags["violates_fundamental_rights"] = True
-            penalties.append({
-                "type": "violates_fundamental_rights",
-                "value": -1.0,
-                "reason": "Viola derechos fundamentales (art. 11-89 de la Constitución)",
-                "evidence": extract_evidence(pattern)
-            })
-            break  # Solo una penalización por tipo
-    
-    # 3. Verificación: Viola garantías constitucionales (-1.0)
-    for pattern in CONSTITUTIONAL_GUARANTEES_VIOLATIONS:
-        if re.search(pattern, text_lower):
-            flags["violates_constitutional_guarantees"] = True
-            penalties.append({
-                "type": "violates_constitutional_guarantees",
-                "value": -1.0,
-                "reason": "Viola garantías constitucionales (art. 40-71 de la Constitución)",
-                "evidence": extract_evidence(pattern)
-            })
-            break  # Solo una penalización por tipo
-    
-    # 4. Verificación: Viola procedimientos constitucionales (-0.5)
-    for pattern in CONSTITUTIONAL_PROCEDURE_VIOLATIONS:
-        if re.search(pattern, text_lower):
-            flags["violates_constitutional_procedures"] = True
+    # Solo una penalización por tipo: la de la primera regla que coincide
+    for violation, spec in VIABILITY_RULES.groups.items():
+        match = VIABILITY_RULES.first_rule(violation, index)
+        if match:
+            rule, span = match
+            flags[violation] = True
             penalties.append({
-                "type": "violates_constitutional_procedures",
-                "value": -0.5,
-                "reason": "Viola procedimientos constitucionales",
-                "evidence": extract_evidence(pattern)
+                "type": violation,
+                "value": spec["penalty"],
+                "reason": spec["reason"],
+                "evidence": extract_evidence(span),
+                "rule_id": rule.rule_id
             })
-            break  # Solo una penalización por tipo
     
     return {
         "flags": flags,
@@ -966,31 +1876,13 @@ def check_viability(text: str, pillar_id: str) -> Dict:
 # DETECCIÓN DE PATRONES DICTATORIALES (v7 - Flags Informativos)
 # ====================================================================
 
-# Patrones objetivos de Cuba (históricamente verificables)
+# Patrones objetivos de Cuba y Venezuela (históricamente verificables), con su
+# severidad y fuentes, en data/rules/dictatorial.json
 # NOTA: Solo patrones de comportamiento, NO ideología
-CUBA_DICTATORIAL_PATTERNS = [
-    r"eliminar.*separación\s+de\s+poderes",
-    r"eliminar.*asamblea\s+legislativa",
-    r"eliminar.*libertad\s+de\s+prensa",
-    r"control.*estatal.*medios",
-    r"eliminar.*garantías\s+constitucionales",
-    r"concentración\s+de\s+poderes.*ejecutivo",
-    r"ejecutivo.*legislativo",
-    r"control.*total.*medios\s+de\s+comunicación",
-]
+DICTATORIAL_RULES = rule_packs.load_rule_pack("dictatorial")
 
-# Patrones objetivos de Venezuela (históricamente verificables)
-# NOTA: Solo patrones de comportamiento, NO ideología
-VENEZUELA_DICTATORIAL_PATTERNS = [
-    r"eliminar.*independencia\s+judicial",
-    r"control.*poder\s+judicial.*ejecutivo",
-    r"gobernar\s+por\s+decreto\s+sin\s+asamblea",
-    r"eliminar.*libertad\s+de\s+expresión",
-    r"cerrar.*medios\s+de\s+comunicación",
-    r"concentración\s+de\s+poderes.*ejecutivo",
-    r"asamblea\s+constituyente.*sin\s+asamblea",
-    r"control.*total.*poder\s+judicial",
-]
+CUBA_DICTATORIAL_PATTERNS = DICTATORIAL_RULES.rules("cuba_similarity")
+VENEZUELA_DICTATORIAL_PATTERNS = DICTATORIAL_RULES.rules("venezuela_similarity")
 
 def detect_dictatorial_patterns(proposals: List[Dict]) -> Dict:
     """
@@ -1002,26 +1894,13 @@ def detect_dictatorial_patterns(proposals: List[Dict]) -> Dict:
     Retorna flags informativos (NO penalizaciones).
     """
     patterns = {
-        "cuba_similarity": {
+        similarity: {
             "active": False,
-            "severity": "high",
-            "evidence": [],
-            "historical_sources": [
-                "Resoluciones CIDH",
-                "Informes ONU",
-                "Documentos históricos verificables"
-            ]
-        },
-        "venezuela_similarity": {
-            "active": False,
-            "severity": "high",
+            "severity": spec["severity"],
             "evidence": [],
-            "historical_sources": [
-                "Resoluciones CIDH",
-                "Sentencias Corte Interamericana",
-                "Informes ONU"
-            ]
+            "historical_sources": list(spec["historical_sources"])
         }
+        for similarity, spec in DICTATORIAL_RULES.groups.items()
     }
     
     for proposal in proposals:
@@ -1029,73 +1908,32 @@ def detect_dictatorial_patterns(proposals: List[Dict]) -> Dict:
         if not proposal_text:
             continue
         
-        text_lower = proposal_text.lower()
+        index = proximity.TermIndex(proposal_text)
         pillar_id = proposal.get("pillar_id", "unknown")
         
-        # Detectar similitudes con Cuba
-        cuba_matches = []
-        for pattern in CUBA_DICTATORIAL_PATTERNS:
-            if re.search(pattern, text_lower):
-                cuba_matches.append(pattern)
-        
-        if cuba_matches:
-            patterns["cuba_similarity"]["active"] = True
-            patterns["cuba_similarity"]["evidence"].append({
-                "pillar_id": pillar_id,
-                "proposal_text": proposal_text[:200],
-                "matched_patterns": cuba_matches,
-                "detection_method": "pattern_matching"
-            })
-        
-        # Detectar similitudes con Venezuela
-        venezuela_matches = []
-        for pattern in VENEZUELA_DICTATORIAL_PATTERNS:
-            if re.search(pattern, text_lower):
-                venezuela_matches.append(pattern)
-        
-        if venezuela_matches:
-            patterns["venezuela_similarity"]["active"] = True
-            patterns["venezuela_similarity"]["evidence"].append({
-                "pillar_id": pillar_id,
-                "proposal_text": proposal_text[:200],
-                "matched_patterns": venezuela_matches,
-                "detection_method": "pattern_matching"
-            })
+        # Detectar similitudes con Cuba y Venezuela
+        for similarity in DICTATORIAL_RULES.groups:
+            matches = DICTATORIAL_RULES.matching_rules(similarity, index)
+            if matches:
+                patterns[similarity]["active"] = True
+                patterns[similarity]["evidence"].append({
+                    "pillar_id": pillar_id,
+                    "proposal_text": proposal_text[:200],
+                    "matched_patterns": [rule.source for rule in matches],
+                    "matched_rule_ids": [rule.rule_id for rule in matches],
+                    "detection_method": "pattern_matching"
+                })
     
     return patterns
 
-# Patrones que indican necesidad de negociación entre poderes
+# Indicadores de necesidad de negociación entre poderes, con su severidad y
+# descripción, en data/rules/power_negotiation.json: aprobación de la Asamblea
+# (reglas de proximidad), mayoría calificada y coordinación entre poderes (regex
+# sobre el texto en minúsculas)
 # NOTA: Esto es legítimo pero informativo (complejidad de implementación)
-POWER_NEGOTIATION_INDICATORS = [
-    # Requiere aprobación de Asamblea (legítimo, pero requiere negociación)
-    r"requiere\s+aprobación\s+de\s+la\s+asamblea",
-    r"necesita\s+aprobación\s+legislativa",
-    r"requiere\s+consenso\s+legislativo",
-    r"aprobación\s+de\s+la\s+asamblea\s+legislativa",
-    # Requiere mayoría calificada (2/3)
-    r"mayoría\s+calificada",
-    r"dos\s+tercios",
-    r"2\/3",
-    r"mayoría\s+de\s+dos\s+tercios",
-    # Requiere coordinación entre poderes
-    r"coordinación\s+entre\s+poderes",
-    r"negociación\s+con\s+la\s+asamblea",
-    r"consenso\s+entre\s+poderes",
-    r"acuerdo\s+con\s+la\s+asamblea",
-    # Requiere reforma legal que necesita Asamblea
-    r"reforma\s+legal.*asamblea",
-    r"modificar\s+ley.*asamblea",
-    r"nueva\s+ley.*asamblea",
-    r"proyecto\s+de\s+ley",
-    # Requiere presupuesto aprobado por Asamblea
-    r"presupuesto.*asamblea",
-    r"aprobación\s+presupuestaria",
-    r"asignación\s+presupuestaria.*asamblea",
-    # Requiere ratificación de tratados
-    r"ratificación.*asamblea",
-    r"tratado.*asamblea",
-    r"convenio.*asamblea",
-]
+POWER_NEGOTIATION_RULES = rule_packs.load_rule_pack("power_negotiation")
+
+ASSEMBLY_APPROVAL_RULES = POWER_NEGOTIATION_RULES.rules("requires_assembly_approval")
 
 def detect_power_negotiation_requirements(proposals: List[Dict]) -> Dict:
     """
@@ -1107,24 +1945,13 @@ def detect_power_negotiation_requirements(proposals: List[Dict]) -> Dict:
     Retorna flags informativos (NO penalizaciones).
     """
     flags = {
-        "requires_assembly_approval": {
+        requirement: {
             "active": False,
-            "severity": "medium",
+            "severity": spec["severity"],
             "evidence": [],
-            "description": "Requiere aprobación de la Asamblea Legislativa"
-        },
-        "requires_qualified_majority": {
-            "active": False,
-            "severity": "high",
-            "evidence": [],
-            "description": "Requiere mayoría calificada (2/3) en Asamblea"
-        },
-        "requires_inter_branch_coordination": {
-            "active": False,
-            "severity": "medium",
-            "evidence": [],
-            "description": "Requiere coordinación entre poderes del Estado"
+            "description": spec["description"]
         }
+        for requirement, spec in POWER_NEGOTIATION_RULES.groups.items()
     }
     
     for proposal in proposals:
@@ -1134,74 +1961,23 @@ def detect_power_negotiation_requirements(proposals: List[Dict]) -> Dict:
         
         text_lower = proposal_text.lower()
         pillar_id = proposal.get("pillar_id", "unknown")
+        index = proximity.TermIndex(proposal_text)
         
-        # Detectar necesidad de aprobación de Asamblea
-        assembly_approval_matches = []
-        for pattern in [
-            r"requiere\s+aprobación\s+de\s+la\s+asamblea",
-            r"necesita\s+aprobación\s+legislativa",
-            r"requiere\s+consenso\s+legislativo",
-            r"aprobación\s+de\s+la\s+asamblea\s+legislativa",
-            r"reforma\s+legal.*asamblea",
-            r"modificar\s+ley.*asamblea",
-            r"nueva\s+ley.*asamblea",
-            r"proyecto\s+de\s+ley",
-            r"presupuesto.*asamblea",
-            r"aprobación\s+presupuestaria",
-            r"ratificación.*asamblea",
-            r"tratado.*asamblea"
-        ]:
-            if re.search(pattern, text_lower):
-                assembly_approval_matches.append(pattern)
-        
-        if assembly_approval_matches:
-            flags["requires_assembly_approval"]["active"] = True
-            flags["requires_assembly_approval"]["evidence"].append({
-                "pillar_id": pillar_id,
-                "proposal_text": proposal_text[:200],
-                "matched_patterns": assembly_approval_matches,
-                "detection_method": "pattern_matching"
-            })
-        
-        # Detectar necesidad de mayoría calificada
-        qualified_majority_matches = []
-        for pattern in [
-            r"mayoría\s+calificada",
-            r"dos\s+tercios",
-            r"2\/3",
-            r"mayoría\s+de\s+dos\s+tercios"
-        ]:
-            if re.search(pattern, text_lower):
-                qualified_majority_matches.append(pattern)
-        
-        if qualified_majority_matches:
-            flags["requires_qualified_majority"]["active"] = True
-            flags["requires_qualified_majority"]["evidence"].append({
-                "pillar_id": pillar_id,
-                "proposal_text": proposal_text[:200],
-                "matched_patterns": qualified_majority_matches,
-                "detection_method": "pattern_matching"
-            })
-        
-        # Detectar necesidad de coordinación entre poderes
-        coordination_matches = []
-        for pattern in [
-            r"coordinación\s+entre\s+poderes",
-            r"negociación\s+con\s+la\s+asamblea",
-            r"consenso\s+entre\s+poderes",
-            r"acuerdo\s+con\s+la\s+asamblea"
-        ]:
-            if re.search(pattern, text_lower):
-                coordination_matches.append(pattern)
-        
-        if coordination_matches:
-            flags["requires_inter_branch_coordination"]["active"] = True
-            flags["requires_inter_branch_coordination"]["evidence"].append({
-                "pillar_id": pillar_id,
-                "proposal_text": proposal_text[:200],
-                "matched_patterns": coordination_matches,
-                "detection_method": "pattern_matching"
-            })
+        for requirement, spec in POWER_NEGOTIATION_RULES.groups.items():
+            if spec["kind"] == "proximity":
+                rule_ids = [rule.rule_id for rule in POWER_NEGOTIATION_RULES.matching_rules(requirement, index)]
+            else:
+                rule_ids = POWER_NEGOTIATION_RULES.matching_regex(text_lower, requirement)
+            
+            if rule_ids:
+                flags[requirement]["active"] = True
+                flags[requirement]["evidence"].append({
+                    "pillar_id": pillar_id,
+                    "proposal_text": proposal_text[:200],
+                    "matched_patterns": [POWER_NEGOTIATION_RULES.rule_sources[rule_id] for rule_id in rule_ids],
+                    "matched_rule_ids": rule_ids,
+                    "detection_method": "pattern_matching"
+                })
     
     return flags
 
@@ -1505,60 +2281,40 @@ def analyze_fiscal_responsibility(full_text: str) -> Dict:
     Analiza la posición fiscal del candidato.
     v6: Elimina penalización por impuestos (posición ideológica legítima).
     """
-    text_lower = full_text.lower()
+    # Tokens del plan, compartidos por todas las reglas de proximidad
+    index = proximity.TermIndex(full_text)
     
     analysis = {
         "penalties": [],
-        "flags": {
-            "attacks_fiscal_rule": False,
-            "proposes_debt_increase": False,
-            "shows_fiscal_responsibility": False,
-        },
+        "flags": {group: False for group in FISCAL_RULES.groups},
         "evidence": [],
         "total_penalty": 0
     }
     
     # Verificar indicadores de responsabilidad fiscal
-    for pattern in FISCAL_RESPONSIBILITY_INDICATORS:
-        if re.search(pattern, text_lower):
-            analysis["flags"]["shows_fiscal_responsibility"] = True
-            break
+    if FISCAL_RULES.first_rule("shows_fiscal_responsibility", index):
+        analysis["flags"]["shows_fiscal_responsibility"] = True
     
     # PENALIZACIÓN SEVERA: Atacar regla fiscal (-2)
-    for pattern in FISCAL_RULE_ATTACK_PATTERNS:
-        match = re.search(pattern, text_lower)
-        if match:
-            analysis["flags"]["attacks_fiscal_rule"] = True
-            start = max(0, match.start() - 50)
-            end = min(len(text_lower), match.end() + 100)
-            evidence = full_text[start:end].strip()[:200]
-            
-            analysis["penalties"].append({
-                "type": "attacks_fiscal_rule",
-                "value": -2,
-                "reason": "Propone flexibilizar/reformar la regla fiscal (Ley 9635)",
-                "evidence": evidence
-            })
-            analysis["evidence"].append(evidence)
-            break
-    
     # PENALIZACIÓN: Proponer aumento de deuda (-1)
-    for pattern in DEBT_INCREASE_PATTERNS:
-        match = re.search(pattern, text_lower)
-        if match:
-            analysis["flags"]["proposes_debt_increase"] = True
-            start = max(0, match.start() - 50)
-            end = min(len(text_lower), match.end() + 100)
-            evidence = full_text[start:end].strip()[:200]
-            
-            analysis["penalties"].append({
-                "type": "proposes_debt_increase",
-                "value": -1,
-                "reason": "Propone aumentar deuda pública sin plan de sostenibilidad",
-                "evidence": evidence
-            })
-            analysis["evidence"].append(evidence)
-            break
+    for group in ("attacks_fiscal_rule", "proposes_debt_increase"):
+        match = FISCAL_RULES.first_rule(group, index)
+        if not match:
+            continue
+        rule, span = match
+        analysis["flags"][group] = True
+        start = max(0, span[0] - 50)
+        end = min(len(full_text), span[1] + 100)
+        evidence = full_text[start:end].strip()[:200]
+        
+        analysis["penalties"].append({
+            "type": group,
+            "value": FISCAL_RULES.groups[group]["penalty"],
+            "reason": FISCAL_RULES.groups[group]["reason"],
+            "evidence": evidence,
+            "rule_id": rule.rule_id
+        })
+        analysis["evidence"].append(evidence)
     
     # NOTA v6: NO se penaliza proponer impuestos
     # Es una posición ideológica legítima, no irresponsabilidad fiscal
@@ -1576,19 +2332,17 @@ def analyze_urgency_omissions(full_text: str) -> Dict:
     Analiza si el candidato omite urgencias nacionales críticas.
     v6: Nueva función para penalizar omisiones.
     """
-    text_lower = full_text.lower()
-    
     analysis = {
         "penalties": [],
         "coverage": {},
         "total_penalty": 0
     }
     
-    for urgency_key, urgency_data in URGENCY_TERMS.items():
-        found_terms = []
-        for term in urgency_data["terms"]:
-            if term.lower() in text_lower:
-                found_terms.append(term)
+    # Términos presentes de todas las urgencias en una sola pasada
+    found_by_urgency = URGENCY_RULES.found_keywords(full_text)
+    
+    for urgency_key, urgency_data in URGENCY_RULES.groups.items():
+        found_terms = found_by_urgency[urgency_key]
         
         is_covered = len(found_terms) > 0
         analysis["coverage"][urgency_key] = {
@@ -1603,7 +2357,8 @@ def analyze_urgency_omissions(full_text: str) -> Dict:
                 "type": f"ignores_{urgency_key}",
                 "value": urgency_data["penalty"],
                 "reason": f"No aborda: {urgency_data['description']}",
-                "evidence": "Término no encontrado en el documento"
+                "evidence": "Término no encontrado en el documento",
+                "rule_id": URGENCY_RULES.rule_ids[urgency_key][0]
             })
     
     analysis["total_penalty"] = sum(p["value"] for p in analysis["penalties"])
@@ -1623,7 +2378,7 @@ def analyze_pillar_omissions(proposals: List[Dict], candidate_id: str) -> Dict:
     
     candidate_proposals = [p for p in proposals if p["candidate_id"] == candidate_id]
     
-    for pillar_id in PRIORITY_PILLARS:
+    for pillar_id in ordered_pillar_ids(PRIORITY_PILLARS):
         prop = next((p for p in candidate_proposals if p["pillar_id"] == pillar_id), None)
         
         # Si no hay propuesta o es placeholder
@@ -1644,6 +2399,11 @@ def analyze_pillar_omissions(proposals: List[Dict], candidate_id: str) -> Dict:
 # EXTRACCIÓN DE PROPUESTAS
 # ====================================================================
 
+# Corte de párrafos candidatos: fin de oración seguido de mayúscula. Las páginas ya
+# normalizadas son una sola línea (normalize_text colapsa los saltos de línea), así
+# que no hay líneas en blanco por las que cortar
+PARAGRAPH_SPLIT_PATTERN = re.compile(r'\.\s+(?=[A-ZÁÉÍÓÚÑ])')
+
 def extract_best_proposal_per_pillar(pages: List[Tuple[int, str]], pdf_id: str) -> Dict[str, List[Dict]]:
     """
     v7: Extrae hasta 3 propuestas válidas por pilar (score >= 2).
@@ -1652,32 +2412,19 @@ def extract_best_proposal_per_pillar(pages: List[Tuple[int, str]], pdf_id: str)
     candidates_by_pillar = defaultdict(list)
     
     for page_num, text in pages:
-        paragraphs = re.split(r'\n\s*\n|\.\s+(?=[A-ZÁÉÍÓÚÑ])', text)
+        paragraphs = PARAGRAPH_SPLIT_PATTERN.split(text)
         
         for paragraph in paragraphs:
             paragraph = paragraph.strip()
             if len(paragraph) < 50:
                 continue
             
-            pillar_id = identify_primary_pillar(paragraph)
-            if not pillar_id:
-                continue
-            
-            is_concrete = check_existence(paragraph)
-            if not is_concrete:
+            analysis = analyze_paragraph(paragraph)
+            if not analysis:
                 continue
             
-            has_when, when_text = check_when(paragraph)
-            has_how, how_text = check_how(paragraph)
-            has_funding, funding_text = check_funding(paragraph)
-            
-            dimensions = {
-                "existence": 1,
-                "when": 1 if has_when else 0,
-                "how": 1 if has_how else 0,
-                "funding": 1 if has_funding else 0
-            }
-            
+            pillar_id = analysis["pillar_id"]
+            dimensions = analysis["dimensions"]
             raw_score = sum(dimensions.values())
             snippet = paragraph[:237] + "…" if len(paragraph) > 240 else paragraph
             title = paragraph[:57] + "…" if len(paragraph) > 60 else paragraph[:60]
@@ -1688,12 +2435,9 @@ def extract_best_proposal_per_pillar(pages: List[Tuple[int, str]], pdf_id: str)
                 "text": paragraph[:500],
                 "title": title,
                 "dimensions": dimensions,
+                "dimension_rule_ids": analysis["rule_ids"],
                 "raw_score": raw_score,
-                "extracted_fields": {
-                    "when_text": when_text,
-                    "how_text": how_text,
-                    "funding_text": funding_text
-                },
+                "extracted_fields": analysis["extracted_fields"],
                 "snippet": snippet
             }
             
@@ -1730,6 +2474,7 @@ def create_proposals_json(best_by_pillar: Dict[str, List[Dict]], candidate_id: s
                     "proposal_title": p["title"],
                     "proposal_text": p["text"],
                     "dimensions": p["dimensions"],
+                    "dimension_rule_ids": p["dimension_rule_ids"],
                     "extracted_fields": p["extracted_fields"],
                     "evidence": {
                         "pdf_id": pdf_id,
@@ -1747,6 +2492,7 @@ def create_proposals_json(best_by_pillar: Dict[str, List[Dict]], candidate_id: s
                 "proposal_title": "Sin propuesta identificada para este pilar",
                 "proposal_text": "El documento no contiene propuestas concretas para este pilar.",
                 "dimensions": {"existence": 0, "when": 0, "how": 0, "funding": 0},
+                "dimension_rule_ids": {"existence": None, "when": None, "how": None, "funding": None},
                 "extracted_fields": {
                     "when_text": "no_especificado",
                     "how_text": "no_especificado",
@@ -2067,20 +2813,11 @@ def generate_ranking(candidate_scores: List[Dict]) -> Dict:
         "method_version": "v7_neutral_strict_bonus_viability_informative_flags",
         "description": "Neutral (sin sesgo ideológico) + Estricto (penaliza omisiones) + Bonos (múltiples propuestas) + Viabilidad legal ampliada + Flags informativos (propuestas problemáticas, similitudes dictatoriales)",
         "weights": PILLAR_WEIGHTS,
-        "priority_pillars": list(PRIORITY_PILLARS),
-        "critical_pillars": list(CRITICAL_PILLARS),
+        "priority_pillars": ordered_pillar_ids(PRIORITY_PILLARS),
+        "critical_pillars": ordered_pillar_ids(CRITICAL_PILLARS),
         "penalties_applied": {
-            "fiscal": {
-                "attacks_fiscal_rule": -2,
-                "proposes_debt_increase": -1,
-            },
-            "omissions": {
-                "ignores_security_operations": -1,
-                "ignores_ccss_crisis": -1,
-                "ignores_formal_employment": -0.5,
-                "ignores_organized_crime": -0.5,
-                "missing_priority_pillar": -0.5,
-            }
+            "fiscal": dict(FISCAL_PENALTIES),
+            "omissions": dict(OMISSION_PENALTIES),
         },
         "ranking_overall_weighted": [
             {
@@ -2114,13 +2851,143 @@ def load_existing_candidates() -> Dict[str, str]:
             return {c["pdf_id"]: c["candidate_id"] for c in candidates}
     return {}
 
-def process_all_pdfs():
+def ocr_likely_needed(pdf_files: List[str], use_cache: bool = True) -> bool:
+    """
+    Revisa una muestra de páginas (hasta OCR_PRELOAD_SAMPLE_PAGES repartidas por
+    PDF) con PyMuPDF: True si alguna tiene texto corrupto, es decir, si probablemente
+    hará falta OCR. Los PDFs con texto OCR pre-extraído o ya en la caché de
+    extracción no se revisan. Es una estimación: si la muestra no encuentra páginas
+    corruptas y después hacen falta, los procesos cargan su propio modelo.
+    """
+    for pdf_file in pdf_files:
+        pdf_path = os.path.join(PLANES_DIR, pdf_file)
+        pdf_id = os.path.splitext(pdf_file)[0].lower()
+        if os.path.exists(os.path.join(DATA_DIR, f"{pdf_id}_ocr_text.txt")):
+            continue
+        try:
+            if use_cache and load_cached_extraction(file_sha256(pdf_path), pdf_id) is not None:
+                continue
+            with load_fitz().open(pdf_path) as doc:
+                num_pages = len(doc)
+                step = max(1, num_pages // OCR_PRELOAD_SAMPLE_PAGES)
+                texts = [doc[page_index].get_text() for page_index in range(0, num_pages, step)]
+        except Exception:
+            return True  # no se pudo revisar: se asume que hace falta
+        ratios = text_quality.corrupt_ratios(texts, CORRUPT_CHARS)
+        if any(ratio > CORRUPT_THRESHOLD for ratio in ratios):
+            return True
+    return False
+
+
+def process_pdf(
+    pdf_file: str,
+    existing_candidates: Dict[str, str],
+    use_cache: bool = True,
+    ocr_workers: int = 1,
+    ocr_threads: Optional[int] = None,
+    ocr_batch: int = EASYOCR_BATCH_SIZE,
+    ocr_render_workers: int = 0
+) -> Optional[Dict]:
+    """
+    Procesa un PDF completo: extracción, propuestas, scoring y análisis detallado.
+    
+    Es autocontenido (sin estado global mutable) para poder ejecutarse en un
+    proceso de trabajo. Retorna None si no se pudo extraer texto.
+    """
+    pdf_id = pdf_file.replace('.pdf', '')
+    pdf_path = os.path.join(PLANES_DIR, pdf_file)
+    
+    pages, full_text = extract_text_from_pdf(
+        pdf_path, use_cache=use_cache, ocr_workers=ocr_workers, ocr_threads=ocr_threads, ocr_batch=ocr_batch,
+        ocr_render_workers=ocr_render_workers
+    )
+    
+    if not pages:
+        return None
+    
+    info = extract_candidate_info(pages, pdf_id)
+    
+    if pdf_id in existing_candidates:
+        candidate_id = existing_candidates[pdf_id]
+    elif info["candidate_name"] != "no_especificado":
+        candidate_id = slugify(info["candidate_name"])
+    else:
+        candidate_id = pdf_id.lower()
+    
+    candidate = {
+        "candidate_id": candidate_id,
+        "candidate_name": info["candidate_name"],
+        "party_name": info["party_name"],
+        "pdf_id": pdf_id,
+        "pdf_title": f"Plan de Gobierno {pdf_id} 2026-2030",
+        "pdf_url": "no_especificado"
+    }
+    
+    # Análisis fiscal (v7: sin penalización por impuestos, igual que v6)
+    fiscal_analysis = analyze_fiscal_responsibility(full_text)
+    
+    # Extraer propuestas
+    best_by_pillar = extract_best_proposal_per_pillar(pages, pdf_id)
+    proposals = create_proposals_json(best_by_pillar, candidate_id, pdf_id)
+    
+    # Análisis de omisiones (v7: igual que v6)
+    urgency_analysis = analyze_urgency_omissions(full_text)
+    pillar_analysis = analyze_pillar_omissions(proposals, candidate_id)
+    
+    # Calcular scores con penalizaciones v6 + bonos v7
+    scores = calculate_candidate_score(
+        proposals, candidate_id, full_text, 
+        fiscal_analysis, urgency_analysis, pillar_analysis
+    )
+    
+    # Análisis detallado
+    analysis = analyze_candidate_detailed(
+        pages, full_text, pdf_id, 
+        fiscal_analysis, urgency_analysis, pillar_analysis
+    )
+    analysis["candidate_id"] = candidate_id
+    
+    # Contar propuestas totales (v7: puede haber múltiples por pilar)
+    total_proposals = sum(len(props) if isinstance(props, list) else 1 for props in best_by_pillar.values())
+    
+    return {
+        "candidate": candidate,
+        "proposals": proposals,
+        "scores": scores,
+        "analysis": analysis,
+        "num_pages": len(pages),
+        "total_proposals": total_proposals,
+        "num_pillars": len(best_by_pillar),
+    }
+
+def format_points(value: float) -> str:
+    """Penalización para mostrar: "-2 puntos", "-1 punto", "-0.5 puntos"."""
+    return f"{value:g} {'punto' if abs(value) == 1 else 'puntos'}"
+
+def process_all_pdfs(
+    use_cache: bool = True,
+    workers: Optional[int] = None,
+    ocr_workers: Optional[int] = None,
+    ocr_threads: Optional[int] = None,
+    ocr_batch: int = EASYOCR_BATCH_SIZE,
+    ocr_render_workers: Optional[int] = None,
+    cores: Optional[int] = None,
+    preload_ocr: bool = False
+):
     os.makedirs(DATA_DIR, exist_ok=True)
+    ocr_pipeline.set_ocr_preload(preload_ocr)
+    
+    # Un único reparto de núcleos para procesos de PDF, procesos OCR e hilos internos
+    budget = ocr_pipeline.plan_cpu_budget(cores, workers, ocr_workers, ocr_threads, ocr_render_workers)
+    workers = budget["workers"]
+    ocr_workers = budget["ocr_workers"]
+    ocr_threads = budget["ocr_threads"]
+    ocr_render_workers = budget["render_workers"]
     
     existing_candidates = load_existing_candidates()
     print(f"📋 Cargados {len(existing_candidates)} candidate_ids del archivo existente")
     
-    pdf_files = [f for f in os.listdir(PLANES_DIR) if f.endswith('.pdf')]
+    pdf_files = sorted(f for f in os.listdir(PLANES_DIR) if f.endswith('.pdf'))
     
     all_candidates = []
     all_proposals = []
@@ -2137,18 +3004,37 @@ def process_all_pdfs():
     if EASYOCR_AVAILABLE:
         print("  • EasyOCR: Último recurso (OCR)")
     elif TESSERACT_AVAILABLE:
-        print("  • Tesseract: Último recurso (OCR)")
+        print(f"  • Tesseract ({TESSERACT_BACKEND}): Último recurso (OCR)")
+    if budget["cores"]:
+        print(f"  • Presupuesto CPU: {ocr_pipeline.describe_cpu_budget(budget)}")
+    if workers > 1:
+        print(f"  • Paralelismo: {workers} procesos (resultados combinados en orden de pdf_id)")
+    if ocr_workers > 1:
+        threads_info = f", {ocr_threads} hilo(s) c/u" if ocr_threads else ""
+        print(f"  • OCR paralelo: {ocr_workers} procesos por documento{threads_info}")
+    if ocr_batch > 1 and EASYOCR_AVAILABLE:
+        print(f"  • EasyOCR por lotes: {ocr_batch} páginas por lote")
+    if ocr_render_workers > 0:
+        print(f"  • Pipeline render → OCR: {ocr_render_workers} proceso(s) de render (memoria compartida)")
+    if preload_ocr and OCR_AVAILABLE:
+        print("  • Modelo OCR precargado y compartido con los procesos (fork) si hace falta OCR")
+    if use_cache:
+        print(f"  • Caché de extracción: {os.path.relpath(EXTRACTION_CACHE_DIR, SCRIPT_DIR)}")
+    if render_cache.RENDER_CACHE_ENABLED and OCR_AVAILABLE:
+        print(f"  • Caché de renders OCR: {os.path.relpath(render_cache.RENDER_CACHE_DIR, SCRIPT_DIR)}")
+    if ocr_cache.OCR_CACHE_ENABLED and OCR_AVAILABLE:
+        print(f"  • Caché de resultados OCR (por imagen): {os.path.relpath(ocr_cache.OCR_CACHE_DIR, SCRIPT_DIR)}")
     print("=" * 80)
+    # Penalizaciones tal como están en data/rules
     print("PENALIZACIONES FISCALES (objetivas - basadas en ley):")
-    print("  • Atacar regla fiscal (Ley 9635): -2 puntos")
-    print("  • Proponer más deuda: -1 punto")
+    for group, penalty in FISCAL_PENALTIES.items():
+        print(f"  • {FISCAL_RULES.groups[group]['reason']}: {format_points(penalty)}")
     print("-" * 80)
     print("PENALIZACIONES POR OMISIÓN (urgencias nacionales):")
-    print("  • No mencionar seguridad operativa: -1 punto")
-    print("  • No mencionar crisis CCSS: -1 punto")
-    print("  • No mencionar empleo formal: -0.5 puntos")
-    print("  • No mencionar crimen organizado: -0.5 puntos")
-    print("  • Por cada pilar prioritario sin propuesta: -0.5 puntos")
+    for spec in URGENCY_RULES.groups.values():
+        description = spec["description"][:1].lower() + spec["description"][1:]
+        print(f"  • No mencionar {description}: {format_points(spec['penalty'])}")
+    print(f"  • Por cada pilar prioritario sin propuesta: {format_points(MISSING_PRIORITY_PILLAR_PENALTY)}")
     print("-" * 80)
     print("BONOS POR MÚLTIPLES PROPUESTAS (v7):")
     print("  • 3+ propuestas válidas por pilar: +1.0 puntos")
@@ -2156,10 +3042,8 @@ def process_all_pdfs():
     print("  • Propuesta con financiamiento (score >= 3): +0.1 puntos")
     print("-" * 80)
     print("VERIFICACIÓN DE VIABILIDAD LEGAL (v7 Fase 1 Ampliada):")
-    print("  • Viola separación de poderes: -1.0 puntos")
-    print("  • Viola derechos fundamentales: -1.0 puntos")
-    print("  • Viola garantías constitucionales: -1.0 puntos")
-    print("  • Viola procedimientos constitucionales: -0.5 puntos")
+    for spec in VIABILITY_RULES.groups.values():
+        print(f"  • {spec['reason']}: {format_points(spec['penalty'])}")
     print("  • NOTA: No se penaliza reforma constitucional (puede ser legítima y necesaria)")
     print("--------------------------------------------------------------------------------")
     print("FLAGS INFORMATIVOS (v7 - NO penalizan, solo informan):")
@@ -2173,75 +3057,81 @@ def process_all_pdfs():
     print("NOTA: No se penaliza proponer impuestos (posición ideológica legítima)")
     print("=" * 80)
     
-    for pdf_file in sorted(pdf_files):
-        pdf_id = pdf_file.replace('.pdf', '')
-        pdf_path = os.path.join(PLANES_DIR, pdf_file)
-        
-        print(f"\n📄 {pdf_id}...")
+    # Procesar cada PDF (en serie o en un pool de procesos). Los resultados se
+    # combinan siempre en orden de pdf_id para que la salida sea idéntica.
+    results = {}
+    failures = {}
+    if workers > 1:
+        # Con precarga, los procesos de PDF heredan el modelo ya cargado; solo se
+        # carga si una muestra de páginas indica que hará falta OCR
+        preload = preload_ocr and OCR_AVAILABLE and ocr_likely_needed(pdf_files, use_cache)
+        if preload_ocr and not preload:
+            print("ℹ️  Precarga OCR omitida: la muestra de páginas no requiere OCR")
+        # Cada proceso recibe las opciones elegidas en la línea de comandos
+        with ocr_pipeline.shared_ocr_models(preload) as loaded, ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=ocr_pipeline.ocr_pool_context(),
+            initializer=ocr_pipeline.apply_worker_settings,
+            initargs=(ocr_pipeline.worker_settings(),)
+        ) as executor:
+            if loaded:
+                print("🧠 Modelo OCR precargado en el proceso principal")
+            futures = {
+                executor.submit(
+                    process_pdf, pdf_file, existing_candidates, use_cache, ocr_workers, ocr_threads, ocr_batch,
+                    ocr_render_workers
+                ): pdf_file
+                for pdf_file in pdf_files
+            }
+            for future in as_completed(futures):
+                pdf_file = futures[future]
+                try:
+                    results[pdf_file] = future.result()
+                except Exception as e:
+                    # El fallo de un PDF no aborta los demás
+                    failures[pdf_file] = e
+    
+    for pdf_file in pdf_files:
+        print(f"\n📄 {pdf_file.replace('.pdf', '')}...")
+        
+        if workers <= 1:
+            try:
+                results[pdf_file] = process_pdf(
+                    pdf_file, existing_candidates, use_cache, ocr_workers, ocr_threads, ocr_batch,
+                    ocr_render_workers
+                )
+            except Exception as e:
+                failures[pdf_file] = e
         
-        pages, full_text = extract_text_from_pdf(pdf_path)
+        if pdf_file in failures:
+            print(f"   ❌ Error procesando {pdf_file}: {failures[pdf_file]}")
+            continue
         
-        if not pages:
+        result = results[pdf_file]
+        if result is None:
             print(f"   ⚠️ No se pudo extraer texto")
             continue
         
-        info = extract_candidate_info(pages, pdf_id)
-        
-        if pdf_id in existing_candidates:
-            candidate_id = existing_candidates[pdf_id]
-        elif info["candidate_name"] != "no_especificado":
-            candidate_id = slugify(info["candidate_name"])
-        else:
-            candidate_id = pdf_id.lower()
-        
-        candidate = {
-            "candidate_id": candidate_id,
-            "candidate_name": info["candidate_name"],
-            "party_name": info["party_name"],
-            "pdf_id": pdf_id,
-            "pdf_title": f"Plan de Gobierno {pdf_id} 2026-2030",
-            "pdf_url": "no_especificado"
-        }
-        all_candidates.append(candidate)
-        
-        # Análisis fiscal (v7: sin penalización por impuestos, igual que v6)
-        fiscal_analysis = analyze_fiscal_responsibility(full_text)
-        
-        # Extraer propuestas
-        best_by_pillar = extract_best_proposal_per_pillar(pages, pdf_id)
-        proposals = create_proposals_json(best_by_pillar, candidate_id, pdf_id)
-        all_proposals.extend(proposals)
-        
-        # Análisis de omisiones (v7: igual que v6)
-        urgency_analysis = analyze_urgency_omissions(full_text)
-        pillar_analysis = analyze_pillar_omissions(proposals, candidate_id)
-        
-        # Calcular scores con penalizaciones v6 + bonos v7
-        scores = calculate_candidate_score(
-            proposals, candidate_id, full_text, 
-            fiscal_analysis, urgency_analysis, pillar_analysis
-        )
-        all_scores.append(scores)
-        
-        # Análisis detallado
-        analysis = analyze_candidate_detailed(
-            pages, full_text, pdf_id, 
-            fiscal_analysis, urgency_analysis, pillar_analysis
-        )
-        analysis["candidate_id"] = candidate_id
-        all_analysis.append(analysis)
+        all_candidates.append(result["candidate"])
+        all_proposals.extend(result["proposals"])
+        all_scores.append(result["scores"])
+        all_analysis.append(result["analysis"])
         
         # Resumen
+        scores = result["scores"]
         total_penalties = scores["overall"]["total_penalties_applied"]
-        risk = analysis["risk_level"]
+        risk = result["analysis"]["risk_level"]
         risk_emoji = {"ALTO": "🔴", "MEDIO": "🟠", "BAJO": "🟢"}.get(risk, "⚪")
         
-        # Contar propuestas totales (v7: puede haber múltiples por pilar)
-        total_proposals = sum(len(props) if isinstance(props, list) else 1 for props in best_by_pillar.values())
-        print(f"   → Págs: {len(pages)} | Propuestas: {total_proposals} | Pilares: {len(best_by_pillar)}/10")
+        print(f"   → Págs: {result['num_pages']} | Propuestas: {result['total_proposals']} | Pilares: {result['num_pillars']}/10")
         print(f"   → Score: {scores['overall']['weighted_sum']:.1%} | Penalizaciones: {total_penalties}")
         print(f"   → Riesgo: {risk_emoji} {risk}")
     
+    if failures:
+        print(f"\n❌ {len(failures)} PDF(s) con errores (omitidos del ranking):")
+        for pdf_file, error in sorted(failures.items()):
+            print(f"   • {pdf_file}: {error}")
+    
     # Generar ranking
     ranking = generate_ranking(all_scores)
     
@@ -2279,9 +3169,96 @@ def process_all_pdfs():
     return outputs
 
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(
+        description='Procesador de planes de gobierno v7'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Ignorar la caché de extracción y re-extraer todos los PDFs'
+    )
+    parser.add_argument(
+        '--no-render-cache',
+        action='store_true',
+        help='No leer ni guardar las páginas renderizadas para OCR en data/cache/renders'
+    )
+    parser.add_argument(
+        '--no-ocr-cache',
+        action='store_true',
+        help='No reutilizar ni guardar resultados OCR por imagen en data/cache/ocr'
+    )
+    parser.add_argument(
+        '--cores',
+        type=int,
+        default=None,
+        help='Presupuesto total de núcleos (0 = todos): reparte procesos OCR e hilos por proceso '
+             'sin sobresuscribir; las opciones indicadas explícitamente se respetan (default: sin presupuesto)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='Número de procesos para procesar PDFs en paralelo (default: 1, en serie)'
+    )
+    parser.add_argument(
+        '--ocr-workers',
+        type=int,
+        default=None,
+        help='Procesos OCR por documento; cada uno carga su propio lector (default: 1, o según --cores)'
+    )
+    parser.add_argument(
+        '--ocr-threads',
+        type=int,
+        default=None,
+        help='Hilos internos de torch/OpenMP por proceso OCR (default: sin límite, o según --cores)'
+    )
+    parser.add_argument(
+        '--ocr-batch',
+        type=int,
+        default=EASYOCR_BATCH_SIZE,
+        help=f'Páginas por lote de EasyOCR (readtext_batched) (default: {EASYOCR_BATCH_SIZE}, una por llamada)'
+    )
+    parser.add_argument(
+        '--ocr-render-workers',
+        type=int,
+        default=None,
+        help='Procesos de render para el pipeline render → OCR en memoria compartida; '
+             'el OCR usa --ocr-workers procesos (default: 0, sin pipeline)'
+    )
+    parser.add_argument(
+        '--preload-ocr',
+        action='store_true',
+        help='Cargar el modelo OCR una sola vez en el proceso principal y compartirlo '
+             '(copy-on-write, vía fork) con los procesos OCR y de PDF. Con --workers > 1 '
+             'solo se carga si una muestra de páginas de los PDFs sin caché tiene texto '
+             'corrupto; antes de cada fork torch queda con 1 hilo en el proceso principal'
+    )
+    parser.add_argument(
+        '--tesseract-backend',
+        choices=TESSERACT_BACKENDS,
+        default=TESSERACT_BACKEND,
+        help=f'Backend de Tesseract: pytesseract (un proceso por página), tesserocr '
+             f'(motor en el propio proceso) o mupdf (Tesseract de PyMuPDF) (default: {TESSERACT_BACKEND})'
+    )
+    args = parser.parse_args()
+    set_tesseract_backend(args.tesseract_backend)
+    render_cache.set_render_cache(not args.no_render_cache)
+    ocr_cache.set_ocr_cache(not args.no_ocr_cache)
+    
     print("=" * 80)
     print("PROCESADOR DE PLANES v7.0 - NEUTRAL + ESTRICTO + BONOS + VIABILIDAD")
     print("10 pilares | OCR automático | Penalizaciones por omisión | Bonos múltiples propuestas | Verificación viabilidad legal")
     print("=" * 80)
-    result = process_all_pdfs()
+    result = process_all_pdfs(
+        use_cache=not args.no_cache,
+        workers=args.workers,
+        ocr_workers=args.ocr_workers,
+        ocr_threads=args.ocr_threads,
+        ocr_batch=args.ocr_batch,
+        ocr_render_workers=args.ocr_render_workers,
+        cores=args.cores,
+        preload_ocr=args.preload_ocr
+    )
     print("\n✅ PROCESO COMPLETADO")
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Reglas de proximidad: "A a N palabras o menos de B", sin `.*` sobre el texto completo.
+
+Las reglas fiscales, de viabilidad y de patrones dictatoriales de process_plans_v7.py
+eran regex con `.*` entre sus términos (r"eliminar.*regla\\s*fiscal"). El texto
+completo de un plan es una sola línea (las páginas se normalizan y se unen con
+espacios), así que esos `.*` cruzaban el documento entero: retrocedían sobre todo
+el texto desde cada aparición del primer término y unían términos separados por
+decenas de páginas. Una regla de proximidad exige que cada término aparezca a
+PROXIMITY_WINDOW palabras o menos del anterior.
+
+Sintaxis de una regla (cadenas, como los patrones regex que reemplazan):
+
+    "flexibilizar|reformar ... regla fiscal"      # A, luego B a ≤ PROXIMITY_WINDOW palabras
+    "ejecutivo ...5 aprueba|ratifica ... asamblea" # ventana propia entre dos términos
+    "gobernar por decreto sin asamblea"           # un solo término: frase exacta
+
+    - " ... " separa términos, en orden; " ...N " fija la ventana entre ese par
+    - "|" separa alternativas de un término; cada alternativa es una frase
+    - cada palabra de la frase es una regex que debe cubrir una palabra completa;
+      entre las palabras de una frase solo puede haber espacios (como el \\s+ de
+      las regex); el texto se compara en minúsculas, así que también se pasan a
+      minúsculas los caracteres literales de las palabras (no los escapes: \\S
+      sigue siendo \\S)
+    - las palabras de solo letras y de INFLECTION_MIN_LENGTH letras o más son raíces:
+      admiten cualquier terminación ("eliminar" cubre "eliminarla", "asamblea" cubre
+      "asambleas"), como la regex sin límites de palabra que reemplazan; las cortas
+      ("de", "la", "sin") y las escritas como regex ("ley\\w*", "(?:medio)") se
+      toman tal cual
+
+Una coincidencia es la primera (más a la izquierda) aparición del primer término que
+puede completarse; su span va del inicio del primer término al final del último.
+
+Antes de buscar, cada regla comprueba con subcadenas (sin regex) que en el texto
+esté el prefijo literal de alguna alternativa de cada término: en un párrafo corto
+casi siempre falta alguno y la regla se descarta sin buscar sus apariciones.
+Cada alternativa se busca con su propia regex (empieza con un literal, así que re
+la busca con el prefijo rápido) y cada término se busca una sola vez por texto,
+aunque lo compartan varias reglas. La ventana se verifica contando como mucho
+ventana + 1 palabras entre dos apariciones, así que el costo no depende de la
+distancia entre ellas.
+"""
+
+import re
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+# Palabras que puede haber entre dos términos consecutivos de una regla
+PROXIMITY_WINDOW = 12
+
+# Largo mínimo de una palabra (solo letras) para tratarla como raíz con terminaciones
+INFLECTION_MIN_LENGTH = 4
+
+TERM_SEPARATOR_PATTERN = re.compile(r"\s+\.\.\.(\d*)\s+")
+STEM_WORD_PATTERN = re.compile(r"[^\W\d_]{%d,}" % INFLECTION_MIN_LENGTH)
+WORD_CHAR_PATTERN = re.compile(r"\w")
+LITERAL_PREFIX_PATTERN = re.compile(r"[^\W\d_]+")
+# Un escape (se deja tal cual) o un tramo sin escapes (se pasa a minúsculas)
+ESCAPE_OR_LITERALS_PATTERN = re.compile(r"\\.|[^\\]+", re.DOTALL)
+
+Occurrence = Tuple[int, int]  # (inicio, fin) en caracteres
+
+
+def lower_literals(word: str) -> str:
+    """Palabra escrita como regex con sus caracteres literales en minúsculas (sin tocar los escapes)."""
+    return ESCAPE_OR_LITERALS_PATTERN.sub(
+        lambda match: match.group() if match.group().startswith("\\") else match.group().lower(),
+        word
+    )
+
+
+def word_pattern(word: str) -> str:
+    """Regex de una palabra de la frase: las raíces admiten cualquier terminación."""
+    if STEM_WORD_PATTERN.fullmatch(word):
+        return word.lower() + r"\w*"
+    return f"(?:{lower_literals(word)})"
+
+
+def phrase_pattern(phrase: str) -> re.Pattern:
+    """Regex de una alternativa: sus palabras separadas por espacios, terminando en fin de palabra."""
+    words = phrase.split()
+    return re.compile(r"\s+".join(word_pattern(word) for word in words) + r"(?!\w)")
+
+
+def literal_prefix(word: str) -> str:
+    """Letras con las que empieza toda palabra que coincide con `word` ("" si no se sabe)."""
+    if LITERAL_PREFIX_PATTERN.fullmatch(word):
+        return word.lower()
+    literal = LITERAL_PREFIX_PATTERN.match(word)
+    # El último carácter antes de la regex puede ser opcional ("decretos?")
+    return literal.group()[:-1].lower() if literal else ""
+
+
+def term_gate(term: str) -> Optional[Tuple[str, ...]]:
+    """
+    Prefijos literales de las alternativas de un término: si ninguno aparece en el
+    texto, el término tampoco (None si alguna alternativa no tiene prefijo).
+    """
+    prefixes = {literal_prefix(alternative.split()[0]) for alternative in term.split("|")}
+    if not all(prefixes):
+        return None
+    # Un prefijo que contiene a otro no agrega nada ("reformar" si está "reforma")
+    return tuple(sorted(
+        prefix for prefix in prefixes
+        if not any(other != prefix and other in prefix for other in prefixes)
+    ))
+
+
+def too_far_pattern(window: int) -> re.Pattern:
+    """Regex que coincide si hay más de `window` palabras desde el inicio del fragmento."""
+    return re.compile(r"(?:\W*\w+\b){%d}" % (window + 1))
+
+
+class TermIndex:
+    """
+    Texto (en minúsculas) sobre el que se evalúan reglas, con las apariciones de
+    cada término ya buscadas: se construye una vez por texto y lo comparten todas
+    las reglas.
+    """
+
+    def __init__(self, text: str):
+        self.text_lower = text.lower()
+        self._term_occurrences: Dict[str, List[Occurrence]] = {}
+
+    def starts_word(self, position: int) -> bool:
+        """True si en `position` empieza una palabra (no hay una letra justo antes)."""
+        return position == 0 or not WORD_CHAR_PATTERN.match(self.text_lower, position - 1)
+
+    def term_occurrences(self, source: str, alternatives: List[re.Pattern]) -> List[Occurrence]:
+        """Apariciones (palabras completas) de alguna alternativa del término, ordenadas."""
+        if source not in self._term_occurrences:
+            occurrences = set()
+            for pattern in alternatives:
+                position = 0
+                while True:
+                    match = pattern.search(self.text_lower, position)
+                    if not match:
+                        break
+                    if self.starts_word(match.start()):
+                        occurrences.add(match.span())
+                    position = match.start() + 1
+            self._term_occurrences[source] = sorted(occurrences)
+        return self._term_occurrences[source]
+
+
+class ProximityRule:
+    """Regla compilada (ver la sintaxis en el docstring del módulo)."""
+
+    def __init__(self, source: str, window: int = PROXIMITY_WINDOW, rule_id: Optional[str] = None):
+        self.source = source
+        self.rule_id = rule_id  # identificador en su paquete de reglas (ver rule_packs)
+        parts = TERM_SEPARATOR_PATTERN.split(source.strip())
+        # split con un grupo: [término, ventana, término, ventana, ...]
+        self.term_sources: List[str] = parts[0::2]
+        self.terms: List[List[re.Pattern]] = [
+            [phrase_pattern(alternative) for alternative in term.split("|")]
+            for term in self.term_sources
+        ]
+        self.term_gates: List[Tuple[str, ...]] = [
+            gate for gate in map(term_gate, self.term_sources) if gate is not None
+        ]
+        self.windows: List[int] = [int(size) if size else window for size in parts[1::2]]
+        self._too_far = [too_far_pattern(size) for size in self.windows]
+
+    def __repr__(self) -> str:
+        return f"ProximityRule({self.source!r})"
+
+    def tables(self) -> Dict[str, Any]:
+        """Regla ya analizada (serializable a JSON) para reconstruirla con from_tables."""
+        return {
+            "source": self.source,
+            "rule_id": self.rule_id,
+            "term_sources": self.term_sources,
+            "terms": [[pattern.pattern for pattern in alternatives] for alternatives in self.terms],
+            "term_gates": self.term_gates,
+            "windows": self.windows,
+        }
+
+    @classmethod
+    def from_tables(cls, tables: Mapping[str, Any]) -> "ProximityRule":
+        """Regla a partir de tables(): compila sus regex sin volver a analizar la sintaxis."""
+        rule = cls.__new__(cls)
+        rule.source = tables["source"]
+        rule.rule_id = tables["rule_id"]
+        rule.term_sources = list(tables["term_sources"])
+        rule.terms = [[re.compile(pattern) for pattern in alternatives] for alternatives in tables["terms"]]
+        rule.term_gates = [tuple(gate) for gate in tables["term_gates"]]
+        rule.windows = list(tables["windows"])
+        rule._too_far = [too_far_pattern(size) for size in rule.windows]
+        return rule
+
+    def search(self, index: TermIndex) -> Optional[Occurrence]:
+        """
+        Span (en caracteres de index.text_lower) de la primera coincidencia, o None.
+        Las apariciones de cada término se filtran de atrás hacia adelante: una
+        aparición sirve si la aparición válida más cercana del término siguiente
+        empieza después de ella y a `ventana` palabras o menos.
+        """
+        # Filtro previo (búsquedas de subcadenas, sin regex): en la mayoría de los
+        # textos falta algún término y no hace falta buscar sus apariciones
+        text = index.text_lower
+        for prefixes in self.term_gates:
+            for prefix in prefixes:
+                if prefix in text:
+                    break
+            else:
+                return None
+
+        occurrences = []
+        for source, alternatives in zip(self.term_sources, self.terms):
+            term_occurrences = index.term_occurrences(source, alternatives)
+            if not term_occurrences:
+                return None
+            occurrences.append(term_occurrences)
+
+        valid = occurrences[-1]
+        chains = [valid]
+        for term_occurrences, too_far in zip(reversed(occurrences[:-1]), reversed(self._too_far)):
+            next_starts = [start for start, _ in valid]
+            filtered = []
+            for start, end in term_occurrences:
+                i = bisect_left(next_starts, end)
+                if i < len(next_starts) and not too_far.match(text, end, next_starts[i]):
+                    filtered.append((start, end))
+            valid = filtered
+            if not valid:
+                return None
+            chains.append(valid)
+        chains.reverse()
+
+        # Primera aparición del primer término y, para cada término siguiente, la
+        # aparición válida más cercana
+        first_start, end = chains[0][0]
+        for next_valid in chains[1:]:
+            next_starts = [start for start, _ in next_valid]
+            _, end = next_valid[bisect_left(next_starts, end)]
+        return first_start, end
+
+
+def compile_rules(sources: Iterable[str], window: int = PROXIMITY_WINDOW) -> List[ProximityRule]:
+    """Compila una lista de reglas en el orden dado."""
+    return [ProximityRule(source, window) for source in sources]
+
+
+def first_match(rules: Iterable[ProximityRule], index: TermIndex) -> Optional[Tuple[ProximityRule, Occurrence]]:
+    """Primera regla de la lista que coincide en el texto, con su span (como el primer re.search)."""
+    for rule in rules:
+        span = rule.search(index)
+        if span:
+            return rule, span
+    return None
+
+
+def matching_rules(rules: Iterable[ProximityRule], index: TermIndex) -> List[ProximityRule]:
+    """Todas las reglas de la lista que coinciden en el texto."""
+    return [rule for rule in rules if rule.search(index)]
@@ -19,6 +19,8 @@ import json
 from pathlib import Path
 from typing import Any
 
+import rule_packs
+
 # Paths
 DATA_DIR = Path(__file__).parent / "data"
 
@@ -26,39 +28,39 @@ DATA_DIR = Path(__file__).parent / "data"
 # PENALTY CONFIGURATION (v6 - Neutral + Strict)
 # ============================================
 
-# Fiscal penalties (objective - based on current law)
+# Penalties, priority pillars and weights come from the same rule packs that
+# process_plans_v7.py uses (data/rules/*.json); only their data is needed here
+FISCAL_RULES, _ = rule_packs.read_rule_pack("fiscal")
+URGENCY_RULES, _ = rule_packs.read_rule_pack("urgencies")
+PILLAR_RULES, _ = rule_packs.read_rule_pack("pillars")
+
+# Fiscal penalties (objective - based on current law):
+# attacks_fiscal_rule, proposes_debt_increase
 FISCAL_PENALTIES = {
-    "attacks_fiscal_rule": -2,      # Attacks the current fiscal rule
-    "proposes_debt_increase": -1,   # More debt without sustainability plan
+    group: spec["penalty"]
+    for group, spec in FISCAL_RULES["groups"].items()
+    if "penalty" in spec
 }
 
-# Omission penalties (based on Costa Rica's national urgencies)
+# Omission penalties (based on Costa Rica's national urgencies):
+# ignores_security, ignores_ccss, ignores_employment, ignores_organized_crime,
+# plus missing_priority_pillar (per missing priority pillar)
 OMISSION_PENALTIES = {
-    "ignores_security": -1,           # Doesn't mention security operations
-    "ignores_ccss": -1,               # Doesn't mention CCSS crisis  
-    "ignores_employment": -0.5,       # Doesn't mention employment
-    "ignores_organized_crime": -0.5,  # Doesn't mention organized crime
-    "missing_priority_pillar": -0.5,  # Per missing priority pillar
+    spec["omission_flag"]: spec["penalty"]
+    for spec in URGENCY_RULES["groups"].values()
 }
+OMISSION_PENALTIES["missing_priority_pillar"] = URGENCY_RULES["missing_priority_pillar_penalty"]
 
 # Priority pillars (P3: Security, P4: Health, P1: Fiscal, P7: State Reform)
-PRIORITY_PILLARS = ["P3", "P4", "P1", "P7"]
+PRIORITY_PILLARS = PILLAR_RULES["priority_pillars"]
 
 # Critical pillars (add P2: Employment, P5: Education)
-CRITICAL_PILLARS = ["P3", "P4", "P1", "P7", "P2", "P5"]
+CRITICAL_PILLARS = PILLAR_RULES["critical_pillars"]
 
 # Pillar weights
 PILLAR_WEIGHTS = {
-    "P1": 0.14,
-    "P2": 0.11,
-    "P3": 0.18,
-    "P4": 0.16,
-    "P5": 0.10,
-    "P6": 0.03,
-    "P7": 0.12,
-    "P8": 0.05,
-    "P9": 0.02,
-    "P10": 0.09,
+    pillar_id: spec["weight"]
+    for pillar_id, spec in PILLAR_RULES["groups"].items()
 }
 
 
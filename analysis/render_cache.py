@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Caché en disco de páginas renderizadas para OCR.
+
+process_plans_v7.py, batch_ocr.py (y extract_ppso_ocr.py), precision_docs/ocr_comparison.py
+y precision_docs/ocr_extractor_v2.py renderizan las mismas páginas al mismo DPI en cada
+ejecución y para cada motor. Con esta caché cada página se renderiza una sola vez y se
+guarda como PNG (sin pérdida), indexada por el contenido del PDF:
+
+    data/cache/renders/{SHA-256 del PDF}/p{página:04d}_{dpi}dpi_{gray|rgb}.png
+
+Un PDF modificado cambia de SHA-256 y no reutiliza renders antiguos. Solo se cachean
+páginas completas; las regiones (clip) se renderizan siempre.
+
+Uso:
+    python render_cache.py            # resumen de la caché
+    python render_cache.py --clear    # borrar todos los renders
+"""
+
+import os
+import io
+import shutil
+import hashlib
+import importlib
+from typing import Dict, Optional, Tuple
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+RENDER_CACHE_DIR = os.path.join(SCRIPT_DIR, "data", "cache", "renders")
+
+# Se desactiva con --no-render-cache en las herramientas que la usan
+RENDER_CACHE_ENABLED = True
+
+# PyMuPDF y PIL se importan la primera vez que se necesitan
+fitz = None
+Image = None
+
+# SHA-256 por archivo: (ruta, tamaño, mtime) → hash, para no releer el PDF en cada página
+_pdf_digests: Dict[Tuple[str, int, int], str] = {}
+
+
+def load_fitz():
+    """Importa PyMuPDF la primera vez que se renderiza una página."""
+    global fitz
+    if fitz is None:
+        fitz = importlib.import_module("fitz")
+    return fitz
+
+
+def set_render_cache(enabled: bool) -> None:
+    """Activa o desactiva la caché de renders en el proceso actual."""
+    global RENDER_CACHE_ENABLED
+    RENDER_CACHE_ENABLED = enabled
+
+
+def pdf_digest(path: str) -> str:
+    """SHA-256 del contenido del PDF (se recalcula solo si el archivo cambia)."""
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if key not in _pdf_digests:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        _pdf_digests[key] = digest.hexdigest()
+    return _pdf_digests[key]
+
+
+def render_cache_path(pdf_sha: str, page_index: int, dpi: int, grayscale: bool) -> str:
+    """Ruta del PNG de una página: SHA del PDF + página + DPI + espacio de color."""
+    colorspace = "gray" if grayscale else "rgb"
+    return os.path.join(RENDER_CACHE_DIR, pdf_sha, f"p{page_index:04d}_{dpi}dpi_{colorspace}.png")
+
+
+def render_pixmap(page, dpi: int, grayscale: bool = True, clip=None):
+    """Renderiza la página (o la región clip) sin caché y sin canal alfa."""
+    load_fitz()
+    mat = fitz.Matrix(dpi / 72, dpi / 72)
+    colorspace = fitz.csGRAY if grayscale else fitz.csRGB
+    return page.get_pixmap(matrix=mat, colorspace=colorspace, alpha=False, clip=clip)
+
+
+def _page_cache_path(page, dpi: int, grayscale: bool) -> Optional[str]:
+    """Ruta en la caché de una página, o None si la caché no aplica (desactivada, PDF en memoria)."""
+    if not RENDER_CACHE_ENABLED:
+        return None
+    pdf_path = page.parent.name
+    if not pdf_path or not os.path.isfile(pdf_path):
+        return None
+    return render_cache_path(pdf_digest(pdf_path), page.number, dpi, grayscale)
+
+
+def _save_png(pix, cache_path: str) -> bool:
+    """Guarda el pixmap como PNG de forma atómica (varios procesos pueden escribir a la vez)."""
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        pix.save(tmp_path, output="png")
+        os.replace(tmp_path, cache_path)
+        return True
+    except (OSError, RuntimeError, ValueError) as e:
+        print(f"  ⚠️  No se pudo guardar el render en caché: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+
+
+def _load_png(cache_path: str, grayscale: bool):
+    """Carga un PNG cacheado como pixmap; None si falta o no es válido."""
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        pix = load_fitz().Pixmap(cache_path)
+    except Exception:
+        return None  # PNG truncado o ilegible: se vuelve a renderizar
+    if pix.alpha or pix.n != (1 if grayscale else 3):
+        return None
+    return pix
+
+
+def render_page(page, dpi: int, grayscale: bool = True, clip=None):
+    """
+    Pixmap de la página a `dpi` (escala de grises o RGB, sin alfa). Las páginas
+    completas se leen de la caché si ya se renderizaron y se guardan si no.
+    """
+    cache_path = _page_cache_path(page, dpi, grayscale) if clip is None else None
+    if cache_path is None:
+        return render_pixmap(page, dpi, grayscale, clip)
+    pix = _load_png(cache_path, grayscale)
+    if pix is None:
+        pix = render_pixmap(page, dpi, grayscale)
+        _save_png(pix, cache_path)
+    return pix
+
+
+def render_page_image(page, dpi: int, grayscale: bool = False):
+    """
+    Imagen PIL de la página (para motores que reciben imágenes PIL). Si la página
+    está en la caché se abre el PNG directamente, sin renderizar ni recodificar.
+    """
+    global Image
+    if Image is None:
+        Image = importlib.import_module("PIL.Image")
+    pix = None
+    cache_path = _page_cache_path(page, dpi, grayscale)
+    if cache_path is not None:
+        if not os.path.exists(cache_path):
+            pix = render_pixmap(page, dpi, grayscale)
+            _save_png(pix, cache_path)
+        try:
+            image = Image.open(cache_path)
+            image.load()  # lee los píxeles y cierra el archivo
+            return image
+        except OSError:
+            pass
+    if pix is None:
+        pix = render_pixmap(page, dpi, grayscale)
+    return Image.open(io.BytesIO(pix.tobytes("png")))
+
+
+def render_cache_stats() -> Dict[str, int]:
+    """Número de PDFs, páginas renderizadas y bytes ocupados por la caché."""
+    stats = {"pdfs": 0, "pages": 0, "bytes": 0}
+    if not os.path.isdir(RENDER_CACHE_DIR):
+        return stats
+    for entry in os.scandir(RENDER_CACHE_DIR):
+        if not entry.is_dir():
+            continue
+        stats["pdfs"] += 1
+        for render in os.scandir(entry.path):
+            if render.name.endswith(".png"):
+                stats["pages"] += 1
+                stats["bytes"] += render.stat().st_size
+    return stats
+
+
+def clear_render_cache() -> None:
+    """Borra todos los renders cacheados."""
+    if os.path.isdir(RENDER_CACHE_DIR):
+        shutil.rmtree(RENDER_CACHE_DIR)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Caché de páginas renderizadas para OCR')
+    parser.add_argument('--clear', action='store_true', help='Borrar todos los renders cacheados')
+    args = parser.parse_args()
+
+    if args.clear:
+        clear_render_cache()
+        print(f"🗑️  Caché de renders borrada: {os.path.relpath(RENDER_CACHE_DIR, SCRIPT_DIR)}")
+    else:
+        stats = render_cache_stats()
+        print(f"📁 {os.path.relpath(RENDER_CACHE_DIR, SCRIPT_DIR)}: {stats['pdfs']} PDFs, "
+              f"{stats['pages']} páginas, {stats['bytes'] / 1e6:.1f} MB")
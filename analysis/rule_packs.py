@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Paquetes de reglas: palabras clave, indicadores y penalizaciones en archivos de datos.
+
+Los pilares, las dimensiones, las reglas fiscales y de urgencias, las de viabilidad,
+los patrones dictatoriales y los indicadores de negociación entre poderes están en
+data/rules/{paquete}.json. Cada paquete se valida y se compila una sola vez por
+proceso en matchers (KeywordAutomaton, IndicatorMatcher, reglas de proximidad),
+indexado por el hash del JSON: al editar el archivo cambia el hash y se vuelve a
+compilar. Lo usan process_plans_v7.py y recalculate_scores_v6.py.
+
+El paquete validado y normalizado, con las tablas ya construidas (trie y prefijos
+del autómata, literales del prefiltro de las regex, términos, prefijos y ventanas
+de las reglas de proximidad), se guarda en JSON indexado por el hash del paquete:
+
+    data/cache/rules/{paquete}-{hash}.json
+
+Un proceso nuevo lo carga y solo compila las regex con re.compile (re no tiene una
+forma pública de guardar un patrón compilado). La caché se descarta si cambia la
+versión de Python o el código de rule_packs, proximity, keyword_automaton o
+indicator_matcher. Los procesos del pool creados con fork heredan los paquetes
+del padre.
+
+Formato de un paquete (las claves que empiezan con "_" se ignoran: comentarios):
+
+    {
+      "pack": "fiscal",
+      "ignorecase": true,                 # solo reglas "regex" (por defecto true)
+      "groups": {
+        "attacks_fiscal_rule": {
+          "kind": "proximity",            # "keywords", "regex" o "proximity"
+          "penalty": -2, "reason": "...", # metadatos libres del grupo
+          "rules": [{"id": "fiscal.attack.01", "rule": "flexibilizar ... regla fiscal"}]
+        }
+      }
+    }
+
+    - "keywords": {"keywords": [...]}; búsqueda por subcadena, el id es "{paquete}.{grupo}"
+    - "regex":    {"rules": [{"id", "pattern"}]}; evaluadas en orden con prefiltro literal
+    - "proximity": {"rules": [{"id", "rule"}]}; sintaxis de proximity.py
+
+Los ids de las reglas quedan en las penalizaciones y flags de la salida, para saber
+qué regla produjo cada resultado.
+
+Uso:
+    python rule_packs.py            # paquetes, reglas y tiempo de carga
+    python rule_packs.py --clear    # borrar los paquetes guardados en la caché
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import hashlib
+from typing import Any, Dict, List, Optional, Tuple
+
+import indicator_matcher
+import keyword_automaton
+import proximity
+from indicator_matcher import IndicatorMatcher
+from keyword_automaton import KeywordAutomaton
+from proximity import ProximityRule, TermIndex
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+RULES_DIR = os.path.join(SCRIPT_DIR, "data", "rules")
+RULES_CACHE_DIR = os.path.join(SCRIPT_DIR, "data", "cache", "rules")
+
+RULE_KINDS = ("keywords", "regex", "proximity")
+
+# Se desactiva con set_rule_cache(False): los paquetes se compilan sin leer ni escribir la caché
+RULE_CACHE_ENABLED = True
+
+# Paquetes ya compilados en este proceso
+_packs: Dict[str, "RulePack"] = {}
+
+# Hash del código que construye las tablas (se calcula una vez por proceso)
+_code_hash: Optional[str] = None
+
+
+def _strip_comments(value: Any) -> Any:
+    """Quita (recursivamente) las claves que empiezan con "_"."""
+    if isinstance(value, dict):
+        return {key: _strip_comments(item) for key, item in value.items() if not key.startswith("_")}
+    if isinstance(value, list):
+        return [_strip_comments(item) for item in value]
+    return value
+
+
+def rule_pack_path(name: str) -> str:
+    return os.path.join(RULES_DIR, f"{name}.json")
+
+
+def _read_raw_rule_pack(name: str) -> Tuple[bytes, str]:
+    with open(rule_pack_path(name), 'rb') as f:
+        raw = f.read()
+    return raw, hashlib.sha256(raw).hexdigest()[:16]
+
+
+def read_rule_pack(name: str) -> Tuple[Dict[str, Any], str]:
+    """Contenido del paquete (sin comentarios) y su hash, que identifica la versión compilada."""
+    raw, digest = _read_raw_rule_pack(name)
+    return _strip_comments(json.loads(raw.decode('utf-8'))), digest
+
+
+class RulePack:
+    """Paquete de reglas compilado (ver el formato en el docstring del módulo)."""
+
+    def __init__(self, name: str, data: Dict[str, Any], digest: str, tables: Optional[Dict[str, Any]] = None):
+        """tables: resultado de self.tables() guardado en la caché (no se vuelven a construir)."""
+        self.name = name
+        self.digest = digest
+        self.data = data
+        self.from_cache = tables is not None
+        self.groups: Dict[str, Dict[str, Any]] = data.get("groups", {})
+
+        keyword_groups = {}
+        regex_groups = {}
+        self.rule_ids: Dict[str, List[str]] = {}
+        self.rule_sources: Dict[str, str] = {}  # id → patrón o regla, como está en el JSON
+        self.proximity_rules: Dict[str, List[ProximityRule]] = {}
+        for group, spec in self.groups.items():
+            kind = spec.get("kind")
+            if kind not in RULE_KINDS:
+                raise ValueError(f"{name}.json: grupo '{group}' con kind inválido: {kind!r}")
+            if kind == "keywords":
+                keyword_groups[group] = spec["keywords"]
+                self.rule_ids[group] = [f"{name}.{group}"]
+                continue
+            rules = spec["rules"]
+            self.rule_ids[group] = [rule["id"] for rule in rules]
+            self.rule_sources.update((rule["id"], rule.get("pattern", rule.get("rule"))) for rule in rules)
+            if kind == "regex":
+                regex_groups[group] = [rule["pattern"] for rule in rules]
+            elif tables is not None:
+                self.proximity_rules[group] = [ProximityRule.from_tables(rule) for rule in tables["proximity"][group]]
+            else:
+                self.proximity_rules[group] = [ProximityRule(rule["rule"], rule_id=rule["id"]) for rule in rules]
+
+        all_ids = [rule_id for ids in self.rule_ids.values() for rule_id in ids]
+        duplicated = sorted({rule_id for rule_id in all_ids if all_ids.count(rule_id) > 1})
+        if duplicated:
+            raise ValueError(f"{name}.json: ids de regla repetidos: {', '.join(duplicated)}")
+
+        # Un autómata para todos los grupos de palabras clave y un matcher para todos
+        # los de regex: una sola pasada por el texto para el paquete completo
+        if tables is not None:
+            self.automaton = KeywordAutomaton.from_tables(tables["automaton"]) if tables["automaton"] else None
+            self.matcher = IndicatorMatcher.from_tables(tables["matcher"]) if tables["matcher"] else None
+            return
+        self.automaton = KeywordAutomaton(keyword_groups) if keyword_groups else None
+        flags = re.IGNORECASE if data.get("ignorecase", True) else 0
+        self.matcher = IndicatorMatcher(regex_groups, flags) if regex_groups else None
+
+    def __repr__(self) -> str:
+        return f"RulePack({self.name!r}, {self.digest})"
+
+    def tables(self) -> Dict[str, Any]:
+        """Tablas construidas del paquete (serializables a JSON), para la caché."""
+        return {
+            "automaton": self.automaton.tables() if self.automaton is not None else None,
+            "matcher": self.matcher.tables() if self.matcher is not None else None,
+            "proximity": {
+                group: [rule.tables() for rule in rules]
+                for group, rules in self.proximity_rules.items()
+            },
+        }
+
+    def keywords(self, group: str) -> List[str]:
+        return self.groups[group]["keywords"]
+
+    def patterns(self, group: str) -> List[str]:
+        return [rule["pattern"] for rule in self.groups[group]["rules"]]
+
+    def rules(self, group: str) -> List[ProximityRule]:
+        return self.proximity_rules[group]
+
+    def keyword_counts(self, text: str) -> Dict[str, int]:
+        """Palabras clave de cada grupo presentes en el texto (sin distinguir mayúsculas)."""
+        return self.automaton.group_counts(text)
+
+    def found_keywords(self, text: str) -> Dict[str, List[str]]:
+        """Palabras clave presentes de cada grupo, en el orden (y la forma) en que las lista el paquete."""
+        found = {self.automaton.keywords[i] for i in self.automaton.find(text.lower())}
+        return {
+            group: [keyword for keyword in spec["keywords"] if keyword.lower() in found]
+            for group, spec in self.groups.items()
+            if spec["kind"] == "keywords"
+        }
+
+    def first_regex(
+        self,
+        text: str,
+        group: str,
+        candidates: Optional[Dict[str, int]] = None
+    ) -> Optional[Tuple[str, re.Match]]:
+        """(id, coincidencia) de la primera regla regex del grupo que aparece en el texto."""
+        found = self.matcher.first_match_index(text, group, candidates)
+        if found is None:
+            return None
+        i, match = found
+        return self.rule_ids[group][i], match
+
+    def matching_regex(self, text: str, group: str) -> List[str]:
+        """Ids de todas las reglas regex del grupo que aparecen en el texto."""
+        candidates = self.matcher.candidates(text)
+        return [
+            rule_id
+            for rule_id, group_id, pattern in zip(
+                self.rule_ids[group], self.matcher.group_ids[group], self.matcher.patterns[group]
+            )
+            if (candidates is None or candidates.get(group_id, 1) > 0) and pattern.search(text)
+        ]
+
+    def first_rule(self, group: str, index: TermIndex) -> Optional[Tuple[ProximityRule, Tuple[int, int]]]:
+        """Primera regla de proximidad del grupo que coincide, con su span."""
+        for rule in self.proximity_rules[group]:
+            span = rule.search(index)
+            if span:
+                return rule, span
+        return None
+
+    def matching_rules(self, group: str, index: TermIndex) -> List[ProximityRule]:
+        """Todas las reglas de proximidad del grupo que coinciden."""
+        return [rule for rule in self.proximity_rules[group] if rule.search(index)]
+
+
+def set_rule_cache(enabled: bool) -> None:
+    """Activa o desactiva la caché de paquetes en el proceso actual."""
+    global RULE_CACHE_ENABLED
+    RULE_CACHE_ENABLED = enabled
+
+
+def code_hash() -> str:
+    """
+    Hash de la versión de Python y del código que construye y lee las tablas: si
+    cambia alguno, las tablas guardadas pueden no corresponder y se descartan.
+    """
+    global _code_hash
+    if _code_hash is None:
+        digest = hashlib.sha256(sys.version.encode('utf-8'))
+        for path in (__file__, proximity.__file__, keyword_automaton.__file__, indicator_matcher.__file__):
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        _code_hash = digest.hexdigest()[:16]
+    return _code_hash
+
+
+def rule_cache_path(name: str, digest: str) -> str:
+    return os.path.join(RULES_CACHE_DIR, f"{name}-{digest}.json")
+
+
+def load_cached_rule_pack(name: str, digest: str) -> Optional[RulePack]:
+    """Paquete reconstruido desde la caché, o None si no está o no corresponde a este código."""
+    cache_path = rule_cache_path(name, digest)
+    if not RULE_CACHE_ENABLED or not os.path.exists(cache_path):
+        return None
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached["digest"] != digest or cached["code_hash"] != code_hash():
+            return None
+        return RulePack(name, cached["data"], digest, cached["tables"])
+    except (json.JSONDecodeError, KeyError, TypeError, ValueError, re.error, OSError):
+        return None  # archivo truncado o ilegible: se vuelve a compilar
+
+
+def save_rule_pack(pack: RulePack) -> None:
+    """Guarda el paquete validado y sus tablas de forma atómica (y borra las versiones anteriores)."""
+    if not RULE_CACHE_ENABLED:
+        return
+    cache_path = rule_cache_path(pack.name, pack.digest)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    cached = {
+        "pack": pack.name,
+        "digest": pack.digest,
+        "code_hash": code_hash(),
+        "data": pack.data,
+        "tables": pack.tables(),
+    }
+    try:
+        os.makedirs(RULES_CACHE_DIR, exist_ok=True)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(cached, f, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+        for entry in os.listdir(RULES_CACHE_DIR):
+            if entry.startswith(f"{pack.name}-") and entry.endswith(".json") and entry != os.path.basename(cache_path):
+                os.remove(os.path.join(RULES_CACHE_DIR, entry))
+    except OSError as e:
+        print(f"  ⚠️  No se pudo guardar el paquete de reglas {pack.name} en caché: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def clear_rule_cache() -> None:
+    """Borra todos los paquetes guardados en la caché."""
+    if os.path.isdir(RULES_CACHE_DIR):
+        shutil.rmtree(RULES_CACHE_DIR)
+
+
+def load_rule_pack(name: str) -> RulePack:
+    """
+    Paquete compilado: el de este proceso si ya se compiló esta versión del JSON;
+    si no, el de la caché en disco o, si no está, lo valida, lo compila y lo guarda.
+    """
+    raw, digest = _read_raw_rule_pack(name)
+    pack = _packs.get(name)
+    if pack is None or pack.digest != digest:
+        pack = load_cached_rule_pack(name, digest)
+        if pack is None:
+            pack = RulePack(name, _strip_comments(json.loads(raw.decode('utf-8'))), digest)
+            save_rule_pack(pack)
+        _packs[name] = pack
+    return pack
+
+
+def available_rule_packs() -> List[str]:
+    if not os.path.isdir(RULES_DIR):
+        return []
+    return sorted(entry[:-len(".json")] for entry in os.listdir(RULES_DIR) if entry.endswith(".json"))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Paquetes de reglas de data/rules')
+    parser.add_argument('--clear', action='store_true', help='Borrar los paquetes guardados en la caché')
+    args = parser.parse_args()
+
+    if args.clear:
+        clear_rule_cache()
+        print(f"🗑️  Caché de paquetes de reglas borrada: {os.path.relpath(RULES_CACHE_DIR, SCRIPT_DIR)}")
+    else:
+        for name in available_rule_packs():
+            start = time.perf_counter()
+            pack = load_rule_pack(name)
+            elapsed = (time.perf_counter() - start) * 1000
+            rules = sum(len(ids) for ids in pack.rule_ids.values())
+            origin = "cargado de la caché" if pack.from_cache else "compilado"
+            print(f"📋 {name}: {len(pack.groups)} grupos, {rules} reglas, hash {pack.digest} "
+                  f"({origin} en {elapsed:.1f} ms)")
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Perfil de calidad del texto extraído de una página.
+
+Reemplaza los bucles carácter por carácter (sum(1 for char in text if char in
+CORRUPT_CHARS)) que había en process_plans_v7.py, precision_docs/ocr_extractor*.py y
+precision_docs/pdf_library_comparison.py. Con NumPy, el texto se convierte a un array
+de unidades UTF-16 y se clasifica con tablas booleanas del plano básico; sin NumPy se
+cuenta con str.count por carácter. Cada tabla se construye la primera vez que se pide
+su métrica: quien solo necesita los caracteres corruptos no paga la de letras.
+
+Métricas de profile_text() (todas por defecto, o las pedidas en `metrics`):
+    corrupt_ratio   caracteres de fuentes corruptas / caracteres
+    pua_ratio       caracteres de uso privado (U+E000-U+F8FF) / caracteres
+    cid_density     tokens "(cid:" / caracteres
+    alpha_ratio     caracteres alfabéticos / caracteres
+    stopword_ratio  palabras vacías del español / palabras (texto real ≈ 0.3-0.5)
+"""
+
+import importlib
+import importlib.util
+import string
+from functools import lru_cache
+from itertools import repeat
+from operator import countOf
+from typing import Any, Dict, FrozenSet, Iterable, List, Tuple
+
+# Caracteres de fuentes corruptas (ampliado para detectar más casos)
+CORRUPT_CHARS = frozenset([
+    # Unicode privado (fuentes corruptas comunes)
+    '\uf0b7', '\uf0a7', '\uf0d8', '\uf020', '\uf06c', '\uf06f', '\uf073',
+    '\uf061', '\uf065', '\uf06e', '\uf072', '\uf074', '\uf075', '\uf069',
+    '\uf064', '\uf063', '\uf06d', '\uf070', '\uf067', '\uf0fc', '\uf0e0',
+    # Caracteres cirílicos/extraños que aparecen en PDFs corruptos
+    'ӌ', 'Ǣ', 'ņ', 'Ğ', 'ļ', 'š', 'Ź', 'ĵ', 'ū', 'Ô', 'Ť', 'Ņ', 'ƕ', 'ý', 'ð', 'ų', 'ö', 'Ē', 'Ľ', 'Ě',
+])
+CORRUPT_THRESHOLD = 0.02  # 2% de caracteres corruptos
+
+# Palabras vacías más frecuentes del español
+SPANISH_STOPWORDS = frozenset("""
+a al algo ante antes como con contra cual cuando de del desde donde durante e el
+ella ellas ellos en entre era es esa ese eso esta este esto está están fue ha han
+hasta hay la las le les lo los mas más me mi muy no nos o otra otro para pero por
+porque que quien se sea ser si sin sobre son su sus también tiene todo todos tu un
+una uno unos y ya
+""".split())
+
+# Signos que se quitan de los bordes de cada palabra al buscarla entre las vacías
+WORD_PUNCTUATION = string.punctuation + "¡¿«»“”‘’…–—"
+
+PUA_START, PUA_END = 0xE000, 0xF8FF
+BMP_SIZE = 0x10000
+
+# Caracteres por lote de corrupt_ratios (arrays de ~0.5 MB: caben en caché)
+BATCH_CHARS = 256 * 1024
+
+PROFILE_METRICS = ("corrupt_ratio", "pua_ratio", "cid_density", "alpha_ratio", "stopword_ratio")
+
+NUMPY_AVAILABLE = importlib.util.find_spec("numpy") is not None
+np = None  # se importa la primera vez que se perfila una página
+
+
+def _load_numpy():
+    global np
+    if np is None:
+        np = importlib.import_module("numpy")
+    return np
+
+
+@lru_cache(maxsize=8)
+def _corrupt_table(corrupt_chars: FrozenSet[str]):
+    """
+    Tabla booleana de los caracteres corruptos del plano básico, o None si alguno
+    está fuera de él (entonces se cuenta con str.count).
+    """
+    if not all(ord(char) < BMP_SIZE for char in corrupt_chars):
+        return None
+    _load_numpy()
+    table = np.zeros(BMP_SIZE, dtype=bool)
+    table[[ord(char) for char in corrupt_chars]] = True
+    return table
+
+
+@lru_cache(maxsize=8)
+def _min_corrupt_code(corrupt_chars: FrozenSet[str]) -> int:
+    """Menor code point del conjunto: las unidades menores no pueden ser corruptas."""
+    return min((ord(char) for char in corrupt_chars), default=BMP_SIZE)
+
+
+@lru_cache(maxsize=1)
+def _alpha_table():
+    """Tabla booleana de los caracteres alfabéticos del plano básico (solo para alpha_ratio)."""
+    _load_numpy()
+    return np.array([chr(code).isalpha() for code in range(BMP_SIZE)], dtype=bool)
+
+
+@lru_cache(maxsize=8)
+def _has_ascii(corrupt_chars: FrozenSet[str]) -> bool:
+    return any(char.isascii() for char in corrupt_chars)
+
+
+def _code_units(text: str):
+    """
+    Unidades UTF-16 del texto. Los caracteres fuera del plano básico ocupan dos
+    sustitutos, que ninguna tabla marca (ningún carácter corrupto está fuera de él).
+    """
+    _load_numpy()
+    return np.frombuffer(text.encode('utf-16-le', 'surrogatepass'), dtype=np.uint16)
+
+
+def _count_in_table(code_units, table) -> int:
+    return int(np.count_nonzero(table.take(code_units)))
+
+
+def count_corrupt_chars(text: str, corrupt_chars: Iterable[str] = CORRUPT_CHARS) -> int:
+    """Número de caracteres del texto que pertenecen a corrupt_chars."""
+    if not isinstance(corrupt_chars, frozenset):
+        corrupt_chars = frozenset(corrupt_chars)
+    if not text or (text.isascii() and not _has_ascii(corrupt_chars)):
+        return 0
+    table = _corrupt_table(corrupt_chars) if NUMPY_AVAILABLE else None
+    if table is None:
+        return sum(map(text.count, corrupt_chars))
+    return _count_in_table(_code_units(text), table)
+
+
+def corrupt_ratio(text: str, corrupt_chars: Iterable[str] = CORRUPT_CHARS) -> float:
+    """Proporción de caracteres de fuentes corruptas (0.0 si el texto está vacío)."""
+    if not text:
+        return 0.0
+    return count_corrupt_chars(text, corrupt_chars) / len(text)
+
+
+def _batch_corrupt_counts(texts: List[str], table, min_code: int) -> List[int]:
+    """Caracteres corruptos de cada página de un lote, con una pasada sobre el texto concatenado."""
+    code_units = _code_units("".join(texts))
+    candidates = np.flatnonzero(code_units >= min_code)
+    positions = candidates[table.take(code_units[candidates])]
+    if not len(positions):
+        return [0] * len(texts)
+    # Página de cada carácter corrupto según los límites en unidades UTF-16
+    # (un carácter fuera del plano básico ocupa dos)
+    lengths = [len(text) for text in texts]
+    if len(code_units) != sum(lengths):
+        lengths = [len(text.encode('utf-16-le', 'surrogatepass')) // 2 for text in texts]
+    pages = np.searchsorted(np.cumsum(lengths), positions, side='right')
+    return np.bincount(pages, minlength=len(texts)).tolist()
+
+
+def corrupt_ratios(texts: Iterable[str], corrupt_chars: Iterable[str] = CORRUPT_CHARS) -> List[float]:
+    """
+    corrupt_ratio de varias páginas con pasadas vectorizadas sobre el texto
+    concatenado (el costo fijo de NumPy se paga por lote y no por página). Los lotes
+    son de BATCH_CHARS caracteres para que los arrays quepan en caché, y solo se
+    buscan en la tabla las unidades desde el menor carácter corrupto (el texto en
+    español es casi todo ASCII).
+    """
+    texts = list(texts)
+    if not isinstance(corrupt_chars, frozenset):
+        corrupt_chars = frozenset(corrupt_chars)
+    table = _corrupt_table(corrupt_chars) if NUMPY_AVAILABLE else None
+    if table is None or not texts:
+        return [corrupt_ratio(text, corrupt_chars) for text in texts]
+
+    min_code = _min_corrupt_code(corrupt_chars)
+    counts = []
+    start = 0
+    while start < len(texts):
+        end, size = start, 0
+        while end < len(texts) and (end == start or size < BATCH_CHARS):
+            size += len(texts[end])
+            end += 1
+        counts.extend(_batch_corrupt_counts(texts[start:end], table, min_code))
+        start = end
+    return [count / len(text) if text else 0.0 for count, text in zip(counts, texts)]
+
+
+def detect_corrupt_text(
+    text: str,
+    corrupt_chars: Iterable[str] = CORRUPT_CHARS,
+    threshold: float = CORRUPT_THRESHOLD
+) -> Tuple[bool, float]:
+    """Detecta si un texto tiene caracteres de fuentes corruptas. Retorna (corrupto, proporción)."""
+    ratio = corrupt_ratio(text, corrupt_chars)
+    return ratio > threshold, ratio
+
+
+def word_stats(text: str) -> Tuple[int, float]:
+    """
+    (palabras, proporción de palabras vacías del español). Las palabras se recorren
+    con map en C (strip de los signos y búsqueda en el conjunto), sin un bucle de
+    Python por palabra.
+    """
+    words = text.lower().split()
+    if not words:
+        return 0, 0.0
+    stripped = map(str.strip, words, repeat(WORD_PUNCTUATION))
+    stopwords = countOf(map(SPANISH_STOPWORDS.__contains__, stripped), True)
+    return len(words), stopwords / len(words)
+
+
+def profile_text(
+    text: str,
+    corrupt_chars: Iterable[str] = CORRUPT_CHARS,
+    metrics: Iterable[str] = PROFILE_METRICS
+) -> Dict[str, Any]:
+    """
+    Perfil de calidad de una página: "characters" y las métricas pedidas de
+    PROFILE_METRICS (todas por defecto). corrupt_ratio agrega "corrupt_chars" y
+    stopword_ratio agrega "words". Solo se construyen las tablas que piden las métricas.
+    """
+    metrics = tuple(metrics)
+    unknown = [metric for metric in metrics if metric not in PROFILE_METRICS]
+    if unknown:
+        raise ValueError(f"Métricas desconocidas: {', '.join(unknown)}")
+    if not isinstance(corrupt_chars, frozenset):
+        corrupt_chars = frozenset(corrupt_chars)
+
+    total = len(text) if text else 0
+    profile: Dict[str, Any] = {"characters": total}
+    if "corrupt_ratio" in metrics:
+        profile["corrupt_chars"] = 0
+    if "stopword_ratio" in metrics:
+        profile["words"] = 0
+    profile.update((metric, 0.0) for metric in metrics)
+    if not total:
+        return profile
+
+    code_units = None
+    if NUMPY_AVAILABLE and {"corrupt_ratio", "pua_ratio", "alpha_ratio"}.intersection(metrics):
+        code_units = _code_units(text)
+
+    if "corrupt_ratio" in metrics:
+        table = _corrupt_table(corrupt_chars) if code_units is not None else None
+        if table is not None:
+            corrupt = _count_in_table(code_units, table)
+        else:
+            corrupt = sum(map(text.count, corrupt_chars))
+        profile["corrupt_chars"] = corrupt
+        profile["corrupt_ratio"] = corrupt / total
+    if "pua_ratio" in metrics:
+        if code_units is not None:
+            # Resta en uint16: las unidades menores que PUA_START dan la vuelta y quedan fuera
+            pua = int(np.count_nonzero(code_units - np.uint16(PUA_START) <= PUA_END - PUA_START))
+        else:
+            pua = sum(1 for char in text if PUA_START <= ord(char) <= PUA_END)
+        profile["pua_ratio"] = pua / total
+    if "cid_density" in metrics:
+        profile["cid_density"] = text.count("(cid:") / total
+    if "alpha_ratio" in metrics:
+        if code_units is not None:
+            alpha = _count_in_table(code_units, _alpha_table())
+            if len(code_units) != total:
+                # Letras fuera del plano básico (raras): la tabla no las cubre
+                alpha += sum(1 for char in text if ord(char) >= BMP_SIZE and char.isalpha())
+        else:
+            alpha = sum(map(str.isalpha, text))
+        profile["alpha_ratio"] = alpha / total
+    if "stopword_ratio" in metrics:
+        profile["words"], profile["stopword_ratio"] = word_stats(text)
+    return profile
@@ -200,18 +200,10 @@ export interface Ranking {
   weights: Record<string, number>;
   priority_pillars: string[];
   critical_pillars: string[];
+  // Grupos y penalizaciones de analysis/data/rules (fiscal.json, urgencies.json)
   penalties_applied: {
-    fiscal: {
-    attacks_fiscal_rule: number;
-    proposes_debt_increase: number;
-    };
-    omissions: {
-      ignores_security_operations: number;
-      ignores_ccss_crisis: number;
-      ignores_formal_employment: number;
-      ignores_organized_crime: number;
-      missing_priority_pillar: number;
-    };
+    fiscal: Record<string, number>;
+    omissions: Record<string, number>;
   };
   ranking_overall_weighted: RankingEntry[];
   ranking_priority_weighted: RankingEntry[];